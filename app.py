@@ -2,16 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import os
-import re
 import json
 import time
 import shutil
-import zipfile
+import sqlite3
 import threading
-import subprocess
-import smtplib
 import uuid
-from email.message import EmailMessage
+import asyncio
 from datetime import datetime
 from typing import Optional
 
@@ -20,15 +17,35 @@ from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse, JSO
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from result_store_16092025_0900 import storePathFor, isStoreFile, exportStoreFile
+from worker_pool_16092025_0900 import WorkerPool
+from run_log_16092025_0900 import RunLog, RUN_LOG_NAME, READ_LIMIT, readFileFrom
+from log_ingest_16092025_0900 import SECTION_TAGS, SectionTracker, normalizeBlock
+from zip_stream_16092025_0900 import iterZip, buildZip, cacheIsFresh
+from mail_queue_16092025_0900 import MailQueue, ATTACHMENT_SLOT, SENT, RETRY
+from upload_store_16092025_0900 import saveUpload, fileSha256, UploadTooLarge
+from run_registry_16092025_0900 import (
+    openRegistry, saveRun, getRun, listRuns, countRuns, abandonUnfinished, requestStop, stopRequests,
+    runKey, findRunByKey, findRunByIdem, findBaselineCandidates, addEmailRecipient, splitRecipients,
+    FINAL_STATUSES,
+)
+from job_queue_16092025_0900 import (
+    openQueue, enqueueJob, markPrepared, unpreparedJobs, claimNextJob, queuePosition, queuePositions,
+    cancelJob, finishJob, requeueRunning, pendingJobs, processOwner, ownerAlive,
+)
+from extract_engine_16092025_0900 import runExtractors
+from messagesPrep_16092025_0900 import EXTRACTORS
+
 # =========================
 # Genel Ayarlar / Yollar
 # =========================
 
 BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
 SCRIPT_NAME   = "spellcheck_16092025_0900.py"   # gerekirse değiştir
-SCRIPT_PATH   = os.path.join(BASE_DIR, SCRIPT_NAME)
+WORKER_PATH   = os.path.join(BASE_DIR, "worker_pool_16092025_0900.py")
 OUTPUTS_DIR   = os.path.join(BASE_DIR, "outputs")
 STATIC_DIR    = os.path.join(BASE_DIR, "static")   # index.html burada
+UPLOADS_DIR   = os.path.join(OUTPUTS_DIR, "uploads")   # uploads/<sha256>/<dosya> (içerik adresli)
 
 
 # .env'i otomatik yükle (BASE_DIR ve çalışma dizininde ara)
@@ -46,9 +63,6 @@ os.makedirs(OUTPUTS_DIR, exist_ok=True)
 os.makedirs(STATIC_DIR,  exist_ok=True)
 
 
-# UI'da kullandığımız etiket isimleri
-SECTION_TAGS = ("spellcheck", "grammar", "punctuation", "clarity", "tone")
-
 # =========================
 # SMTP (ENV'den okunur)
 # =========================
@@ -57,16 +71,22 @@ SMTP_PORT   = int(os.getenv("SMTP_PORT", "587") or "587")
 SMTP_USER   = os.getenv("SMTP_USER", "")
 SMTP_PASS   = os.getenv("SMTP_PASS", "")
 FROM_EMAIL  = os.getenv("FROM_EMAIL", SMTP_USER or "")
+SMTP_STARTTLS = (os.getenv("SMTP_STARTTLS", "1") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+# Ek sınırı: ZIP bundan büyükse ek yerine indirme bağlantısı gönderilir
+EMAIL_ATTACH_MAX_BYTES = int(float(os.getenv("EMAIL_ATTACH_MAX_MB", "10") or "10") * 1024 * 1024)
+EMAIL_MAX_ATTEMPTS     = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5") or "5")
+PUBLIC_BASE_URL        = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")   # e-postadaki bağlantılar için
 
 def smtp_config_ok() -> bool:
-    return all([SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS, FROM_EMAIL])
+    # SMTP_USER boşsa AUTH yapılmaz (ör. yerel hata ayıklama sunucusu)
+    return all([SMTP_SERVER, SMTP_PORT, FROM_EMAIL]) and (not SMTP_USER or bool(SMTP_PASS))
 
 def _missing_smtp_fields():
     missing = []
     if not SMTP_SERVER: missing.append("SMTP_SERVER")
     if not SMTP_PORT:   missing.append("SMTP_PORT")
-    if not SMTP_USER:   missing.append("SMTP_USER")
-    if not SMTP_PASS:   missing.append("SMTP_PASS")
+    if SMTP_USER and not SMTP_PASS: missing.append("SMTP_PASS")
     if not FROM_EMAIL:  missing.append("FROM_EMAIL")
     return missing
 # =========================
@@ -87,8 +107,76 @@ if os.path.isdir(STATIC_DIR):
 # =========================
 # Paylaşılan Durum
 # =========================
+# Birden çok HTTP worker'ı (gunicorn -w N / uvicorn --workers N) desteklenir:
+# RUNS yalnızca bu sürecin başlattığı run'ları tutar; süreçler arası ortak
+# durum REGISTRY (durum, çıktılar, stop istekleri), QUEUE ve run.log
+# dosyalarıdır. Bağlantılar fork'tan sonra, startup'ta açılır.
 LOCK = threading.RLock()
-RUNS = {}  # run_id -> dict
+RUNS = {}  # run_id -> dict (bu sürecin canlı ve yakın zamanda bitmiş run'ları; gerisi REGISTRY'de)
+OWNER = None   # bu sürecin kimliği (host:pid)
+
+# Kalıcı run kayıt defteri (LOCK ile korunur); bitmiş run RUN_TTL_SECONDS sonra bellekten düşer
+REGISTRY_DB_PATH = os.path.join(OUTPUTS_DIR, "runs.sqlite")
+REGISTRY = None
+RUN_TTL_SECONDS = float(os.getenv("RUN_TTL_SECONDS", "600") or "600")
+EVICT_INTERVAL_SECONDS = 30
+RUNS_PAGE_MAX = 500
+
+# Başka worker'a gelen /stop isteklerinin yoklanma aralığı; başka worker'ın
+# run'ını izleyen /stream'in run.log'u yoklama aralığı
+STOP_POLL_SECONDS = float(os.getenv("STOP_POLL_SECONDS", "1") or "1")
+REMOTE_TAIL_POLL_SECONDS = float(os.getenv("REMOTE_TAIL_POLL_SECONDS", "0.5") or "0.5")
+
+# /run-upload boyut sınırı
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "512") or "512") * 1024 * 1024)
+
+# Sıcak worker havuzu: import'lar, istemci ve bağlantı havuzu işler arasında korunur
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "2") or "2")
+WORKER_MAX_JOBS  = int(os.getenv("WORKER_MAX_JOBS", "50") or "50")
+POOL = WorkerPool(
+    WORKER_POOL_SIZE,
+    cmd=["python", "-u", WORKER_PATH],
+    env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    max_jobs=WORKER_MAX_JOBS,
+)
+
+# E-posta kuyruğu: tek gönderici thread'i, yeniden kullanılan SMTP bağlantısı
+MAIL = MailQueue(
+    SMTP_SERVER, SMTP_PORT,
+    user=SMTP_USER, password=SMTP_PASS, from_email=FROM_EMAIL, starttls=SMTP_STARTTLS,
+    max_attempts=EMAIL_MAX_ATTEMPTS, attach_max_bytes=EMAIL_ATTACH_MAX_BYTES,
+    on_result=lambda run_id, status, info: _email_result(run_id, status, info),
+)
+
+# Kalıcı iş kuyruğu: tüm HTTP worker süreçlerinde toplam en fazla MAX_CONCURRENT_RUNS
+# run çalışır (sınır kuyruk veritabanında uygulanır), gerisi bekler
+MAX_CONCURRENT_RUNS = max(1, int(os.getenv("MAX_CONCURRENT_RUNS", str(max(1, WORKER_POOL_SIZE))) or "1"))
+QUEUE_DB_PATH = os.path.join(OUTPUTS_DIR, "jobs.sqlite")
+QUEUE    = None
+DISPATCH = threading.Condition()   # QUEUE bağlantısını ve ACTIVE'i korur
+SUBMIT   = threading.Lock()        # süreç içinde "var mı? yoksa başlat"ı sıralar (süreçler arası: registry index'leri)
+ACTIVE   = set()                   # çalışan run_id'ler
+
+# SSE: boşta bağlantıya heartbeat aralığı; yeni satır gelince kısa toplama penceresi
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15") or "15")
+SSE_COALESCE_SECONDS  = float(os.getenv("SSE_COALESCE_MS", "50") or "50") / 1000
+
+@app.on_event("startup")
+def _start_pool():
+    global OWNER, QUEUE, REGISTRY
+    OWNER = processOwner()
+    QUEUE = openQueue(QUEUE_DB_PATH)
+    REGISTRY = openRegistry(REGISTRY_DB_PATH)
+    POOL.start()
+    MAIL.start()
+    restore_queue()
+    threading.Thread(target=_dispatcher, daemon=True).start()
+    threading.Thread(target=_housekeeping, daemon=True).start()
+
+@app.on_event("shutdown")
+def _close_pool():
+    POOL.close()
+    MAIL.close()
 
 # =========================
 # Yardımcılar
@@ -102,37 +190,39 @@ def is_truthy(val) -> bool:
     s = str(val).strip().lower()
     return s in {"1", "true", "yes", "y", "on", "evet"}
 
-def zip_dir(src_dir: str, zip_path: str):
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for root, _, files in os.walk(src_dir):
-            for f in files:
-                full = os.path.join(root, f)
-                rel = os.path.relpath(full, src_dir)
-                zf.write(full, arcname=rel)
-
-def send_email_with_attachment(to_email: str, subject: str, body: str, attachment_path: Optional[str]):
-    if not smtp_config_ok():
-        raise RuntimeError("SMTP yapılandırması eksik (SMTP_* ENV değişkenlerini kontrol edin).")
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = FROM_EMAIL
-    msg["To"] = to_email
-    msg.set_content(body)
-
-    if attachment_path and os.path.exists(attachment_path):
-        with open(attachment_path, "rb") as f:
-            data = f.read()
-        fname = os.path.basename(attachment_path)
-        msg.add_attachment(data, maintype="application", subtype="octet-stream", filename=fname)
-
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as smtp:
-        try:
-            smtp.ehlo()
-            smtp.starttls()
-        except Exception:
-            pass
-        smtp.login(SMTP_USER, SMTP_PASS)
-        smtp.send_message(msg)
+def parse_concurrency(val) -> Optional[int]:
+    """Payload'daki eşzamanlılık değerini doğrula; boşsa None (script varsayılanı)."""
+    if val is None or str(val).strip() == "":
+        return None
+    n = int(str(val).strip())
+    if n < 1:
+        raise ValueError("concurrency en az 1 olmalı")
+    return n
+
+def parse_batch_size(val) -> Optional[str]:
+    """
+    Toplu mod ayarı: 8 | "8" | "spellcheck=20,grammar=10" | {"spellcheck": 20}.
+    Script'e --batch_size olarak geçecek metni döndürür; boşsa None.
+    """
+    if val is None or (isinstance(val, str) and not val.strip()):
+        return None
+    if isinstance(val, dict):
+        items = [(str(k).strip(), int(v)) for k, v in val.items()]
+    elif isinstance(val, int) or "=" not in str(val):
+        n = int(str(val).strip())
+        if n < 1:
+            raise ValueError("batch_size en az 1 olmalı")
+        return str(n)
+    else:
+        items = []
+        for part in str(val).split(","):
+            if part.strip():
+                k, _, v = part.partition("=")
+                items.append((k.strip(), int(v)))
+    for k, n in items:
+        if k not in SECTION_TAGS or n < 1:
+            raise ValueError(f"Geçersiz batch_size: {k}={n}")
+    return ",".join(f"{k}={n}" for k, n in items) or None
 
 def _fmt_duration(sec: float) -> str:
     s = int(round(sec))
@@ -142,7 +232,7 @@ def _fmt_duration(sec: float) -> str:
     if m: return f"{m} dk {s} sn"
     return f"{s} sn"
 
-def _log_footer(status_text: str, last_file: Optional[str], zip_path: Optional[str], duration_sec: float) -> str:
+def _log_footer(status_text: str, last_file: Optional[str], zip_url: Optional[str], duration_sec: float) -> str:
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     lines = [
         "",
@@ -152,58 +242,20 @@ def _log_footer(status_text: str, last_file: Optional[str], zip_path: Optional[s
     ]
     if last_file:
         lines.append(f"Son dosya: {last_file}")
-    if zip_path:
-        lines.append(f"ZIP: {zip_path}")
+    if zip_url:
+        lines.append(f"ZIP: {zip_url}")
     lines.append("============================================================\n")
     return "\n".join(lines)
 
-def _normalize_line(raw: str) -> str:
-    """Stdout'u kayıpsız döndür; sadece satır başlangıcına kaçan tag'leri kır."""
-    s = raw.replace("\r\n", "\n")
-    if not s.endswith("\n"):
-        s += "\n"
-    for tag in SECTION_TAGS:
-        s = re.sub(rf'(?<!\n)\[{tag}\]', f'\n[{tag}]', s)
-    return s
-
-def _auto_close_sections(run_id: str, text: str) -> str:
-    """Yeni etiket gelmeden önceki etiket kapanmadıysa '[tag] Bitti.' ekle."""
-    st = RUNS[run_id].setdefault("_sec", {"open": None, "closed": set()})
-    out_lines = []
-
-    for rawln in text.splitlines(True):  # satır sonu korunur
-        ln = rawln
-
-        m = re.match(r'^\[(\w+)\]\s*(.*)', ln)
-        if m:
-            tag = m.group(1)
-            rest = m.group(2)
-            if tag in SECTION_TAGS:
-                # önceki açık bölüm kapanmadıysa, kapat
-                if st["open"] and st["open"] != tag and st["open"] not in st["closed"]:
-                    out_lines.append(f"[{st['open']}] Bitti.\n")
-                    st["closed"].add(st["open"])
-
-                # bu satır mevcut tag için Bitti mi?
-                if rest.strip().lower().startswith("bitti"):
-                    st["closed"].add(tag)
-                    if st["open"] == tag:
-                        st["open"] = None
-                else:
-                    st["open"] = tag
-
-        out_lines.append(ln if ln.endswith("\n") else ln + "\n")
-
-    return "".join(out_lines)
-
-
-
 def _email_partial(run_id: str, reason_text: str):
-    """ZIP'i e-postala (varsa). Yalnızca bir kez dener."""
+    """ZIP'i e-posta kuyruğuna bırakır (varsa). Run başına bir kez; gönderim MAIL thread'inde."""
     with LOCK:
         r = RUNS.get(run_id)
-        if not r or r.get("email_sent"):
+        if not r or r.get("email_sent") or r.get("email_queued"):
             return
+        row = getRun(REGISTRY, run_id)
+        if row and row.get("email_to"):
+            r["email_to"] = row["email_to"]   # başka worker'a gelen aynı istek alıcı eklemiş olabilir
         email_to = (r.get("email_to") or "").strip()
         zip_path = r.get("zip")
         tone = r.get("tone", "")
@@ -215,12 +267,12 @@ def _email_partial(run_id: str, reason_text: str):
     # Bilgilendirici atlama logları
     if not email_to:
         with LOCK:
-            RUNS[run_id]["log"] += "\nℹ️ E-posta atlanıyor: alıcı girilmemiş.\n"
+            RUNS[run_id]["log"].append("\nℹ️ E-posta atlanıyor: alıcı girilmemiş.\n")
         return
     if not smtp_config_ok():
         miss = _missing_smtp_fields()
         with LOCK:
-            RUNS[run_id]["log"] += (
+            RUNS[run_id]["log"].append(
                 f"\nℹ️ E-posta atlanıyor: SMTP yapılandırması eksik "
                 f"({', '.join(miss)}).\n"
             )
@@ -234,23 +286,166 @@ def _email_partial(run_id: str, reason_text: str):
         f"TARGET_TONE: {tone}\n"
         f"Çıktı klasörü: {outdir}\n"
         f"Süre: {duration}\n"
-        f"{'ZIP eklendi.' if zip_path else 'ZIP bulunamadı.'}\n\n"
+        f"{ATTACHMENT_SLOT}\n\n"
         f"Sevgiler."
     )
+    MAIL.submit(
+        email_to, subject, body,
+        attachment=(lambda: _email_zip(run_id, outdir, zip_path)) if zip_path else None,
+        link=f"{PUBLIC_BASE_URL}/download/{run_id}",
+        tag=run_id,
+    )
+    with LOCK:
+        RUNS[run_id]["email_queued"] = True
+        RUNS[run_id]["mail_pending"] = True
+        RUNS[run_id]["log"].append(f"\n📧 E-posta kuyruğa alındı: {email_to}\n")
+
+def _email_zip(run_id: str, outdir: str, zip_path: str) -> Optional[str]:
+    """E-posta eki (MAIL thread'inde): önbellekteki arşiv, yoksa şimdi üretilir."""
     try:
-        send_email_with_attachment(email_to, subject, body, zip_path)
-        with LOCK:
-            RUNS[run_id]["email_sent"] = True
-            RUNS[run_id]["log"] += f"\n📧 E-posta gönderildi: {email_to}\n"
+        return buildZip(outdir, zip_path)
     except Exception as e:
+        _email_log(run_id, f"\n⚠️ ZIP hazırlanamadı: {e}\n")
+        return None
+
+def _email_log(run_id: str, text: str):
+    with LOCK:
+        r = RUNS.get(run_id)
+        if r:
+            r["log"].append(text)
+            return
+        row = getRun(REGISTRY, run_id)
+    if row and row.get("log_path"):
+        # run bellekten düşmüş: satır run.log dosyasına tek seferde eklenir
+        with open(row["log_path"], "a", encoding="utf-8") as f:
+            f.write(text)
+
+def _email_result(run_id: str, status: str, info: str):
+    """MAIL kuyruğundan gelen sonuç: run loguna yazılır, gönderildiyse kayıt defterine işlenir."""
+    if status == SENT:
+        _email_log(run_id, f"\n📧 E-posta gönderildi: {info}\n")
         with LOCK:
-            RUNS[run_id]["log"] += f"\n⚠️ E-posta gönderilemedi: {e}\n"
+            if run_id in RUNS:
+                RUNS[run_id]["email_sent"] = True
+                _save_run(run_id)
+            else:
+                row = getRun(REGISTRY, run_id)
+                if row:
+                    saveRun(REGISTRY, run_id, row["status"], email_sent=True)
+    elif status == RETRY:
+        _email_log(run_id, f"\n⚠️ E-posta gönderilemedi, tekrar denenecek: {info}\n")
+    else:
+        _email_log(run_id, f"\n⚠️ E-posta gönderilemedi: {info}\n")
+    if status != RETRY:
+        _mail_done(run_id)
+
+def _mail_done(run_id: str):
+    """E-postanın sonucu belli oldu: run bitmişse log şimdi kapanır (akışlar bu satırı da görür)."""
+    with LOCK:
+        r = RUNS.get(run_id)
+        if not r or not r.pop("mail_pending", False):
+            return
+        close = r.get("finished_at") is not None
+    if close:
+        r["log"].close()
 
 # =========================
 # Çalıştırma
 # =========================
 
-def start_run(json_path: str, target_tone: str, email_to: Optional[str]) -> str:
+def _new_run_entry(job: dict, log: str) -> dict:
+    return {
+        "outdir": job["outdir"],
+        "job": job,
+        "zip": None,
+        "log": RunLog(os.path.join(job["outdir"], RUN_LOG_NAME), log),
+        "status": "queued",
+        "code": None,
+        "last_file": None,
+        "email_to": job.get("email_to"),
+        "tone": job.get("target_tone", ""),
+        "stopped": False,
+        "email_sent": False,
+        "proc": None,
+        "_sec": SectionTracker(),
+        "t0": time.perf_counter(),
+        "queued_at": time.perf_counter(),
+    }
+
+
+def _save_run(run_id: str):
+    """RUNS'taki üst veriyi kayıt defterine yazar (LOCK altında çağrılır)."""
+    r = RUNS[run_id]
+    saveRun(
+        REGISTRY, run_id, r["status"],
+        outdir=r["outdir"],
+        json_path=r["job"].get("json_path"),
+        tone=r.get("tone"),
+        email_to=r.get("email_to"),
+        email_sent=r.get("email_sent"),
+        code=r.get("code"),
+        zip=r.get("zip"),
+        last_file=r.get("last_file"),
+        log_path=r["log"].path,
+        owner=OWNER,
+        run_key=r["job"].get("run_key"),
+        idem_key=r["job"].get("idem_key"),
+        design_name=r["job"].get("design_name"),
+    )
+
+def _finish_run(run_id: str):
+    """
+    Run tamamen bitti: son durum diske yazılır, TTL sayacı başlar. Akışlar
+    kapanır; e-posta kuyruktaysa log gönderim sonucu yazılınca kapanır (_mail_done).
+    """
+    with LOCK:
+        r = RUNS[run_id]
+        r["finished_at"] = time.time()
+        r["proc"] = None
+        _save_run(run_id)
+        pending = r.get("mail_pending", False)
+    if not pending:
+        r["log"].close()
+
+def _housekeeping():
+    """
+    Başka worker'lara gelen /stop isteklerini uygular; bitmiş run'ları
+    RUN_TTL_SECONDS sonra bellekten düşürür (logu run.log'da kalır).
+    """
+    last_evict = time.monotonic()
+    while True:
+        time.sleep(STOP_POLL_SECONDS)
+        try:
+            with LOCK:
+                wanted = [run_id for run_id in stopRequests(REGISTRY, OWNER)
+                          if run_id in RUNS and not RUNS[run_id]["stopped"]]
+            for run_id in wanted:
+                _stop_local(run_id)
+            if time.monotonic() - last_evict >= EVICT_INTERVAL_SECONDS:
+                last_evict = time.monotonic()
+                evict_finished()
+        except Exception as e:
+            print(f"[runs] Bakım hatası: {e}", flush=True)
+
+def evict_finished(ttl: Optional[float] = None) -> int:
+    ttl = RUN_TTL_SECONDS if ttl is None else ttl
+    now = time.time()
+    with LOCK:
+        old = [
+            run_id for run_id, r in RUNS.items()
+            if r.get("finished_at") is not None and now - r["finished_at"] >= ttl
+            and not r.get("mail_pending")   # gönderim sonucu bekleniyor (denemeler sınırlı)
+        ]
+        logs = [RUNS.pop(run_id)["log"] for run_id in old]
+    for log in logs:
+        log.persist()   # açık akışlar aynı nesneden dosya üzerinden okumaya devam eder
+    return len(old)
+
+def start_run(json_path: str, target_tone: str, email_to: Optional[str], concurrency: Optional[int] = None,
+              batch_size: Optional[str] = None, design_sha256: Optional[str] = None,
+              run_key: Optional[str] = None, idem_key: Optional[str] = None,
+              design_name: Optional[str] = None, baseline: Optional[dict] = None) -> str:
+    """Run'ı kuyruğa ekler ve run_id döndürür; çalıştırmayı dağıtıcı başlatır."""
     # --- benzersiz run_id ---
     ts  = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     rid = uuid.uuid4().hex[:6]
@@ -263,136 +458,369 @@ def start_run(json_path: str, target_tone: str, email_to: Optional[str]) -> str:
     output_csv_path   = os.path.join(outdir, "result.csv")
     messages_csv_path = os.path.join(outdir, "messages.csv")
 
-    # Başlangıç logu
-    with LOCK:
-        RUNS[run_id] = {
-            "outdir": outdir,
-            "zip": None,
-            "log": (
-                "🚀 Başlatıldı\n"
-                f"TARGET_TONE={target_tone}\n"
-                f"JSON: {json_path}\n"
-                f"OUTPUT_CSV: {output_csv_path}\n"
-                f"MESSAGES_CSV: {messages_csv_path}\n"
-            ),
-            "status": "running",
-            "code": None,
-            "last_file": None,
-            "email_to": email_to,
-            "tone": target_tone,
-            "stopped": False,
-            "email_sent": False,
-            "proc": None,
-            "_sec": {"open": None, "closed": set()},
-            "t0": time.perf_counter(),
-        }
-        RUNS[run_id]["log"] += "\n"
-
-    # Komut
-    cmd = [
-        "python", "-u", SCRIPT_PATH,
+    # Komut (worker'da spellcheck.main(argv) olarak çalışır)
+    argv = [
         "--json", json_path,
         "--output_csv", output_csv_path,
         "--messages_csv", messages_csv_path,
         "--target_tone", target_tone,
+        "--messages_prepared",   # _prepare_run çıkardı; iş ondan önce kuyruktan alınmaz
     ]
+    if concurrency:
+        argv += ["--concurrency", str(concurrency)]
+    if batch_size:
+        argv += ["--batch_size", batch_size]
+    if baseline:
+        # artımlı kontrol: değişmemiş satırların kararları önceki run'dan devralınır
+        argv += ["--baseline_csv", os.path.join(baseline["outdir"], "result.csv"),
+                 "--baseline_tone", baseline.get("tone") or ""]
+
+    job = {
+        "outdir": outdir,
+        "json_path": json_path,
+        "output_csv": output_csv_path,
+        "messages_csv": messages_csv_path,
+        "target_tone": target_tone,
+        "email_to": email_to,
+        "design_sha256": design_sha256,
+        "run_key": run_key,
+        "idem_key": idem_key,
+        "design_name": design_name,
+        "baseline_run_id": baseline["run_id"] if baseline else None,
+        "argv": argv,
+    }
 
-    def worker():
+    # Başlangıç logu
+    with LOCK:
+        RUNS[run_id] = _new_run_entry(job, (
+            "🚀 Başlatıldı\n"
+            f"TARGET_TONE={target_tone}\n"
+            f"CONCURRENCY={concurrency or 'varsayılan'}\n"
+            f"BATCH_SIZE={batch_size or 'varsayılan'}\n"
+            f"JSON: {json_path}\n"
+            + (f"JSON_SHA256: {design_sha256}\n" if design_sha256 else "")
+            + (f"BASELINE: {baseline['run_id']}\n" if baseline else "")
+            + f"OUTPUT_CSV: {output_csv_path}\n"
+            f"MESSAGES_CSV: {messages_csv_path}\n"
+            "\n"
+        ))
         try:
+            _save_run(run_id)
+        except sqlite3.IntegrityError:
+            # aynı Idempotency-Key ya da run_key başka bir worker'da az önce kaydedildi
+            RUNS.pop(run_id)["log"].close()
+            shutil.rmtree(outdir, ignore_errors=True)
+            raise
+
+    with DISPATCH:
+        enqueueJob(QUEUE, run_id, job, owner=OWNER, prepared=False)
+    threading.Thread(target=_prepare_run, args=(run_id,), daemon=True).start()
+    return run_id
+
+def submit_run(json_path: str, target_tone: str, email_to: Optional[str], concurrency: Optional[int] = None,
+               batch_size: Optional[str] = None, design_sha256: Optional[str] = None,
+               force: bool = False, idem_key: Optional[str] = None,
+               design_name: Optional[str] = None, baseline_run_id: Optional[str] = None) -> dict:
+    """
+    Aynı isteği yeniden çalıştırmadan yanıtlar; {"run_id", "reused"} döndürür:
+      - idem_key daha önce görüldüyse o run ("idempotent");
+      - aynı run_key'le kuyrukta/çalışan run varsa ona bağlanır ("coalesced");
+      - aynı run_key'le başarıyla bitmiş run varsa onun çıktıları ("completed", force ile atlanır).
+    Hiçbiri yoksa yeni run başlatılır (reused=None). baseline_run_id: önceki run
+    (artımlı kontrol); boşsa aynı design_name'in en yeni run'ı, "none" ise kapalı.
+    Geçersiz baseline ValueError.
+    """
+    run_key = runKey(design_sha256, target_tone, SECTION_TAGS) if design_sha256 else None
+    with SUBMIT:
+        found = _find_reusable(run_key, idem_key, force)
+        if found:
+            run_id, reused = found
+            if email_to and reused == "coalesced":
+                _add_email_recipient(run_id, email_to)
+            elif email_to and reused == "completed":
+                _email_reused(run_id, email_to)
+            return {"run_id": run_id, "reused": reused}
+        baseline = _resolve_baseline(baseline_run_id, design_name, auto=not force)
+        try:
+            run_id = start_run(json_path, target_tone, email_to, concurrency, batch_size,
+                               design_sha256, run_key, idem_key, design_name, baseline)
+        except sqlite3.IntegrityError:
+            # başka worker aynı isteği bizden önce kaydetti (idem_key ya da canlı run_key benzersiz)
             with LOCK:
-                RUNS[run_id]["log"] += f"Komut: {' '.join(cmd)}\n\n"
-
-            proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+                row = findRunByIdem(REGISTRY, idem_key) if idem_key else None
+                if row:
+                    return {"run_id": row["run_id"], "reused": "idempotent"}
+                live = findRunByKey(REGISTRY, run_key, ("queued", "running")) if run_key else None
+            if live is None:
+                raise
+            if email_to:
+                _add_email_recipient(live["run_id"], email_to)
+            return {"run_id": live["run_id"], "reused": "coalesced"}
+    return {"run_id": run_id, "reused": None}
+
+def _resolve_baseline(baseline_run_id: Optional[str], design_name: Optional[str], auto: bool = True):
+    """Artımlı kontrolün temel alacağı run'ın kayıt satırı (yoksa None)."""
+    wanted = (baseline_run_id or "").strip()
+    if wanted.lower() == "none":
+        return None
+    with LOCK:
+        if wanted:
+            row = getRun(REGISTRY, wanted)
+            candidates = [row] if row else []
+        elif auto and design_name:
+            candidates = findBaselineCandidates(REGISTRY, design_name)
+        else:
+            candidates = []
+    for row in candidates:
+        if row["status"] in FINAL_STATUSES and row["outdir"] and \
+                os.path.exists(os.path.join(row["outdir"], "result.csv")):
+            return row
+    if wanted:
+        raise ValueError(f"Baseline run kullanılamıyor (bitmemiş ya da result.csv yok): {wanted}")
+    return None
+
+def _find_reusable(run_key: Optional[str], idem_key: Optional[str], force: bool = False):
+    with LOCK:
+        if idem_key:
+            row = findRunByIdem(REGISTRY, idem_key)
+            if row:
+                return row["run_id"], "idempotent"
+        if not run_key:
+            return None
+        live = findRunByKey(REGISTRY, run_key, ("queued", "running"))
+        if live and (live["run_id"] in RUNS or (live["owner"] and ownerAlive(live["owner"]))):
+            return live["run_id"], "coalesced"
+        # force yalnızca tamamlanmış run'ı atlar: aynı run_key'le ikinci canlı run açılamaz
+        done = None if force else findRunByKey(REGISTRY, run_key, ("ok",))
+    if done and done["outdir"] and os.path.exists(os.path.join(done["outdir"], "result.csv")):
+        return done["run_id"], "completed"
+    return None
+
+def _add_email_recipient(run_id: str, email_to: str):
+    """
+    Sürmekte olan run'a bağlanan isteğin alıcısı da run bitince e-postayı alır.
+    Alıcı kayıt defterine yazılır; run başka worker'daysa sahibi göndermeden önce okur.
+    """
+    with LOCK:
+        r = RUNS.get(run_id)
+        merged = addEmailRecipient(REGISTRY, run_id, email_to)
+        if not r or merged is None or email_to in splitRecipients(r.get("email_to")):
+            return
+        r["email_to"] = merged
+        r["log"].append(f"\n📧 Aynı istek tekrar geldi; e-posta alıcısı eklendi: {email_to}\n")
+
+def _email_reused(run_id: str, email_to: str):
+    """Tamamlanmış run'ın çıktısını yeni isteğin alıcısına gönderir (run yeniden çalışmaz)."""
+    if not smtp_config_ok():
+        return
+    with LOCK:
+        r = RUNS.get(run_id) or getRun(REGISTRY, run_id)
+        outdir, zip_path, tone = r["outdir"], r.get("zip"), r.get("tone", "")
+    body = (
+        f"Merhaba,\n\n"
+        f"Aynı tasarım ve hedef ton için daha önce tamamlanmış çalışmanın çıktısı.\n"
+        f"run_id: {run_id}\n"
+        f"TARGET_TONE: {tone}\n"
+        f"Çıktı klasörü: {outdir}\n"
+        f"{ATTACHMENT_SLOT}\n\n"
+        f"Sevgiler."
+    )
+    MAIL.submit(
+        email_to, f"AIcheckUP çıktısı (ok) - {run_id}", body,
+        attachment=(lambda: _email_zip(run_id, outdir, zip_path)) if zip_path else None,
+        link=f"{PUBLIC_BASE_URL}/download/{run_id}",
+        tag=run_id,
+    )
+
+def _prepare_run(run_id: str):
+    """
+    messages.csv'yi kuyrukta beklerken çıkarır: satır sayısı işin boyutudur
+    (kısa iş önce sıralaması). İş bu bitene kadar kuyruktan alınmaz; worker
+    hazır CSV'yi kullanır (--messages_prepared), çıkarımı tekrar yapmaz.
+    Çıkarım başarısızsa yarım CSV silinir, çıkarımı worker yapar.
+    """
+    with LOCK:
+        job = RUNS[run_id]["job"]
+    size = None
+    try:
+        results = runExtractors(job["json_path"], job["messages_csv"], EXTRACTORS)
+        failed = next((res["error"] for res in results if res["error"] is not None), None)
+        if failed is not None:
+            raise failed
+        size = sum(res["added"] for res in results)
+    except Exception as e:
+        try:
+            os.remove(job["messages_csv"])
+        except FileNotFoundError:
+            pass
+        with LOCK:
+            RUNS[run_id]["log"].append(f"⚠️ Ön çıkarım yapılamadı (boyut bilinmiyor): {e}\n")
+    with DISPATCH:
+        markPrepared(QUEUE, run_id, size)
+        pos = queuePosition(QUEUE, run_id)
+        DISPATCH.notify_all()
+    if size is None:
+        return
+    if pos is not None:
+        with LOCK:
+            RUNS[run_id]["log"].append(f"🕒 Kuyrukta: {size} satır, sıra {pos} (aynı anda en fazla {MAX_CONCURRENT_RUNS} run)\n")
+
+def _dispatcher():
+    """
+    Kuyruktan iş alıp MAX_CONCURRENT_RUNS (süreçler arası toplam) sınırına kadar
+    çalıştırır. Başka süreçte biten iş ya da sıradaki işin sahibi olma durumu
+    bildirim göndermez; en geç bekleme aralığı (5 sn) sonunda görülür.
+    """
+    while True:
+        with DISPATCH:
+            job = None
+            while job is None:
+                job = claimNextJob(QUEUE, owner=OWNER, max_running=MAX_CONCURRENT_RUNS)
+                if job is None:
+                    DISPATCH.wait(timeout=5)
+            run_id = job[0]
+            ACTIVE.add(run_id)
+        threading.Thread(target=_execute_run, args=(run_id,), daemon=True).start()
+
+def restore_queue():
+    """Açılışta kalıcı kuyruktaki (ve yarıda kalan) işleri RUNS'a geri yükler."""
+    with DISPATCH:
+        requeued = requeueRunning(QUEUE, owner=OWNER)   # sahibi ölmüş işleri de devralır
+        pending = pendingJobs(QUEUE, owner=OWNER)
+        unprepared = unpreparedJobs(QUEUE, owner=OWNER)
+    with LOCK:
+        for run_id, job, size in pending:
+            if run_id in RUNS:
+                continue
+            RUNS[run_id] = _new_run_entry(job, (
+                "♻️ Sunucu yeniden başladı; run kuyruktan devam edecek.\n"
+                f"JSON: {job.get('json_path')}\n"
+                f"OUTPUT_CSV: {job.get('output_csv')}\n\n"
+            ))
+            _save_run(run_id)
+        abandoned = abandonUnfinished(REGISTRY, owner=OWNER, keep=[run_id for run_id, _, _ in pending])
+    for run_id in unprepared:   # hazırlık yarıda kaldı: baştan (çıkarım tekilleştirir)
+        threading.Thread(target=_prepare_run, args=(run_id,), daemon=True).start()
+    if abandoned:
+        print(f"[runs] Yarıda kalan {abandoned} run 'error' olarak kapatıldı.", flush=True)
+    if pending:
+        print(f"[queue] {len(pending)} iş geri yüklendi ({requeued} tanesi yarıda kalmıştı).", flush=True)
+
+def _execute_run(run_id: str):
+    with LOCK:
+        job = RUNS[run_id]["job"]
+        if RUNS[run_id]["stopped"]:   # kuyruktan çıkarken durduruldu
+            RUNS[run_id]["status"] = "stopped"
+            RUNS[run_id]["log"].append(_log_footer("Durduruldu", None, None, 0))
+            stopped = True
+        else:
+            stopped = False
+    if stopped:
+        with DISPATCH:
+            ACTIVE.discard(run_id)
+            finishJob(QUEUE, run_id)
+            DISPATCH.notify_all()
+        _finish_run(run_id)
+        return
+    with LOCK:
+        RUNS[run_id]["status"] = "running"
+        RUNS[run_id]["t0"] = time.perf_counter()
+        waited = RUNS[run_id]["t0"] - RUNS[run_id]["queued_at"]
+        RUNS[run_id]["log"].append(f"▶️ Kuyruktan çıktı ({_fmt_duration(waited)} bekledi), çalışıyor.\n")
+        _save_run(run_id)
+    outdir = job["outdir"]
+    output_csv_path = job["output_csv"]
+    argv = job["argv"]
+    try:
+        _run_job(run_id, outdir, output_csv_path, argv)
+    finally:
+        with DISPATCH:
+            ACTIVE.discard(run_id)
+            finishJob(QUEUE, run_id)
+            DISPATCH.notify_all()
+        _finish_run(run_id)   # e-posta kuyruğa alındı; gönderim sonucu MAIL thread'inden loglanır
+
+def _run_job(run_id: str, outdir: str, output_csv_path: str, argv: list):
+    try:
+        proc, warm = POOL.acquire()
+        with LOCK:
+            RUNS[run_id]["proc"] = proc
+            log = RUNS[run_id]["log"]
+            log.append(
+                f"Worker: pid={proc.pid} ({'sıcak' if warm else 'soğuk başlatıldı'})\n"
+                f"Komut: {SCRIPT_NAME} {' '.join(argv)}\n\n"
             )
-            with LOCK:
-                RUNS[run_id]["proc"] = proc
-
-            # satır kaçırmaya dayanıklı okuma
-            while True:
-                line = proc.stdout.readline()
-                if not line:
-                    if proc.poll() is not None:
-                        tail = proc.stdout.read() or ""
-                        if tail:
-                            tail = _auto_close_sections(run_id, _normalize_line(tail))
-                            with LOCK:
-                                prefix = "" if RUNS[run_id]["log"].endswith("\n") else "\n"
-                                RUNS[run_id]["log"] += prefix + tail
-                        break
-                    time.sleep(0.01)
-                    continue
+        POOL.submit(proc, argv)
 
-                line = _auto_close_sections(run_id, _normalize_line(line))
+        # iş bitti işaretine (ya da worker ölürse EOF'a) kadar blok blok oku;
+        # RunLog kendi kilidini kullanır, global LOCK gerekmez
+        sections = RUNS[run_id]["_sec"]
+        code = POOL.readJobOutput(proc, lambda text: log.appendLine(sections.feed(normalizeBlock(text))))
+
+        with LOCK:
+            stopped = RUNS[run_id]["stopped"]
+            RUNS[run_id]["proc"] = None
+        POOL.release(proc, reusable=not stopped)
+
+        # Durdurma/çökme: store'da commit edilmiş son durumu result.csv'ye aktar
+        if code != 0:
+            try:
+                exportStoreFile(storePathFor(output_csv_path), output_csv_path)
+            except Exception as e:
                 with LOCK:
-                    prefix = "" if RUNS[run_id]["log"].endswith("\n") else "\n"
-                    RUNS[run_id]["log"] += prefix + line
-
-            code = proc.wait()
-
-            # Üretilen dosyalar
-            produced = []
-            for root, _, files in os.walk(outdir):
-                for f in files:
-                    produced.append(os.path.join(root, f))
-            last_file = max(produced, key=os.path.getmtime) if produced else None
-            zip_path = None
-            if produced:
-                zip_path = os.path.join(OUTPUTS_DIR, f"{run_id}.zip")
-                zip_dir(outdir, zip_path)
-
-            # Açık kalan bölüm varsa kapat
-            with LOCK:
-                st = RUNS[run_id].setdefault("_sec", {"open": None, "closed": set()})
-                if st["open"] and st["open"] not in st["closed"]:
-                    RUNS[run_id]["log"] += f"\n[{st['open']}] Bitti.\n"
-                    st["closed"].add(st["open"])
-                st["open"] = None
+                    RUNS[run_id]["log"].append(f"\n⚠️ result.csv dışa aktarılamadı: {e}\n")
 
-            # Durum
-            with LOCK:
-                RUNS[run_id]["code"] = code
-                RUNS[run_id]["last_file"] = last_file
-                if zip_path:
-                    RUNS[run_id]["zip"] = zip_path
-                t0 = RUNS[run_id]["t0"]
-            duration = time.perf_counter() - t0
+        # Üretilen dosyalar
+        produced = []
+        for root, _, files in os.walk(outdir):
+            for f in files:
+                if isStoreFile(f) or f == RUN_LOG_NAME:
+                    continue
+                produced.append(os.path.join(root, f))
+        last_file = max(produced, key=os.path.getmtime) if produced else None
+        # ZIP burada sıkıştırılmaz: /download klasörden akıtır, ilk tam indirme
+        # outputs/<run_id>.zip önbelleğini oluşturur
+        zip_path = os.path.join(OUTPUTS_DIR, f"{run_id}.zip") if produced else None
+        zip_url = f"/download/{run_id}" if produced else None
 
-            if code == 0:
+        # Açık kalan bölüm varsa kapat
+        log.append(sections.finish())
+
+        # Durum
+        with LOCK:
+            RUNS[run_id]["code"] = code
+            RUNS[run_id]["last_file"] = last_file
+            if zip_path:
+                RUNS[run_id]["zip"] = zip_path
+            t0 = RUNS[run_id]["t0"]
+        duration = time.perf_counter() - t0
+
+        if code == 0:
+            with LOCK:
+                RUNS[run_id]["status"] = "ok"
+                RUNS[run_id]["log"].append(_log_footer("Başarı", last_file, zip_url, duration))
+            _email_partial(run_id, "başarıyla tamamlandı")
+        else:
+            with LOCK:
+                was_stopped = RUNS[run_id]["stopped"]
+            if was_stopped:
                 with LOCK:
-                    RUNS[run_id]["status"] = "ok"
-                    RUNS[run_id]["log"] += _log_footer("Başarı", last_file, zip_path, duration)
-                _email_partial(run_id, "başarıyla tamamlandı")
+                    RUNS[run_id]["status"] = "stopped"
+                    RUNS[run_id]["log"].append(_log_footer("Durduruldu", last_file, zip_url, duration))
+                _email_partial(run_id, "kullanıcı durdurdu")
             else:
                 with LOCK:
-                    was_stopped = RUNS[run_id]["stopped"]
-                if was_stopped:
-                    with LOCK:
-                        RUNS[run_id]["status"] = "stopped"
-                        RUNS[run_id]["log"] += _log_footer("Durduruldu", last_file, zip_path, duration)
-                    _email_partial(run_id, "kullanıcı durdurdu")
-                else:
-                    with LOCK:
-                        RUNS[run_id]["status"] = "error"
-                        RUNS[run_id]["log"] += _log_footer("Hata", last_file, zip_path, duration)
-                    _email_partial(run_id, "yarıda kesildi")
-
-        except Exception as e:
-            with LOCK:
-                RUNS[run_id]["status"] = "error"
-                t0 = RUNS[run_id].get("t0", time.perf_counter())
-                duration = time.perf_counter() - t0
-                RUNS[run_id]["log"] += f"\n❌ İstisna: {e}\n" + _log_footer("Hata", None, None, duration)
-            _email_partial(run_id, "yarıda kesildi")
+                    RUNS[run_id]["status"] = "error"
+                    RUNS[run_id]["log"].append(_log_footer("Hata", last_file, zip_url, duration))
+                _email_partial(run_id, "yarıda kesildi")
 
-    threading.Thread(target=worker, daemon=True).start()
-    return run_id
+    except Exception as e:
+        with LOCK:
+            RUNS[run_id]["status"] = "error"
+            t0 = RUNS[run_id].get("t0", time.perf_counter())
+            duration = time.perf_counter() - t0
+            RUNS[run_id]["log"].append(f"\n❌ İstisna: {e}\n" + _log_footer("Hata", None, None, duration))
+        _email_partial(run_id, "yarıda kesildi")
 
 # =========================
 # HTTP Endpoints
@@ -406,78 +834,184 @@ def home():
             return HTMLResponse(f.read())
     return HTMLResponse("<h1>AIcheckUP</h1><p>UI için static/index.html yükleyin.</p>")
 
+def _idempotency_key(request: Optional[Request], value: Optional[str]) -> Optional[str]:
+    key = (request.headers.get("Idempotency-Key") if request is not None else None) or value or ""
+    return key.strip()[:200] or None
+
 @app.post("/run")
-async def run_local(payload: dict):
+async def run_local(payload: dict, request: Request):
     input_mode   = (payload.get("input_mode") or "").lower()
     json_path    = payload.get("json_path") or ""
     target_tone  = payload.get("target_tone") or ""
     email_enabled= is_truthy(payload.get("email_enabled"))
     email_to     = (payload.get("email_to") or "").strip()
+    try:
+        concurrency = parse_concurrency(payload.get("concurrency"))
+    except ValueError:
+        return JSONResponse({"error": "Geçersiz concurrency"}, status_code=400)
+    try:
+        batch_size = parse_batch_size(payload.get("batch_size"))
+    except (ValueError, TypeError):
+        return JSONResponse({"error": "Geçersiz batch_size"}, status_code=400)
     if input_mode != "local":
         return JSONResponse({"error": "input_mode=local bekleniyor"}, status_code=400)
     if not json_path or not os.path.exists(json_path):
         return JSONResponse({"error": "Geçersiz JSON yolu"}, status_code=400)
     if not target_tone:
         return JSONResponse({"error": "TARGET_TONE boş olamaz"}, status_code=400)
-    run_id = start_run(json_path, target_tone, email_to if (email_enabled and email_to) else None)
-    return {"run_id": run_id}
+    design_sha256 = await asyncio.to_thread(fileSha256, json_path)
+    try:
+        return await asyncio.to_thread(
+            submit_run, json_path, target_tone, email_to if (email_enabled and email_to) else None,
+            concurrency, batch_size, design_sha256,
+            is_truthy(payload.get("force")), _idempotency_key(request, payload.get("idempotency_key")),
+            os.path.abspath(json_path), payload.get("baseline_run_id"),
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
 
 @app.post("/run-upload")
 async def run_upload(
+    request: Request,
     file_json: UploadFile = File(...),
     target_tone: str = Form(...),
     email_enabled: str = Form("false"),
     email_to: str = Form(""),
+    concurrency: str = Form(""),
+    batch_size: str = Form(""),
+    force: str = Form("false"),
+    idempotency_key: str = Form(""),
+    baseline_run_id: str = Form(""),
 ):
-    # Yüklenen JSON'u outputs altına al
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    tmp_dir = os.path.join(OUTPUTS_DIR, f"uploaded_{ts}")
-    os.makedirs(tmp_dir, exist_ok=True)
-    json_dest = os.path.join(tmp_dir, file_json.filename)
-    with open(json_dest, "wb") as f:
-        shutil.copyfileobj(file_json.file, f)
+    try:
+        conc = parse_concurrency(concurrency)
+    except ValueError:
+        return JSONResponse({"error": "Geçersiz concurrency"}, status_code=400)
+    try:
+        batch = parse_batch_size(batch_size)
+    except (ValueError, TypeError):
+        return JSONResponse({"error": "Geçersiz batch_size"}, status_code=400)
+
+    # İstemci tekrarı: dosyayı yeniden almadan aynı run
+    idem_key = _idempotency_key(request, idempotency_key)
+    found = _find_reusable(None, idem_key) if idem_key else None
+    if found:
+        return {"run_id": found[0], "reused": found[1]}
+
+    # Yüklenen JSON'u parça parça (event loop'u bloklamadan) outputs/uploads altına al
+    try:
+        upload = await saveUpload(file_json, UPLOADS_DIR, max_bytes=UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
 
     enabled = is_truthy(email_enabled)
     to_addr = (email_to or "").strip()
-    run_id = start_run(json_dest, target_tone, to_addr if (enabled and to_addr) else None)
-    return {"run_id": run_id}
+    try:
+        result = await asyncio.to_thread(
+            submit_run, upload["path"], target_tone, to_addr if (enabled and to_addr) else None, conc, batch,
+            upload["sha256"], is_truthy(force), idem_key, f"upload:{upload['name']}", baseline_run_id,
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return {**result, "sha256": upload["sha256"]}
+
+def _sse_frame(text: str, offset: int, final: bool):
+    """
+    Okunan metindeki tüm tam satırları tek SSE olayında birleştirir (satır
+    başına bir "data:" alanı); olay id'si son satır sonunun bayt ofsetidir.
+    Yarım kalan son satır (final değilse) sonraki okumaya kalır.
+    (olay ya da None, tüketilen_ofset) döndürür.
+    """
+    cut = len(text) if final else text.rfind("\n") + 1
+    if cut <= 0:
+        return None, offset
+    body = text[:cut]
+    offset += len(body.encode("utf-8"))
+    if body.endswith("\n"):
+        body = body[:-1]
+    data = "".join(f"data: {ln}\n" for ln in body.replace("\r", "").split("\n"))
+    return f"id: {offset}\n{data}\n", offset
+
+async def _tail_local(log: RunLog, pos: int, request: Request):
+    """Bu süreçteki run: yeni satırlar RunLog bildirimiyle itilir."""
+    while True:
+        text, end = log.readFrom(pos)
+        final = log.closed and end >= log.size
+        frame, pos = _sse_frame(text, pos, final)
+        if frame is None and end - pos >= READ_LIMIT - 4:
+            frame, pos = _sse_frame(text, pos, True)   # satır sonu içermeyen dev parça
+        if frame:
+            yield frame
+        if end < log.size:
+            continue   # okunacak daha çok veri var
+        if final:
+            break
+        if await request.is_disconnected():
+            break
+        if await log.waitBeyond(end, SSE_HEARTBEAT_SECONDS):
+            await asyncio.sleep(SSE_COALESCE_SECONDS)   # art arda gelen satırları tek olayda topla
+        else:
+            yield ": ping\n\n"   # proxy'ler boşta bağlantıyı kesmesin; kopmuş istemci burada düşer
+
+async def _tail_file(run_id: str, path: str, pos: int, request: Request):
+    """
+    Başka worker'ın (ya da bellekten düşmüş) run'ı: run.log dosyası yoklanır,
+    bitiş kayıt defterindeki durumdan anlaşılır.
+    """
+    idle = 0.0
+    while True:
+        with LOCK:
+            row = getRun(REGISTRY, run_id)
+        done = not row or row["status"] in FINAL_STATUSES   # bitmişse log dosyası tamdır
+        text, end = readFileFrom(path, pos)
+        at_eof = end - pos < READ_LIMIT - 4
+        frame, pos = _sse_frame(text, pos, done and at_eof)
+        if frame is None and not at_eof:
+            frame, pos = _sse_frame(text, pos, True)   # satır sonu içermeyen dev parça
+        if frame:
+            idle = 0.0
+            yield frame
+        if not at_eof:
+            continue
+        if done:
+            break
+        if await request.is_disconnected():
+            break
+        await asyncio.sleep(REMOTE_TAIL_POLL_SECONDS)
+        idle += REMOTE_TAIL_POLL_SECONDS
+        if idle >= SSE_HEARTBEAT_SECONDS:
+            idle = 0.0
+            yield ": ping\n\n"
 
 @app.get("/stream/{run_id}")
-def stream(run_id: str):
-    if run_id not in RUNS:
+async def stream(run_id: str, request: Request):
+    with LOCK:
+        r = RUNS.get(run_id)
+        log = r["log"] if r else None
+        stored = None if r else getRun(REGISTRY, run_id)
+    if log is None and (not stored or not stored.get("log_path")):
         return JSONResponse({"error": "run_id bulunamadı"}, status_code=404)
 
-    def event_gen():
-        last_len = 0
-        # ilk chunk: o ana kadarki log
-        with LOCK:
-            data = RUNS[run_id]["log"]
-        yield f"data: {data}\n\n"
-        last_len = len(data)
-
-        while True:
-            time.sleep(0.25)
-            with LOCK:
-                r = RUNS.get(run_id)
-                if not r:
-                    break
-                buf = r["log"]
-                status = r["status"]
-            if len(buf) > last_len:
-                chunk = buf[last_len:]
-                last_len = len(buf)
-                for part in chunk.splitlines(True):
-                    yield f"data: {part}\n\n"
-
-            if status in ("ok", "error", "stopped"):
-                break
-
-    return StreamingResponse(event_gen(), media_type="text/event-stream")
+    # Yeniden bağlanan istemci kaldığı ofsetten devam eder
+    try:
+        offset = max(0, int(request.headers.get("last-event-id") or 0))
+    except ValueError:
+        offset = 0
+
+    if log is not None:
+        events = _tail_local(log, offset, request)
+    else:
+        events = _tail_file(run_id, stored["log_path"], offset, request)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/status/{run_id}")
 def status(run_id: str):
     with LOCK:
-        r = RUNS.get(run_id)
+        r = RUNS.get(run_id) or getRun(REGISTRY, run_id)
         if not r:
             return JSONResponse({"error": "run_id bulunamadı"}, status_code=404)
         payload = {
@@ -485,21 +1019,84 @@ def status(run_id: str):
             "zip": bool(r.get("zip")),
             "last_file": bool(r.get("last_file")),
         }
+    if payload["status"] == "queued":
+        with DISPATCH:
+            positions = queuePositions(QUEUE)
+        payload["queue_position"] = positions.get(run_id)
+        payload["queue_length"] = len(positions)
     return payload
 
+@app.get("/runs")
+def list_runs(status: Optional[str] = None, limit: int = 50, offset: int = 0):
+    """Run geçmişi (en yeni önce), kayıt defterinden sayfalı."""
+    limit = max(1, min(int(limit), RUNS_PAGE_MAX))
+    offset = max(0, int(offset))
+    with LOCK:
+        rows = listRuns(REGISTRY, status=status, limit=limit, offset=offset)
+        total = countRuns(REGISTRY, status=status)
+        live = {row["run_id"]: RUNS[row["run_id"]]["status"] for row in rows if row["run_id"] in RUNS}
+    runs = [
+        {
+            "run_id": row["run_id"],
+            "status": live.get(row["run_id"], row["status"]),
+            "created_at": row["created_at"],
+            "finished_at": row["finished_at"],
+            "tone": row["tone"],
+            "code": row["code"],
+            "zip": bool(row["zip"]),
+            "last_file": bool(row["last_file"]),
+        }
+        for row in rows
+    ]
+    return {"runs": runs, "total": total, "limit": limit, "offset": offset}
+
+def _zip_response(body, filename: str):
+    return StreamingResponse(
+        body,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+def _partial_zip(outdir: str, snapshot_path: str):
+    """Çalışan run: store'daki commit edilmiş satırlar result.csv yerine konur."""
+    try:
+        replace = {}
+        csv_path = os.path.join(outdir, "result.csv")
+        if exportStoreFile(storePathFor(csv_path), snapshot_path):
+            replace["result.csv"] = snapshot_path
+        yield from iterZip(outdir, replace=replace)
+    finally:
+        for path in (snapshot_path, snapshot_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
 @app.get("/download/{run_id}")
 def download_zip(run_id: str):
+    """
+    ZIP klasörden anında akıtılır. Bitmiş run'da ilk tam indirme arşivi
+    outputs/<run_id>.zip olarak önbelleğe alır (klasör değişmedikçe yeniden
+    kullanılır); çalışan run'da o ana kadarki çıktılar kısmi ZIP olarak iner.
+    """
     with LOCK:
-        r = RUNS.get(run_id)
-        if not r or not r.get("zip") or not os.path.exists(r["zip"]):
+        r = RUNS.get(run_id) or getRun(REGISTRY, run_id)
+        if not r:
             return JSONResponse({"error": "ZIP yok"}, status_code=404)
-        path = r["zip"]
-    return FileResponse(path, filename=os.path.basename(path))
+        status, outdir, zip_path = r["status"], r.get("outdir"), r.get("zip")
+    if not outdir or not os.path.isdir(outdir):
+        return JSONResponse({"error": "ZIP yok"}, status_code=404)
+    if status not in FINAL_STATUSES:
+        snapshot_path = os.path.join(OUTPUTS_DIR, f"{run_id}.partial-{uuid.uuid4().hex[:8]}.csv")
+        return _zip_response(_partial_zip(outdir, snapshot_path), f"{run_id}-partial.zip")
+    if not zip_path:
+        return JSONResponse({"error": "ZIP yok"}, status_code=404)
+    if cacheIsFresh(zip_path, outdir):
+        return FileResponse(zip_path, filename=f"{run_id}.zip")
+    return _zip_response(iterZip(outdir, cache_path=zip_path), f"{run_id}.zip")
 
 @app.get("/download-last/{run_id}")
 def download_last(run_id: str):
     with LOCK:
-        r = RUNS.get(run_id)
+        r = RUNS.get(run_id) or getRun(REGISTRY, run_id)
         if not r or not r.get("last_file") or not os.path.exists(r["last_file"]):
             return JSONResponse({"error": "Dosya yok"}, status_code=404)
         path = r["last_file"]
@@ -507,12 +1104,34 @@ def download_last(run_id: str):
 
 @app.post("/stop/{run_id}")
 def stop(run_id: str):
+    with LOCK:
+        local = run_id in RUNS
+        stored = None if local else getRun(REGISTRY, run_id)
+        if stored:
+            requestStop(REGISTRY, run_id)   # sahibi süreç yoklayıp durdurur (bitmişse etkisiz)
+    if local:
+        return _stop_local(run_id)
+    if stored:
+        return {"ok": True}
+    return JSONResponse({"error": "run_id bulunamadı"}, status_code=404)
+
+def _stop_local(run_id: str):
     with LOCK:
         r = RUNS.get(run_id)
         if not r:
-            return JSONResponse({"error": "run_id bulunamadı"}, status_code=404)
+            return {"ok": True}
         r["stopped"] = True
         proc = r.get("proc")
+        queued = r["status"] == "queued"
+    if queued:
+        with DISPATCH:
+            cancelled = cancelJob(QUEUE, run_id)
+        if cancelled:   # hiç başlamadı: worker'a dokunmadan kapat
+            with LOCK:
+                r["status"] = "stopped"
+                r["log"].append("\n⏹ Kuyruktan çıkarıldı.\n" + _log_footer("Durduruldu", None, None, 0))
+            _finish_run(run_id)
+            return {"ok": True}
     try:
         if proc and proc.poll() is None:
             proc.terminate()
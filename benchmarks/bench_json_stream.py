@@ -0,0 +1,78 @@
+# bench_json_stream.py
+"""
+Tasarım JSON'undan messages.csv çıkarımının tepe bellek kullanımı (peak RSS).
+json.load yolunda tepe bellek dosya boyutuyla büyür; akış yolunda
+(DESIGN_JSON_STREAM=1) tasarım boyutundan bağımsız, yaklaşık sabit kalmalı.
+
+Her ölçüm ayrı bir alt süreçte yapılır (ru_maxrss süreç başına tepe değerdir).
+Sentetik tasarım (synth_design), büyük gömülü HTML e-posta şablonları içeren
+EMAIL nodelarıyla ve MESSAGE nodelarıyla diske akışla yazılır (üretici de belleği şişirmez).
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_json_stream
+    python -m benchmarks.bench_json_stream --sizes-mb 50 200 --modes load stream
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synth_design import writeDesign
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import os, sys, time
+sys.path.insert(0, sys.argv[1])
+from messagesPrep_16092025_0900 import buildMessages
+from benchmarks.bench_pipeline import peakMb
+t0 = time.perf_counter()
+buildMessages(sys.argv[2], sys.argv[3])
+elapsed = time.perf_counter() - t0
+print("RESULT", elapsed, peakMb(), file=sys.stderr)
+"""
+
+
+def writeLargeDesign(path, target_mb, html_kb=256):
+    """~target_mb MB'lık tasarım: node'ların ~%10'u html_kb KB'lık şablonlu EMAIL, kalanı MESSAGE."""
+    emails = max(1, target_mb * 1024 // html_kb)
+    return writeDesign(path, meta={"generator": "bench_json_stream"}, messages=emails * 9,
+                       emails=emails, email_html_kb=html_kb)
+
+
+def measure(json_path, mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DESIGN_JSON_STREAM": mode}
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, REPO_ROOT, json_path, os.path.join(tmp, "messages.csv")],
+            env=env, capture_output=True, text=True,
+        )
+    for line in proc.stderr.splitlines():
+        if line.startswith("RESULT"):
+            _, elapsed, rss_mb = line.split()
+            return float(elapsed), float(rss_mb)
+    raise RuntimeError(proc.stderr[-2000:])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes-mb", nargs="+", type=int, default=[20, 80])
+    ap.add_argument("--modes", nargs="+", default=["load", "stream"], choices=["load", "stream"])
+    args = ap.parse_args()
+
+    print(f"{'MB':>6} {'nodes':>8} " + " ".join(f"{m + ' s':>9} {m + ' RSS MB':>14}" for m in args.modes))
+    with tempfile.TemporaryDirectory() as tmp:
+        for mb in args.sizes_mb:
+            path = os.path.join(tmp, f"design_{mb}.json")
+            nodes = writeLargeDesign(path, mb)
+            line = f"{mb:>6} {nodes:>8} "
+            for mode in args.modes:
+                elapsed, rss = measure(path, mode)
+                line += f"{elapsed:>9.2f} {rss:>14.1f} "
+            print(line)
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# bench_log_ingest.py
+"""
+Worker stdout'unun log'a dönüştürülme hızı (okuma + etiket normalizasyonu +
+bölüm kapatma). Blok yolu 100k satırlık bir run'ı satır başına birkaç µs'de
+işlemeli; eski satır satır yol (readline + 5 ayrı re.sub + satır başına
+re.match) karşılaştırma için ölçülebilir.
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_log_ingest
+    python -m benchmarks.bench_log_ingest --lines 10000 100000 --legacy
+"""
+import argparse
+import io
+import re
+import time
+
+from log_ingest_16092025_0900 import SECTION_TAGS, LineReader, SectionTracker, normalizeBlock
+from worker_pool_16092025_0900 import READ_BLOCK
+
+
+def makeOutput(n):
+    """spellcheck çıktısına benzeyen n satır: bölüm başlıkları, ilerleme satırları, sonlar."""
+    lines = ["[prep] JSON->messages.csv hazırlanıyor..."]
+    per_section = max(1, n // len(SECTION_TAGS))
+    for tag in SECTION_TAGS:
+        lines.append(f"[{tag}] İşlenecek satır sayısı: {per_section} (eşzamanlılık: 8)")
+        for i in range(1, per_section + 1):
+            lines.append(f"[{tag}] {i}/{per_section} OK: row_id={i}, node_id=node-{i // 3}, check=0")
+        lines.append(f"[{tag}] Bitti.")
+    return ("\n".join(lines[:n]) + "\n").encode("utf-8")
+
+
+def blockPass(raw):
+    stream = io.BufferedReader(io.BytesIO(raw), buffer_size=READ_BLOCK)
+    reader, sections, out = LineReader(), SectionTracker(), []
+    while True:
+        data = stream.read1(READ_BLOCK)
+        text = reader.feed(data, final=not data)
+        if text:
+            out.append(sections.feed(normalizeBlock(text)))
+        if not data:
+            break
+    out.append(sections.finish())
+    return out
+
+
+def legacyPass(raw):
+    """Eski davranış: satır başına readline, 5 ayrı re.sub ve re.match."""
+    st = {"open": None, "closed": set()}
+    out = []
+    for line in io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8"):
+        s = line.replace("\r\n", "\n")
+        for tag in SECTION_TAGS:
+            s = re.sub(rf'(?<!\n)\[{tag}\]', f'\n[{tag}]', s)
+        for ln in s.splitlines(True):
+            m = re.match(r'^\[(\w+)\]\s*(.*)', ln)
+            if m and m.group(1) in SECTION_TAGS:
+                tag = m.group(1)
+                if st["open"] and st["open"] != tag and st["open"] not in st["closed"]:
+                    out.append(f"[{st['open']}] Bitti.\n")
+                    st["closed"].add(st["open"])
+                if m.group(2).strip().lower().startswith("bitti"):
+                    st["closed"].add(tag)
+                else:
+                    st["open"] = tag
+            out.append(ln)
+    return out
+
+
+def measure(fn, raw, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(raw)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", nargs="+", type=int, default=[10000, 100000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--legacy", action="store_true", help="Eski satır satır yolu da ölç")
+    args = ap.parse_args()
+
+    print(f"{'lines':>8} {'block s':>9} {'µs/line':>8} {'lines/s':>10} {'legacy s':>9} {'µs/line':>8}")
+    for n in args.lines:
+        raw = makeOutput(n)
+        t_blk = measure(blockPass, raw, args.repeat)
+        line = f"{n:>8} {t_blk:>9.4f} {t_blk / n * 1e6:>8.2f} {n / t_blk:>10.0f}"
+        if args.legacy:
+            t_old = measure(legacyPass, raw, 1)
+            line += f" {t_old:>9.4f} {t_old / n * 1e6:>8.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# bench_pipeline.py
+"""
+Uçtan uca spellcheck benchmark'ı: sentetik tasarım (synth_design) + sahte LLM
+(stub_llm) ile her boyut için aşama aşama duvar süresi, satır/sn ve tepe bellek.
+
+Aşamalar (spellcheck.main ile aynı sırada):
+    extract  JSON -> messages.csv (buildMessages)
+    prep     messages.csv -> result.csv iskeleti (ensureOutputCsv)
+    sync     result.csv <-> messages.csv eşitleme (syncOutputWithMessages)
+    llm      beş görevin boru hattı (runPipeline; istekler stub'a gider)
+    export   store -> result.csv (exportOutputCsv + closeStore)
+
+Her boyut ayrı alt süreçte koşar (modül durumu ve ru_maxrss temiz başlar);
+tepe bellek her aşamanın sonundaki ru_maxrss'tir (süreç başından o ana kadarki tepe).
+
+Sonuçlar --baseline dosyasıyla karşılaştırılır: satır/sn ya da bir aşamanın süresi
+--tolerance'tan, tepe bellek --mem-tolerance'tan fazla kötüleşirse çıkış kodu 1.
+Baseline makineye özgüdür; ayarlar (gecikme, eşzamanlılık, toplu boyut) farklıysa
+karşılaştırma yapılmaz. Yeni baseline yazmak için --save-baseline.
+
+Varsayılan toplu boyut 20'dir: --batch-size 1 ile her metin ayrı istek olur ve
+100k satırda süre istemcinin istek başına maliyetine (HTTP havuzu) boğulur.
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000 --save-baseline
+    python -m benchmarks.bench_pipeline --latency lognormal:0.02,0.5 --rate-429 0.02 --concurrency 32
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.stub_llm import startStub
+from benchmarks.synth_design import mixForRows, writeDesign
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+STAGES = ("extract", "prep", "sync", "llm", "export")
+MIN_STAGE_SECONDS = 0.5   # bundan kısa aşamalar gürültülü: karşılaştırılmaz
+
+
+def peakMb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024   # macOS: bayt, Linux: KB
+
+
+# ---------------- Alt süreç: tek boyutun ölçümü ----------------
+
+def runStages(design_path, out_dir, concurrency, batch_size):
+    """spellcheck aşamalarını sırayla çalıştırır; {"rows", "stages": {ad: {"s", "peak_mb"}}}."""
+    sys.path.insert(0, REPO_ROOT)
+    import spellcheck_16092025_0900 as sc
+
+    argv = ["--json", design_path, "--output_csv", os.path.join(out_dir, "result.csv"),
+            "--no_cache", "--concurrency", str(concurrency), "--rpm", "1000000", "--tpm", "1000000000"]
+    if batch_size:
+        argv += ["--batch_size", str(batch_size)]
+    stages = {}
+
+    @contextlib.contextmanager
+    def stage(name):
+        t0 = time.perf_counter()
+        yield
+        stages[name] = {"s": time.perf_counter() - t0, "peak_mb": peakMb()}
+
+    sc.configure(sc.buildParser().parse_args(argv))
+    sc.warmUp()
+    with stage("extract"):
+        sc.ensureMessagesCsv()
+    with stage("prep"):
+        sc.ensureOutputCsv()
+    with stage("sync"):
+        sc.syncOutputWithMessages(sc.MESSAGES_CSV_PATH, sc.OUTPUT_CSV_PATH)
+    with stage("llm"):
+        sc.runPipeline()
+    with stage("export"):
+        sc.exportOutputCsv()
+        sc.closeStore(sc.resultStore())
+    rows = sum(1 for r in sc.rowTable() if (r.get("text") or "").strip())
+    return {"rows": rows, "stages": stages}
+
+
+def child(args):
+    result_fd = os.dup(sys.stdout.fileno())
+    with open(os.path.join(args.out_dir, "run.log"), "w", encoding="utf-8") as log, \
+         contextlib.redirect_stdout(log):
+        result = runStages(args.design, args.out_dir, args.concurrency, args.batch_size)
+    with os.fdopen(result_fd, "w") as out:
+        out.write(json.dumps(result) + "\n")
+
+
+# ---------------- Üst süreç ----------------
+
+def measureSize(n, args, stub, tmp):
+    design = os.path.join(tmp, f"design_{n}.json")
+    out_dir = os.path.join(tmp, f"out_{n}")
+    os.makedirs(out_dir, exist_ok=True)
+    writeDesign(design, dup_ratio=args.dup_ratio, seed=args.seed, **mixForRows(n))
+
+    env = {**os.environ, "OPENAI_BASE_URL": stub.url, "OPENAI_API_KEY": "bench",
+           "EXPORT_INTERVAL_SECONDS": "3600"}
+    cmd = [sys.executable, "-m", "benchmarks.bench_pipeline", "--child",
+           "--design", design, "--out-dir", out_dir, "--concurrency", str(args.concurrency)]
+    if args.batch_size:
+        cmd += ["--batch-size", str(args.batch_size)]
+    before = stub.snapshot()
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{n} satırlık ölçüm başarısız:\n{proc.stderr[-3000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    after = stub.snapshot()
+    total = sum(st["s"] for st in result["stages"].values())
+    result.update({
+        "total_s": total,
+        "rows_per_s": result["rows"] / total if total else 0.0,
+        "peak_mb": max(st["peak_mb"] for st in result["stages"].values()),
+        "llm_requests": after["requests"] - before["requests"],
+        "rate_limited": after["rate_limited"] - before["rate_limited"],
+    })
+    return result
+
+
+def configOf(args):
+    return {"latency": args.latency, "rate_429": args.rate_429, "concurrency": args.concurrency,
+            "batch_size": str(args.batch_size or 1), "dup_ratio": args.dup_ratio, "seed": args.seed}
+
+
+def compare(results, baseline, tolerance, mem_tolerance):
+    """Baseline'a göre kötüleşmeler (metin listesi)."""
+    problems = []
+    for n, cur in results.items():
+        base = baseline.get("sizes", {}).get(str(n))
+        if not base:
+            continue
+        if cur["rows_per_s"] < base["rows_per_s"] * (1 - tolerance):
+            problems.append(f"{n}: satır/sn {cur['rows_per_s']:.0f} < baseline {base['rows_per_s']:.0f}")
+        if cur["peak_mb"] > base["peak_mb"] * (1 + mem_tolerance):
+            problems.append(f"{n}: tepe bellek {cur['peak_mb']:.1f} MB > baseline {base['peak_mb']:.1f} MB")
+        for name in STAGES:
+            b, c = base["stages"].get(name, {}).get("s"), cur["stages"].get(name, {}).get("s")
+            if b is None or c is None or b < MIN_STAGE_SECONDS:
+                continue
+            if c > b * (1 + tolerance):
+                problems.append(f"{n}: {name} {c:.2f} sn > baseline {b:.2f} sn")
+    return problems
+
+
+def _rounded(obj):
+    if isinstance(obj, float):
+        return round(obj, 3)
+    if isinstance(obj, dict):
+        return {k: _rounded(v) for k, v in obj.items()}
+    return obj
+
+
+def printTable(results):
+    head = f"{'rows':>8} " + " ".join(f"{s + ' s':>9}" for s in STAGES)
+    print(head + f" {'total s':>9} {'rows/s':>9} {'peak MB':>9} {'istek':>8} {'429':>6}")
+    for n, r in results.items():
+        line = f"{r['rows']:>8} " + " ".join(f"{r['stages'][s]['s']:>9.2f}" for s in STAGES)
+        print(line + f" {r['total_s']:>9.2f} {r['rows_per_s']:>9.0f} {r['peak_mb']:>9.1f}"
+                     f" {r['llm_requests']:>8} {r['rate_limited']:>6}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    ap.add_argument("--latency", default="fixed:0.002", help="stub gecikmesi (bkz. stub_llm.latencySampler)")
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--batch-size", default="20", help="spellcheck --batch_size; 1 = metin başına istek")
+    ap.add_argument("--dup-ratio", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak yaz (karşılaştırma yapılmaz)")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="Süre/satır-sn için izin verilen kötüleşme oranı")
+    ap.add_argument("--mem-tolerance", type=float, default=0.15, help="Tepe bellek için izin verilen artış oranı")
+    # alt süreç (tek boyut)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--design", help=argparse.SUPPRESS)
+    ap.add_argument("--out-dir", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args)
+        return 0
+
+    stub = startStub(latency=args.latency, rate_429=args.rate_429, seed=args.seed)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for n in args.sizes:
+                results[n] = measureSize(n, args, stub, tmp)
+    finally:
+        stub.shutdown()
+    printTable(results)
+
+    config = configOf(args)
+    if args.save_baseline:
+        baseline = {"config": config, "python": platform.python_version(),
+                    "machine": f"{platform.system()} {platform.machine()}",
+                    "sizes": {str(n): _rounded(r) for n, r in results.items()}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline yazıldı: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline yok ({args.baseline}); --save-baseline ile oluşturun.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"Baseline farklı ayarlarla alınmış, karşılaştırılmadı: {baseline.get('config')}")
+        return 0
+    problems = compare(results, baseline, args.tolerance, args.mem_tolerance)
+    for p in problems:
+        print(f"[REGRESYON] {p}")
+    if not problems:
+        print("Baseline'a göre kötüleşme yok.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
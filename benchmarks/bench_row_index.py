@@ -0,0 +1,168 @@
+# bench_row_index.py
+"""
+spellcheck'in LLM dışı satır yolunun maliyeti, gerçek fonksiyonlarla:
+    sync     syncOutputWithMessages: result.csv yükleme + ROW_INDEX kurma,
+             messages.csv ile eşitleme, carryOverBaseline, store'a yazma
+    process  _processTaskAsync (spellcheck): todo seçimi, tekilleştirme,
+             ROW_INDEX ile satır bulma, setResult + commitRow
+Girdiler synth_design ile üretilir (tasarım -> buildMessages -> messages.csv);
+baseline olarak her ikinci satırı kararlı bir önceki run result.csv'si yazılır.
+LLM yerine süreç içi sahte istemci kullanılır (yanıtlar stub_llm.answerFor ile,
+ağ yok): ölçülen süre tamamen satır işleme maliyetidir. Index'li yolda satır
+başına süre 1k -> 100k arasında sabit kalmalı.
+
+--legacy: eşitlenmiş satırlar üzerinde eski lineer satır bulma (yalnızca <=10k).
+--compact: result.csv satırlarının bellekte tuttuğu yer, dict ve CompactRow ile (tracemalloc).
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_row_index
+    python -m benchmarks.bench_row_index --sizes 1000 10000 100000 --legacy
+    python -m benchmarks.bench_row_index --compact
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import spellcheck_16092025_0900 as sc
+from benchmarks.stub_llm import answerFor
+from benchmarks.synth_design import mixForRows, writeDesign
+from messagesPrep_16092025_0900 import buildMessages
+from result_store_16092025_0900 import rowIdentityKey
+
+
+class _StubResponses:
+    async def create(self, **req):
+        answer, _ = answerFor(req["input"])
+        return SimpleNamespace(output_text=json.dumps(answer, ensure_ascii=False), usage=None)
+
+
+class StubClient:
+    """acallOpenAI'nin kullandığı en küçük AsyncOpenAI yüzeyi (responses.create)."""
+    responses = _StubResponses()
+
+
+# ---------------- Girdiler ----------------
+
+def writeBaseline(messages_csv, path):
+    """Önceki run gibi: her ikinci satırın tüm kararları dolu result.csv."""
+    verdicts = {f: "0" for f in sc.OUT_FIELDS if f.endswith("Check")}
+    with open(messages_csv, "r", encoding="utf-8", newline="") as src, \
+         open(path, "w", encoding="utf-8", newline="") as dst:
+        w = csv.DictWriter(dst, fieldnames=sc.OUT_FIELDS, extrasaction="ignore")
+        w.writeheader()
+        for i, row in enumerate(csv.DictReader(src)):
+            w.writerow({**row, **(verdicts if i % 2 == 0 else {})})
+
+
+def prepareInputs(n, tmp, seed):
+    design = os.path.join(tmp, f"design_{n}.json")
+    messages = os.path.join(tmp, f"messages_{n}.csv")
+    baseline = os.path.join(tmp, f"baseline_{n}.csv")
+    writeDesign(design, seed=seed, **mixForRows(n))
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        buildMessages(design, messages)
+    writeBaseline(messages, baseline)
+    return design, messages, baseline
+
+
+# ---------------- Ölçüm ----------------
+
+def runPasses(design, messages, baseline, out_dir, concurrency):
+    """Taze bir run: sync ve spellcheck geçişi; (satır, sync s, todo, process s)."""
+    argv = ["--json", design, "--output_csv", os.path.join(out_dir, "result.csv"),
+            "--messages_csv", messages, "--messages_prepared", "--no_cache",
+            "--baseline_csv", baseline, "--concurrency", str(concurrency)]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        sc.configure(sc.buildParser().parse_args(argv))
+        sc.ensureOutputCsv()
+        t0 = time.perf_counter()
+        sc.syncOutputWithMessages(sc.MESSAGES_CSV_PATH, sc.OUTPUT_CSV_PATH)
+        t_sync = time.perf_counter() - t0
+        rows = sc.rowTable()
+        todo = sum(1 for r in rows if sc.needsCheck(r, "spellCheck"))
+        t0 = time.perf_counter()
+        sc.runAsync(sc._processTaskAsync("spellcheck", "spellCheck", "spellCorrect", None,
+                                         concurrency, aclient=StubClient()))
+        t_process = time.perf_counter() - t0
+        sc.closeStore(sc.resultStore())
+    return len(rows), t_sync, todo, t_process
+
+
+def legacyPass(rows):
+    """Eski davranış: her anahtar için iki lineer tarama."""
+    todo_keys = [rowIdentityKey(r) for r in rows if not r["spellCheck"]]
+    for key in todo_keys:
+        row = next((rr for rr in rows if rowIdentityKey(rr) == key), None)
+        for r in rows:
+            if rowIdentityKey(r) == key:
+                r["spellCheck"] = "0"
+                break
+        row["spellCheck"] = ""
+
+
+def measure(n, inputs, tmp, args):
+    """--repeat taze run'ın en iyisi (her run ayrı çıktı klasöründe)."""
+    best = None
+    for i in range(args.repeat):
+        out_dir = os.path.join(tmp, f"out_{n}_{i}")
+        os.makedirs(out_dir)
+        res = runPasses(*inputs, out_dir, args.concurrency)
+        best = res if best is None else (res[0], min(best[1], res[1]), res[2], min(best[3], res[3]))
+    return best
+
+
+def tableBytes(result_csv, compact):
+    tracemalloc.start()
+    with open(result_csv, "r", encoding="utf-8", newline="") as f:
+        rows = [sc.ResultRow(r) if compact else r for r in csv.DictReader(f)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--legacy", action="store_true", help="Eski lineer satır bulmayı da ölç (yalnızca <=10k)")
+    ap.add_argument("--compact", action="store_true", help="result.csv satırlarının belleği: dict ile CompactRow")
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")   # configure() anahtar ister; istek gönderilmez
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.compact:
+            print(f"{'rows':>8} {'dict MB':>9} {'compact MB':>11}")
+            for n in args.sizes:
+                _, messages, _ = prepareInputs(n, tmp, args.seed)
+                mb_dict = tableBytes(messages, False) / (1024 * 1024)
+                mb_compact = tableBytes(messages, True) / (1024 * 1024)
+                print(f"{n:>8} {mb_dict:>9.1f} {mb_compact:>11.1f}")
+            return
+
+        head = f"{'rows':>8} {'sync s':>8} {'µs/row':>8} {'todo':>8} {'process s':>10} {'µs/row':>8}"
+        print(head + (f" {'legacy s':>10} {'µs/row':>8}" if args.legacy else ""))
+        for n in args.sizes:
+            inputs = prepareInputs(n, tmp, args.seed)
+            rows, t_sync, todo, t_process = measure(n, inputs, tmp, args)
+            line = (f"{rows:>8} {t_sync:>8.3f} {t_sync / rows * 1e6:>8.2f} "
+                    f"{todo:>8} {t_process:>10.3f} {t_process / max(1, todo) * 1e6:>8.2f}")
+            if args.legacy and rows <= 10000:
+                table = [sc.ResultRow({**r.toDict(), "spellCheck": ""}) for r in sc.rowTable()]
+                t0 = time.perf_counter()
+                legacyPass(table)
+                t_old = time.perf_counter() - t0
+                line += f" {t_old:>10.3f} {t_old / len(table) * 1e6:>8.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
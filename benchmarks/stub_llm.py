@@ -0,0 +1,243 @@
+# stub_llm.py
+"""
+Benchmark'lar için OpenAI uyumlu sahte LLM sunucusu (yalnızca standart kütüphane).
+
+- POST /v1/responses: spellcheck'in kullandığı Responses API. Tekil istemde
+  {"0": []} ya da {"1": [...]} döner; toplu istemde ("Item N:") her öğe için
+  ayrı karar döner. Karar metnin özetinden türetilir (aynı metin -> aynı karar).
+- Gecikme dağılımı: fixed:S | uniform:A,B | exp:ORT | lognormal:MEDYAN,SIGMA (saniye).
+- rate_429 olasılıkla 429 (retry-after-ms ile), rate_5xx olasılıkla 500 döner.
+- Yanıtlar x-ratelimit-* başlıklarını taşır (varsayılan: istemciyi kısmayan
+  yüksek limitler); sınırlayıcı gerçek API'deki gibi bunlarla beslenir.
+- GET /stats: istek, 429, 5xx ve toplu öğe sayaçları (JSON).
+
+spellcheck'i buna yönlendirmek için:
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=bench
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.stub_llm --port 8089
+    python -m benchmarks.stub_llm --latency lognormal:0.4,0.6 --rate-429 0.05
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------------- Ayarlar ----------------
+
+ITEM_RE = re.compile(r"^Item (\d+):\n", re.M)
+CORRECT_EVERY = 5          # her 5 metinden ~1'i "düzeltme var" kararı alır
+RETRY_AFTER_MS = 200
+
+# ---------------- Gecikme dağılımları ----------------
+
+def latencySampler(spec, rng=None):
+    """'fixed:0.05' | 'uniform:0.01,0.1' | 'exp:0.05' | 'lognormal:0.2,0.5' -> örnekleyici (saniye)."""
+    rng = rng or random.Random()
+    kind, _, params = (spec or "fixed:0").partition(":")
+    vals = [float(v) for v in params.split(",") if v.strip()] or [0.0]
+    kind = kind.strip().lower()
+    if kind == "fixed":
+        return lambda: vals[0]
+    if kind == "uniform":
+        lo, hi = vals[0], vals[1] if len(vals) > 1 else vals[0]
+        return lambda: rng.uniform(lo, hi)
+    if kind == "exp":
+        return lambda: rng.expovariate(1.0 / vals[0]) if vals[0] > 0 else 0.0
+    if kind == "lognormal":
+        median, sigma = vals[0], vals[1] if len(vals) > 1 else 0.5
+        return lambda: rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+    raise ValueError(f"Bilinmeyen gecikme dağılımı: {spec}")
+
+# ---------------- Kararlar ----------------
+
+def _verdict(text):
+    text = text.strip()
+    if zlib.crc32(text.encode("utf-8")) % CORRECT_EVERY == 0:
+        return {"1": [text.rstrip(".") + "."]}
+    return {"0": []}
+
+def answerFor(prompt):
+    """İstem metnine spellcheck'in ayrıştıracağı JSON yanıt."""
+    parts = ITEM_RE.split(prompt)
+    if len(parts) > 1:   # toplu istem: [giriş, no, öğe, no, öğe, ...]
+        out = {}
+        for num, body in zip(parts[1::2], parts[2::2]):
+            out[num] = _verdict(body.split("User: ", 1)[-1])
+        return out, len(out)
+    return _verdict(prompt.rsplit("User: ", 1)[-1]), 1
+
+def responseBody(model, text, input_tokens):
+    """Responses API nesnesi (SDK'nın output_text'i okuyacağı en küçük biçim)."""
+    output_tokens = max(1, len(text) // 4)
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [{
+            "type": "message",
+            "id": f"msg_{uuid.uuid4().hex}",
+            "status": "completed",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+# ---------------- Sunucu ----------------
+
+class StubLLM(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024   # eşzamanlı bağlantı patlamasında listen kuyruğu taşmasın
+
+    def __init__(self, addr, latency="fixed:0", rate_429=0.0, rate_5xx=0.0,
+                 rpm_limit=1_000_000, tpm_limit=1_000_000_000, seed=None):
+        super().__init__(addr, _Handler)
+        self.rng = random.Random(seed)
+        self.sample = latencySampler(latency, self.rng)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "rate_limited": 0, "server_errors": 0, "items": 0}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, **inc):
+        with self.lock:
+            for k, v in inc.items():
+                self.stats[k] += v
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def draw(self):
+        """(gecikme, sonuç): sonuç 'ok' | '429' | '5xx'."""
+        with self.lock:
+            delay = max(0.0, self.sample())
+            roll = self.rng.random()
+        if roll < self.rate_429:
+            return delay, "429"
+        if roll < self.rate_429 + self.rate_5xx:
+            return delay, "5xx"
+        return delay, "ok"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive: istemci bağlantı havuzunu kullanır
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _limitHeaders(self):
+        s = self.server
+        return {
+            "x-ratelimit-limit-requests": str(s.rpm_limit),
+            "x-ratelimit-remaining-requests": str(s.rpm_limit - 1),
+            "x-ratelimit-limit-tokens": str(s.tpm_limit),
+            "x-ratelimit-remaining-tokens": str(s.tpm_limit - 1000),
+        }
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send(200, self.server.snapshot())
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/responses"):
+            self._send(404, {"error": {"message": f"desteklenmeyen uç: {self.path}"}})
+            return
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError:
+            self._send(400, {"error": {"message": "geçersiz JSON", "type": "invalid_request_error"}})
+            return
+        s = self.server
+        s.count(requests=1)
+        delay, outcome = s.draw()
+        if delay:
+            time.sleep(delay)
+        if outcome == "429":
+            s.count(rate_limited=1)
+            headers = {**self._limitHeaders(), "retry-after-ms": str(RETRY_AFTER_MS)}
+            self._send(429, {"error": {"message": "Rate limit reached (stub)", "type": "requests",
+                                       "code": "rate_limit_exceeded"}}, headers)
+            return
+        if outcome == "5xx":
+            s.count(server_errors=1)
+            self._send(500, {"error": {"message": "stub server error", "type": "server_error"}})
+            return
+        prompt = req.get("input") if isinstance(req.get("input"), str) else json.dumps(req.get("input"))
+        answer, items = answerFor(prompt)
+        s.count(ok=1, items=items)
+        text = json.dumps(answer, ensure_ascii=False)
+        input_tokens = (len(prompt) + len(req.get("instructions") or "")) // 4
+        self._send(200, responseBody(req.get("model", "stub"), text, input_tokens), self._limitHeaders())
+
+# ----------- Public API (camelCase) -----------
+
+def startStub(host="127.0.0.1", port=0, **options):
+    """Sunucuyu arka plan thread'inde başlatır; StubLLM döndürür (url, snapshot(), shutdown())."""
+    server = StubLLM((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency", default="fixed:0", help="fixed:S | uniform:A,B | exp:ORT | lognormal:MEDYAN,SIGMA")
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-5xx", type=float, default=0.0)
+    ap.add_argument("--rpm-limit", type=int, default=1_000_000)
+    ap.add_argument("--tpm-limit", type=int, default=1_000_000_000)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    server = StubLLM((args.host, args.port), latency=args.latency, rate_429=args.rate_429,
+                     rate_5xx=args.rate_5xx, rpm_limit=args.rpm_limit, tpm_limit=args.tpm_limit,
+                     seed=args.seed)
+    print(f"stub LLM: {server.url} (OPENAI_BASE_URL olarak verin)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
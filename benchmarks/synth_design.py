@@ -0,0 +1,159 @@
+# synth_design.py
+"""
+Benchmark'lar için sentetik tasarım JSON'u üretici.
+
+Node tipleri ve her birinin messages.csv'de açtığı satır sayısı:
+    MESSAGE      (TEXT, 2 payload)                                  -> 2
+    QUICKREPLY   (3 buton + prompt + errorMessage)                  -> 5
+    CARD         (2 kart x (2 buton + başlık + alt başlık + metin)
+                  + errorMessage)                                   -> 11
+    LIST         (buton + gövde + başlık + bölüm başlığı
+                  + 3 x (satır başlığı + açıklama) + errorMessage)  -> 11
+    EMAIL        (konu + HTML gövde)                                -> 2
+    ERROR        (INPUT nodu, yalnızca errorMessage)                -> 1
+
+Metinlerin dup_ratio kadarı küçük bir ortak havuzdan seçilir ("Devam",
+"Ana menü" gibi tekrar eden metinler): LLM aşamasındaki tekilleştirme gerçekçi
+bir oranla çalışır. Aynı seed aynı dosyayı üretir. Dosya diske akışla yazılır,
+büyük tasarımlar da belleğe alınmaz.
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.synth_design --rows 10000 --out /tmp/design.json
+    python -m benchmarks.synth_design --messages 500 --cards 20 --emails 10 --out /tmp/design.json
+"""
+import argparse
+import json
+import random
+
+# ---------------- Ayarlar ----------------
+
+ROWS_PER_NODE = {"messages": 2, "quickreplies": 5, "cards": 11, "lists": 11, "emails": 2, "error_messages": 1}
+
+# mixForRows: satırların node tiplerine dağılımı
+ROW_SHARES = {"messages": 0.40, "quickreplies": 0.20, "cards": 0.15, "lists": 0.10, "emails": 0.05, "error_messages": 0.10}
+
+COMMON_TEXTS = [
+    "Devam", "Geri", "Ana menü", "Evet", "Hayır", "Tamam", "İptal", "Diğer",
+    "Lütfen bir seçenek belirleyin.", "Anlayamadım, lütfen tekrar deneyin.",
+    "Size nasıl yardımcı olabilirim?", "Başka bir işlem yapmak ister misiniz?",
+]
+
+WORDS = [
+    "sipariş", "kargo", "hesap", "ödeme", "kampanya", "fatura", "teslimat", "iade",
+    "mağaza", "randevu", "kart", "adres", "şifre", "bildirim", "üyelik", "puan",
+]
+
+# ---------------- Yardımcılar ----------------
+
+class _Texts:
+    def __init__(self, rng, dup_ratio):
+        self.rng = rng
+        self.dup_ratio = dup_ratio
+        self.n = 0
+
+    def __call__(self, kind):
+        if self.rng.random() < self.dup_ratio:
+            return self.rng.choice(COMMON_TEXTS)
+        self.n += 1
+        a, b = self.rng.sample(WORDS, 2)
+        return f"{kind} {self.n}: {a} ve {b} hakkında bilgi almak için devam edin."
+
+def _messageNode(i, text):
+    return {"id": f"msg-{i}", "name": f"Mesaj {i}", "type": "MESSAGE", "messageType": "TEXT",
+            "payloads": [text("Mesaj"), text("Mesaj")]}
+
+def _quickreplyNode(i, text):
+    return {"id": f"qr-{i}", "name": f"Hızlı yanıt {i}", "type": "SELECTION", "selectionType": "QUICKREPLY",
+            "prompt": text("Soru"), "errorMessage": text("Hata"),
+            "payloads": [{"text": text("Buton"), "type": "POSTBACK"} for _ in range(3)]}
+
+def _cardNode(i, text):
+    cards = [{"title": text("Kart"), "subtitle": text("Alt başlık"), "text": text("Kart metni"),
+              "buttons": [{"text": text("Buton"), "type": "URL"}, {"text": text("Buton"), "type": "POSTBACK"}]}
+             for _ in range(2)]
+    return {"id": f"card-{i}", "name": f"Kart {i}", "type": "SELECTION", "selectionType": "CARD",
+            "errorMessage": text("Hata"), "payloads": cards}
+
+def _listNode(i, text):
+    rows = [{"listRowTitle": text("Satır"), "listRowDescription": text("Açıklama")} for _ in range(3)]
+    return {"id": f"list-{i}", "name": f"Liste {i}", "type": "SELECTION", "selectionType": "LIST",
+            "messageBoxOptionsButtonText": text("Seçenekler"), "messageBoxBody": text("Liste gövdesi"),
+            "listHeader": text("Liste başlığı"), "errorMessage": text("Hata"),
+            "payloads": [{"listSectionTitle": text("Bölüm"), "listCardRow": rows}]}
+
+def _emailNode(i, text, html_kb):
+    para = f"<p style=\"margin:0 0 8px\">{text('E-posta')} &amp; detaylar aşağıda.</p>\n"
+    filler = "<tr><td style=\"padding:4px\">Siparişinizle ilgili bilgiler.</td></tr>\n"
+    pad = filler * (html_kb * 1024 // len(filler)) if html_kb else ""
+    return {"id": f"mail-{i}", "name": f"E-posta {i}", "type": "EMAIL",
+            "emailSubject": text("Konu"),
+            "emailTemplate": f"<html><body>{para}<table>{pad}</table></body></html>"}
+
+def _errorNode(i, text):
+    return {"id": f"input-{i}", "name": f"Girdi {i}", "type": "INPUT", "inputType": "TEXT",
+            "errorMessage": text("Hata")}
+
+# ----------- Public API (camelCase) -----------
+
+def mixForRows(rows, shares=None):
+    """~rows satır açacak node sayıları (ROW_SHARES oranlarıyla, her tipten en az 1)."""
+    shares = shares or ROW_SHARES
+    return {kind: max(1, round(rows * share / ROWS_PER_NODE[kind])) for kind, share in shares.items()}
+
+def expectedRows(counts):
+    return sum(ROWS_PER_NODE[kind] * n for kind, n in counts.items())
+
+def iterNodes(messages=0, quickreplies=0, cards=0, lists=0, emails=0, error_messages=0,
+              dup_ratio=0.2, email_html_kb=0, seed=1):
+    """(anahtar, node) çiftleri; tipler karışık sırayla (gerçek akışlardaki gibi) üretilir."""
+    rng = random.Random(seed)
+    text = _Texts(rng, dup_ratio)
+    makers = [
+        (messages, lambda i: _messageNode(i, text)),
+        (quickreplies, lambda i: _quickreplyNode(i, text)),
+        (cards, lambda i: _cardNode(i, text)),
+        (lists, lambda i: _listNode(i, text)),
+        (emails, lambda i: _emailNode(i, text, email_html_kb)),
+        (error_messages, lambda i: _errorNode(i, text)),
+    ]
+    left = [n for n, _ in makers]
+    seq = 0
+    while any(left):
+        for t, (_, make) in enumerate(makers):
+            if left[t]:
+                left[t] -= 1
+                seq += 1
+                node = make(seq)
+                yield node["id"], node
+
+def writeDesign(path, meta=None, **counts):
+    """Tasarımı diske akışla yazar; yazılan node sayısını döndürür. counts: iterNodes parametreleri."""
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"meta": ' + json.dumps(meta or {"generator": "synth_design"}) + ', "nodes": {')
+        for key, node in iterNodes(**counts):
+            f.write(("," if n else "") + json.dumps(key) + ":" + json.dumps(node, ensure_ascii=False))
+            n += 1
+        f.write("}}")
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--rows", type=int, default=None, help="Hedef satır sayısı (node sayılarını ROW_SHARES ile seçer)")
+    for kind in ROWS_PER_NODE:
+        ap.add_argument(f"--{kind.replace('_', '-')}", type=int, default=0)
+    ap.add_argument("--dup-ratio", type=float, default=0.2)
+    ap.add_argument("--email-html-kb", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    counts = mixForRows(args.rows) if args.rows else {kind: getattr(args, kind) for kind in ROWS_PER_NODE}
+    nodes = writeDesign(args.out, dup_ratio=args.dup_ratio, email_html_kb=args.email_html_kb,
+                        seed=args.seed, **counts)
+    print(f"{args.out}: {nodes} node, ~{expectedRows(counts)} satır ({counts})")
+
+
+if __name__ == "__main__":
+    main()
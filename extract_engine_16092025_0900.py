@@ -0,0 +1,119 @@
+# extract_engine.py
+import json
+import csv
+import tempfile
+
+from csv_utils_16092025_0900 import ensureHeader, loadKeySet, rowKey, nextRowId
+from json_stream_16092025_0900 import iterNodes, shouldStream, loadNodes  # loadNodes: eski arayüz
+
+FIELDNAMES = ["row_id", "node_id", "node_name", "node_type", "module_type", "source", "text"]
+
+# ---------------- Utilities ----------------
+
+def candidate(node_id, node_name, node_type, module_type, source, text):
+    """Extractor handler'larının ürettiği aday satır (row_id yazım sırasında verilir)."""
+    return {
+        "node_id": node_id,
+        "node_name": node_name,
+        "node_type": node_type,
+        "module_type": module_type,
+        "source": source,
+        "text": text,
+    }
+
+def _closeBuckets(buckets):
+    for bucket in buckets:
+        if isinstance(bucket, SpillBucket):
+            bucket.close()
+
+def csvValue(v):
+    """DictWriter'ın yazacağı değer (geri okunduğunda görülecek olan)."""
+    return "" if v is None else str(v)
+
+class SpillBucket:
+    """Aday satırları geçici dosyada tutan kova (akış modunda bellek tasarım boyutundan bağımsız kalır)."""
+    def __init__(self):
+        self._f = tempfile.TemporaryFile("w+", encoding="utf-8", newline="\n")
+
+    def append(self, cand):
+        self._f.write(json.dumps(cand, ensure_ascii=False))
+        self._f.write("\n")
+
+    def __iter__(self):
+        self._f.seek(0)
+        for line in self._f:
+            yield json.loads(line)
+
+    def close(self):
+        self._f.close()
+
+# ----------- Public API (camelCase) -----------
+
+def runExtractors(json_path, csv_path, extractors):
+    """
+    Tek geçişli çıkarım motoru.
+    extractors: [(label, name, handler), ...]  handler(key, node) -> aday satırlar
+
+    JSON bir kez okunur, data["nodes"] bir kez dolaşılır; her node tüm
+    handler'lara verilir. Büyük dosyalarda (json_stream.shouldStream) nodes
+    girdileri akışla tek tek gelir ve kovalar geçici dosyaya yazılır; bellekte
+    aynı anda tek node ve tekilleştirme anahtarları durur.
+    Adaylar handler başına kovalarda toplanır ve kova
+    sırasıyla (eski adım sırası) tek bir açık dosyaya yazılır. Tek anahtar seti
+    ve tek row_id sayacı tutulur; çıktı adım adım çalıştırmayla byte-byte aynıdır.
+
+    Her extractor için {"label", "name", "added", "error"} döner.
+    """
+    results = [{"label": label, "name": name, "added": 0, "error": None}
+               for (label, name, _) in extractors]
+    buckets = []
+    try:
+        stream = shouldStream(json_path)
+        buckets = [SpillBucket() if stream else [] for _ in extractors]
+        for key, node in iterNodes(json_path, "stream" if stream else "load"):
+            for i, (_, _, handler) in enumerate(extractors):
+                if results[i]["error"] is not None:
+                    continue  # adım hata verdiyse eskisi gibi kalan nodelar atlanır
+                try:
+                    for cand in handler(key, node):
+                        buckets[i].append(cand)
+                except Exception as e:
+                    results[i]["error"] = e
+    except Exception as e:
+        # JSON okunamadı: eskisi gibi hiçbir adım yazmaz
+        for res in results:
+            res["error"] = e
+            res["added"] = 0
+        _closeBuckets(buckets)
+        return results
+
+    ensureHeader(csv_path, FIELDNAMES)
+    # Dosyadaki anahtarlar (geri okunmuş, string halleriyle) ve tek sayaç
+    file_keys = loadKeySet(csv_path)
+    row_id = nextRowId(csv_path)
+
+    with open(csv_path, "a", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+        for i, bucket in enumerate(buckets):
+            step_keys = set()     # adım içinde eklenenler (ham değerlerle)
+            written_keys = []     # sonraki adımların dosyadan göreceği haliyle
+            for cand in bucket:
+                k = rowKey(cand)
+                if k in file_keys or k in step_keys:
+                    continue
+                writer.writerow({"row_id": row_id, **cand})
+                step_keys.add(k)
+                written_keys.append(rowKey({f: csvValue(v) for f, v in cand.items()}))
+                row_id += 1
+                results[i]["added"] += 1
+            file_keys.update(written_keys)
+
+    _closeBuckets(buckets)
+    return results
+
+def runSingle(json_path, csv_path, name, handler):
+    """Tek extractor'ı eski fonksiyon arayüzüyle çalıştırır (log + hata fırlatma)."""
+    res = runExtractors(json_path, csv_path, [(name, name, handler)])[0]
+    if res["error"] is not None:
+        raise res["error"]
+    print(f"[{name}] {res['added']} yeni satır eklendi.")
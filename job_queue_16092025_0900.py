@@ -0,0 +1,215 @@
+# job_queue.py
+"""
+Run'lar için kalıcı iş kuyruğu (SQLite/WAL).
+
+Kuyrukta yalnızca bekleyen ve çalışan işler durur; biten iş silinir. Sunucu
+yeniden başlarsa bekleyenler kaldığı yerden, yarıda kalan çalışanlar yeniden
+kuyruğa alınarak devam eder (sonuç store'u sayesinde işlenmiş satırlar
+tekrar sorulmaz).
+
+Birden çok HTTP worker'ı (gunicorn/uvicorn --workers) aynı kuyruğu paylaşır:
+her iş onu oluşturan sürecin (owner) kuyruğundadır; her süreç yalnızca kendi
+işlerini çalıştırır (RUNS/log o süreçtedir). Açılışta sahibi ölmüş işler
+devralınır. Aynı anda çalışan iş sınırı (max_running) ve sıralama süreç başına
+değil kuyruk genelindedir: claimNextJob çalışan işleri alım transaction'ı içinde
+(yazma kilidi alınmışken) sayar ve yalnızca genel sıradaki ilk iş kendisininse
+alır; sahibi ölmüş işler ne sayılır ne de sırayı tutar.
+
+Sıralama: en kısa iş önce (satır sayısı, çıkarımdan bilinir) + yaşlandırma.
+Etkin öncelik = satır sayısı - bekleme_sn * AGING_ROWS_PER_SECOND; küçük işler
+büyüklerin arkasında beklemez, büyük iş de sürekli gelen küçüklerin arkasında
+sonsuza dek kalmaz. Boyutu bilinmeyen iş (ön çıkarım yapılamadı) en sona yazılır.
+
+Hazırlık: iş ön çıkarımı (messages.csv) bitene kadar alınamaz (prepared=0);
+böylece uygulamadaki çıkarım ile worker aynı CSV'ye asla birlikte yazmaz.
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+
+# ---------------- Ayarlar ----------------
+
+BUSY_TIMEOUT_MS = 30000
+AGING_ROWS_PER_SECOND = float(os.getenv("QUEUE_AGING_ROWS_PER_SECOND", "100") or "100")
+UNKNOWN_SIZE = 10 ** 9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id      TEXT PRIMARY KEY,
+    payload     TEXT NOT NULL,
+    size        INTEGER,
+    state       TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at  REAL,
+    owner       TEXT,
+    prepared    INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+"""
+
+QUEUED, RUNNING = "queued", "running"
+
+# Etkin öncelik (küçük olan önce); eşitlikte önce gelen önce
+_ORDER = "COALESCE(size, ?) - (? - enqueued_at) * ?, enqueued_at, run_id"
+
+# ----------- Süreç sahipliği -----------
+
+def processOwner():
+    """Bu sürecin kimliği: 'host:pid' (fork'tan sonra çağrılmalı)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def ownerAlive(owner):
+    """Aynı makinedeki sahibin süreci yaşıyor mu? Başka makine: bilinmez, yaşıyor sayılır."""
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname():
+        return bool(owner)
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def ensureColumns(conn, table, columns):
+    """Eski şemayla açılmış veritabanına eksik sütunları ekler."""
+    have = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns:
+        if name not in have:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+# ----------- Public API (camelCase) -----------
+
+def openQueue(db_path):
+    db_dir = os.path.dirname(db_path)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
+    # bağlantı uygulama içinde kilitle korunarak thread'ler arasında paylaşılır
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(SCHEMA)
+    # eski kuyruktaki işler hazırlanmış sayılır (worker çıkarımı kendisi yapar)
+    ensureColumns(conn, "jobs", [("owner", "TEXT"), ("prepared", "INTEGER NOT NULL DEFAULT 1")])
+    return conn
+
+def enqueueJob(conn, run_id, payload, size=None, owner=None, prepared=True):
+    """prepared=False: iş markPrepared çağrılana kadar alınmaz."""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs(run_id, payload, size, state, enqueued_at, owner, prepared) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?)",
+            (run_id, json.dumps(payload, ensure_ascii=False), size, QUEUED, time.time(), owner, int(prepared)),
+        )
+
+def markPrepared(conn, run_id, size=None):
+    """Ön çıkarım bitti: boyut yazılır, iş alınabilir olur (size=None: bilinmiyor, sona)."""
+    with conn:
+        conn.execute("UPDATE jobs SET size = ?, prepared = 1 WHERE run_id = ?", (size, run_id))
+
+def unpreparedJobs(conn, owner=None):
+    """owner'ın ön çıkarımı bitmemiş bekleyen işleri (açılışta hazırlık yeniden başlatılır)."""
+    return [run_id for (run_id,) in conn.execute(
+        "SELECT run_id FROM jobs WHERE owner IS ? AND state = ? AND prepared = 0 ORDER BY enqueued_at, run_id",
+        (owner, QUEUED),
+    )]
+
+def runningCount(conn):
+    """Kuyruk genelinde çalışan iş sayısı (sahibi ölmüş süreçlerinkiler hariç)."""
+    return sum(
+        n for owner, n in conn.execute(
+            "SELECT owner, COUNT(*) FROM jobs WHERE state = ? GROUP BY owner", (RUNNING,)
+        )
+        if ownerAlive(owner)
+    )
+
+def _readyJobs(conn, now):
+    """Kuyruk genelinde hazır bekleyen işler, _ORDER sırasıyla: (run_id, payload, owner); sahibi ölmüşler hariç."""
+    alive = {}
+    for run_id, payload, owner in conn.execute(
+        f"SELECT run_id, payload, owner FROM jobs WHERE state = ? AND prepared = 1 ORDER BY {_ORDER}",
+        (QUEUED, UNKNOWN_SIZE, now, AGING_ROWS_PER_SECOND),
+    ):
+        if owner not in alive:
+            alive[owner] = ownerAlive(owner)
+        if alive[owner]:
+            yield run_id, payload, owner
+
+def claimNextJob(conn, owner=None, max_running=None):
+    """
+    Kuyruk genelindeki en öncelikli hazır iş owner'ınsa onu 'running' yapar;
+    (run_id, payload) ya da None. Sıradaki iş başka sürecinse alınmaz (o süreç
+    kendi yoklamasında alır): küçük iş hangi worker'da olursa olsun önce başlar.
+    max_running: tüm süreçlerde aynı anda çalışan iş sınırı. Sayım, sıra
+    karşılaştırması ve alım tek BEGIN IMMEDIATE transaction'ındadır.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if max_running is not None and runningCount(conn) >= max_running:
+            conn.rollback()
+            return None
+        ready = _readyJobs(conn, now)
+        row = next(ready, None)
+        ready.close()
+        if row is None or row[2] != owner:
+            conn.rollback()
+            return None
+        conn.execute("UPDATE jobs SET state = ?, started_at = ? WHERE run_id = ?", (RUNNING, now, row[0]))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return row[0], json.loads(row[1])
+
+def queuePositions(conn):
+    """
+    run_id -> 1'den başlayan sıra: tüm süreçlerin hazır bekleyen işleri,
+    claimNextJob'ın alacağı sırayla (o anki önceliğe göre). Hazırlığı bitmemiş iş sırada değildir.
+    """
+    return {run_id: i for i, (run_id, _, _) in enumerate(_readyJobs(conn, time.time()), 1)}
+
+def queuePosition(conn, run_id):
+    return queuePositions(conn).get(run_id)
+
+def cancelJob(conn, run_id):
+    """Henüz başlamamış işi kuyruktan çıkarır; çıkarıldıysa True."""
+    with conn:
+        cur = conn.execute("DELETE FROM jobs WHERE run_id = ? AND state = ?", (run_id, QUEUED))
+    return cur.rowcount > 0
+
+def finishJob(conn, run_id):
+    with conn:
+        conn.execute("DELETE FROM jobs WHERE run_id = ?", (run_id,))
+
+def requeueRunning(conn, owner=None):
+    """
+    Açılışta: sahibi artık yaşamayan (ya da sahipsiz) işleri owner'a devreder;
+    yarıda kalan çalışanlar yeniden beklemeye alınır. Yarıda kalan sayısını döndürür.
+    """
+    owners = {o for (o,) in conn.execute("SELECT DISTINCT owner FROM jobs")}
+    orphaned = [o for o in owners if o is None or o == owner or not ownerAlive(o)]
+    requeued = 0
+    with conn:
+        for o in orphaned:
+            requeued += conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE owner IS ? AND state = ?", (o, RUNNING)
+            ).fetchone()[0]
+            conn.execute(
+                "UPDATE jobs SET owner = ?, state = ?, started_at = NULL WHERE owner IS ?",
+                (owner, QUEUED, o),
+            )
+    return requeued
+
+def pendingJobs(conn, owner=None):
+    """owner'ın işleri: [(run_id, payload, size), ...] eklenme sırasıyla."""
+    return [
+        (run_id, json.loads(payload), size)
+        for run_id, payload, size in conn.execute(
+            "SELECT run_id, payload, size FROM jobs WHERE owner IS ? ORDER BY enqueued_at, run_id",
+            (owner,),
+        )
+    ]
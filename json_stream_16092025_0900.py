@@ -0,0 +1,155 @@
+# json_stream.py
+"""
+Tasarım JSON'undaki "nodes" nesnesinin girdilerini tek tek üreten artımlı
+ayrıştırıcı: dosyanın tamamı ve node ağacı belleğe alınmaz, aynı anda
+yalnızca bir node (ve okuma tamponu) bellekte durur.
+
+- ijson kuruluysa onun kvitems'i kullanılır (C arka ucu varsa hızlıdır).
+- Yoksa yerleşik json.JSONDecoder.raw_decode ile üye üye okunur: tampon
+  parça parça doldurulur, yarım kalan değer için tampon büyütülüp tekrar
+  denenir (büyük tek node'da doğrusal kalması için okuma boyu ikiye katlanır).
+- iterNodes(path) mode'a göre seçer: DESIGN_JSON_STREAM=auto (varsayılan;
+  JSON_STREAM_MIN_MB'den büyük dosyalar akışla), 1 (her zaman), 0 (json.load).
+"""
+import os
+import json
+
+try:
+    import ijson
+except ImportError:   # opsiyonel bağımlılık
+    ijson = None
+
+# ---------------- Ayarlar ----------------
+
+READ_CHARS = 1024 * 1024
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+
+def streamMode():
+    return (os.getenv("DESIGN_JSON_STREAM", "auto") or "auto").strip().lower()
+
+def streamMinBytes():
+    return int(float(os.getenv("JSON_STREAM_MIN_MB", "64") or "64") * 1024 * 1024)
+
+def shouldStream(json_path, mode=None):
+    mode = streamMode() if mode is None else mode
+    if mode in ("1", "true", "stream"):
+        return True
+    if mode in ("0", "false", "load"):
+        return False
+    return os.path.getsize(json_path) >= streamMinBytes()
+
+# ---------------- Yerleşik artımlı okuyucu ----------------
+
+class _Incomplete(Exception):
+    pass
+
+class _Reader:
+    def __init__(self, f, read_chars=READ_CHARS):
+        self.f = f
+        self.read_chars = read_chars
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, n):
+        data = self.f.read(n)
+        if not data:
+            self.eof = True
+            return
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self):
+        """Boşlukları atlayıp sıradaki karakteri döndürür (dosya bittiyse "")."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill(self.read_chars)
+
+    def expect(self, ch):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"JSON: '{ch}' bekleniyordu, '{got or 'EOF'}' bulundu")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        need = self.read_chars
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                if end == len(self.buf) and not self.eof:
+                    raise _Incomplete   # tampon sonunda biten sayı devam ediyor olabilir
+                self.pos = end
+                return obj
+            except (json.JSONDecodeError, _Incomplete):
+                if self.eof:
+                    raise
+                self._fill(need)
+                need *= 2
+
+def _iterMembers(reader):
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        yield key, reader.value()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"JSON: ',' ya da '}}' bekleniyordu, '{sep or 'EOF'}' bulundu")
+
+def _iterNodesBuiltin(f):
+    reader = _Reader(f)
+    reader.expect("{")
+    if reader.peek() != "}":
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "nodes":
+                yield from _iterMembers(reader)
+                return   # yalnızca nodes gerekli; dosyanın geri kalanı okunmaz
+            reader.value()   # diğer üst düzey alanlar atlanır
+            sep = reader.peek()
+            reader.pos += 1
+            if sep == "}":
+                break
+            if sep != ",":
+                raise ValueError(f"JSON: ',' ya da '}}' bekleniyordu, '{sep or 'EOF'}' bulundu")
+    raise KeyError("nodes")
+
+# ----------- Public API (camelCase) -----------
+
+def streamNodes(json_path):
+    """data["nodes"] girdilerini (anahtar, node) olarak sırayla üretir."""
+    if ijson is not None:
+        with open(json_path, "rb") as f:
+            try:
+                items = ijson.kvitems(f, "nodes", use_float=True)
+            except TypeError:   # eski ijson: use_float yok
+                items = ijson.kvitems(f, "nodes")
+            yield from items
+        return
+    with open(json_path, "r", encoding="utf-8") as f:
+        yield from _iterNodesBuiltin(f)
+
+def loadNodes(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["nodes"]
+
+def iterNodes(json_path, mode=None):
+    """(anahtar, node) çiftleri: büyük dosyada akışla, küçükte json.load ile."""
+    if shouldStream(json_path, mode):
+        return streamNodes(json_path)
+    return iter(loadNodes(json_path).items())
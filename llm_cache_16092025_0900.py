@@ -0,0 +1,175 @@
+# llm_cache.py
+"""
+Çalışmalar arası kalıcı LLM karar önbelleği (içerik adresli).
+
+Anahtar: sha256(task, model, render_prompt çıktısının hash'i, text)
+Değer  : ayrıştırılmış karar -> {"1": [...]} ya da {"0": []}
+
+SQLite/WAL üzerinde durur; aynı anda çalışan birden çok run (ayrı süreçler)
+aynı dosyayı güvenle paylaşır. Toplam boyut sınırı aşılınca en uzun süredir
+kullanılmayan kayıtlar silinir (boyut tabanlı LRU).
+
+Dışa/içe aktarma (JSONL):
+    python llm_cache_16092025_0900.py export --db outputs/llm_cache.sqlite --file cache.jsonl
+    python llm_cache_16092025_0900.py import --db outputs/llm_cache.sqlite --file cache.jsonl
+"""
+import os
+import json
+import time
+import hashlib
+import sqlite3
+
+# ---------------- Ayarlar ----------------
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "256") or "256") * 1024 * 1024)
+BUSY_TIMEOUT_MS = 30000
+EVICT_TARGET = 0.9   # sınır aşılınca bu orana kadar boşalt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key         TEXT PRIMARY KEY,
+    task        TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    text        TEXT NOT NULL,
+    verdict     TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_last_used ON cache(last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats(id, total_bytes) VALUES(1, 0);
+CREATE TRIGGER IF NOT EXISTS cache_ins AFTER INSERT ON cache BEGIN
+    UPDATE stats SET total_bytes = total_bytes + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_del AFTER DELETE ON cache BEGIN
+    UPDATE stats SET total_bytes = total_bytes - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_upd AFTER UPDATE OF size ON cache BEGIN
+    UPDATE stats SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 1;
+END;
+"""
+
+# ---------------- Yardımcılar ----------------
+
+def promptHash(system_msg, user_msg):
+    """render_prompt çıktısının hash'i (şablon değişirse eski kayıtlar eşleşmez)."""
+    h = hashlib.sha256()
+    h.update(system_msg.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(user_msg.encode("utf-8"))
+    return h.hexdigest()
+
+def cacheKey(task, model, prompt_hash, text):
+    payload = json.dumps([task, model, prompt_hash, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ----------- Public API (camelCase) -----------
+
+def openCache(db_path):
+    db_dir = os.path.dirname(db_path)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(SCHEMA)
+    return conn
+
+def cacheGet(conn, key):
+    """Kayıt varsa kararı döndürür ve son kullanım zamanını tazeler; yoksa None."""
+    row = conn.execute("SELECT verdict FROM cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    with conn:
+        conn.execute("UPDATE cache SET last_used = ? WHERE key = ?", (time.time(), key))
+    return json.loads(row[0])
+
+def cachePut(conn, key, task, model, prompt_hash, text, verdict, max_bytes=DEFAULT_MAX_BYTES):
+    data = json.dumps(verdict, ensure_ascii=False)
+    size = len(key) + len(prompt_hash) + len(text.encode("utf-8")) + len(data.encode("utf-8"))
+    with conn:
+        conn.execute(
+            "INSERT INTO cache(key, task, model, prompt_hash, text, verdict, size, last_used) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET verdict=excluded.verdict, size=excluded.size, "
+            "last_used=excluded.last_used",
+            (key, task, model, prompt_hash, text, data, size, time.time()),
+        )
+    if max_bytes:
+        evict(conn, max_bytes)
+
+def totalBytes(conn):
+    return conn.execute("SELECT total_bytes FROM stats WHERE id = 1").fetchone()[0]
+
+def evict(conn, max_bytes=DEFAULT_MAX_BYTES):
+    """Toplam boyut sınırı aşıldıysa en eski kullanılanları sil. Silinen kayıt sayısını döndürür."""
+    if totalBytes(conn) <= max_bytes:
+        return 0
+    target = int(max_bytes * EVICT_TARGET)
+    removed = 0
+    with conn:
+        while totalBytes(conn) > target:
+            cur = conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY last_used LIMIT 100)"
+            )
+            if cur.rowcount <= 0:
+                break
+            removed += cur.rowcount
+    return removed
+
+def exportCache(conn, file_path):
+    """Tüm kayıtları JSONL olarak yazar; yazılan kayıt sayısını döndürür."""
+    n = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        for key, task, model, ph, text, verdict, last_used in conn.execute(
+            "SELECT key, task, model, prompt_hash, text, verdict, last_used FROM cache ORDER BY last_used"
+        ):
+            f.write(json.dumps({
+                "key": key, "task": task, "model": model, "prompt_hash": ph,
+                "text": text, "verdict": json.loads(verdict), "last_used": last_used,
+            }, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+def importCache(conn, file_path, max_bytes=DEFAULT_MAX_BYTES):
+    """JSONL kayıtlarını ekler (var olanların üzerine yazar); eklenen sayısını döndürür."""
+    n = 0
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            key = rec.get("key") or cacheKey(rec["task"], rec["model"], rec["prompt_hash"], rec["text"])
+            cachePut(conn, key, rec["task"], rec["model"], rec["prompt_hash"], rec["text"],
+                     rec["verdict"], max_bytes=0)
+            n += 1
+    if max_bytes:
+        evict(conn, max_bytes)
+    return n
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="LLM karar önbelleği: içe/dışa aktarma")
+    ap.add_argument("action", choices=["export", "import", "stats"])
+    ap.add_argument("--db", required=True, help="Önbellek SQLite dosyası")
+    ap.add_argument("--file", help="JSONL dosyası (export/import)")
+    args = ap.parse_args()
+
+    conn = openCache(args.db)
+    if args.action == "export":
+        print(f"{exportCache(conn, args.file)} kayıt yazıldı: {args.file}")
+    elif args.action == "import":
+        print(f"{importCache(conn, args.file)} kayıt eklendi: {args.db}")
+    else:
+        count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        print(f"{count} kayıt, {totalBytes(conn)} bayt")
+    conn.close()
@@ -0,0 +1,108 @@
+# log_ingest.py
+"""
+Worker stdout'unun log'a dönüştürülmesi (satır satır değil, blok blok).
+
+- LineReader: ham bayt bloklarını artımlı UTF-8 + evrensel satır sonu
+  çözücüsünden geçirir, yalnızca tam satırları döndürür (yarım satır sonraki
+  bloğa kalır).
+- normalizeBlock: satır ortasına kaçmış bölüm etiketlerini tek derlenmiş
+  desenle yeni satıra alır.
+- SectionTracker: '[tag]' satırları üzerinde çalışan durum makinesi; yeni
+  bölüm gelmeden önceki kapanmadıysa '[tag] Bitti.' ekler. Boru hattı
+  modunda ('[pipeline]' satırı) bölümler aynı anda açık olabilir; o zaman
+  açık bölümler yalnızca finish() ile (süreç bitince) kapatılır.
+"""
+import io
+import re
+import codecs
+
+# UI'da kullandığımız etiket isimleri
+SECTION_TAGS = ("spellcheck", "grammar", "punctuation", "clarity", "tone")
+PIPELINE_TAG = "pipeline"
+
+_TAG_ANYWHERE = re.compile(r"\[(?:%s)\]" % "|".join(SECTION_TAGS))
+_TAG_LINE = re.compile(
+    r"^\[(%s)\][^\S\n]*((?i:bitti))?" % "|".join((PIPELINE_TAG,) + SECTION_TAGS),
+    re.M,
+)
+
+# ---------------- Bayt -> tam satırlar ----------------
+
+class LineReader:
+    def __init__(self):
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True
+        )
+        self._tail = ""
+
+    def feed(self, data, final=False):
+        """Blok ekler; o ana kadar tamamlanan satırları ('\\n' ile biten metin) döndürür."""
+        text = self._tail + self._decoder.decode(data, final)
+        if final:
+            self._tail = ""
+            return text if not text or text.endswith("\n") else text + "\n"
+        cut = text.rfind("\n") + 1
+        self._tail = text[cut:]
+        return text[:cut]
+
+# ---------------- Etiket normalizasyonu ----------------
+
+def normalizeBlock(text):
+    """Her bölüm etiketinin önüne satır sonu koyar (satır başındakiler boş satırla ayrılır)."""
+    return _TAG_ANYWHERE.sub("\n\\g<0>", text)
+
+# ---------------- Bölüm durum makinesi ----------------
+
+class SectionTracker:
+    def __init__(self):
+        self.open = None          # sıralı modda açık bölüm
+        self.closed = set()
+        self.parallel = False     # '[pipeline]' görüldü
+        self.open_set = set()     # boru hattı modunda açık bölümler
+
+    def feed(self, text):
+        """Tam satırlardan oluşan bloğu işler; gerekiyorsa araya 'Bitti.' satırları ekler."""
+        out, last = [], 0
+        for m in _TAG_LINE.finditer(text):
+            tag = m.group(1)
+            if tag == PIPELINE_TAG:
+                self.parallel = True
+                continue
+            is_done = m.group(2) is not None
+            if self.parallel:
+                if is_done:
+                    self.closed.add(tag)
+                    self.open_set.discard(tag)
+                elif tag not in self.closed:
+                    self.open_set.add(tag)
+                continue
+            # önceki açık bölüm kapanmadıysa, bu satırdan önce kapat
+            if self.open and self.open != tag and self.open not in self.closed:
+                out.append(text[last:m.start()])
+                out.append(f"[{self.open}] Bitti.\n")
+                last = m.start()
+                self.closed.add(self.open)
+            if is_done:
+                self.closed.add(tag)
+                if self.open == tag:
+                    self.open = None
+            else:
+                self.open = tag
+        if not out:
+            return text
+        out.append(text[last:])
+        return "".join(out)
+
+    def finish(self):
+        """Süreç bitti: açık kalan bölümlerin 'Bitti.' satırları."""
+        out = []
+        if self.open and self.open not in self.closed:
+            out.append(f"\n[{self.open}] Bitti.\n")
+            self.closed.add(self.open)
+        self.open = None
+        for tag in SECTION_TAGS:
+            if tag in self.open_set and tag not in self.closed:
+                out.append(f"[{tag}] Bitti.\n")
+                self.closed.add(tag)
+        self.open_set = set()
+        return "".join(out)
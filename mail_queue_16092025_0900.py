@@ -0,0 +1,235 @@
+# mail_queue.py
+"""
+Arka plan e-posta kuyruğu: run bitince e-posta kuyruğa bırakılır, run'ın
+worker thread'i SMTP'yi beklemez.
+
+- Tek gönderici thread'i tek bir SMTP bağlantısını (EHLO + STARTTLS + AUTH
+  bir kez) mesajlar arasında yeniden kullanır. Bağlantı NOOP_AFTER_SECONDS'tan
+  uzun boşta kaldıysa kullanmadan önce NOOP ile yoklanır, idle_seconds boyunca
+  iş gelmezse kapatılır.
+- Geçici hatalarda (bağlantı kopması, zaman aşımı, 4xx) bağlantı kapatılır ve
+  mesaj backoffDelay ile yeniden denenir; bekleyen deneme kuyruğun geri
+  kalanını tıkamaz. Kalıcı hatalar (5xx, kimlik doğrulama) tekrar denenmez.
+- Ek dosyası gönderici thread'inde hazırlanır (yol ya da yolu döndüren
+  fonksiyon); boyutu attach_max_bytes'ı aşarsa ek yerine indirme bağlantısı
+  yazılır. Gövdedeki ATTACHMENT_SLOT ('{ek}') bu notla değiştirilir.
+- Sonuçlar on_result(tag, durum, bilgi) ile bildirilir; durum: SENT, RETRY, FAILED.
+
+Yerel hata ayıklama SMTP sunucusuyla denemek için:
+    python -m aiosmtpd -n -l localhost:1025                   (Python 3.12+)
+    python -m smtpd -n -c DebuggingServer localhost:1025      (Python <= 3.11)
+    SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_STARTTLS=0 FROM_EMAIL=test@localhost
+(SMTP_USER boşsa AUTH atlanır; sunucu STARTTLS sunmuyorsa STARTTLS atlanır.)
+"""
+import os
+import time
+import heapq
+import smtplib
+import itertools
+import threading
+from email.message import EmailMessage
+
+from retry_policy_16092025_0900 import backoffDelay, TRANSIENT, FATAL
+
+# ---------------- Ayarlar ----------------
+
+NOOP_AFTER_SECONDS = 10
+ATTACHMENT_SLOT = "{ek}"
+
+SENT, RETRY, FAILED = "sent", "retry", "failed"
+
+# ---------------- Hata sınıflandırma ----------------
+
+def classifySmtpError(e):
+    """TRANSIENT: bağlantı/4xx (tekrar dene), FATAL: 5xx, kimlik doğrulama, ek hatası."""
+    if isinstance(e, smtplib.SMTPAuthenticationError):
+        return FATAL
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in e.recipients.values()]
+        return TRANSIENT if codes and all(400 <= c < 500 for c in codes) else FATAL
+    if isinstance(e, smtplib.SMTPResponseException):
+        return TRANSIENT if 400 <= e.smtp_code < 500 else FATAL
+    if isinstance(e, smtplib.SMTPNotSupportedError):
+        return FATAL
+    if isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return TRANSIENT
+    if isinstance(e, OSError) and not isinstance(e, (FileNotFoundError, PermissionError)):
+        return TRANSIENT   # soket hataları (ör. ağa ulaşılamıyor)
+    return FATAL
+
+# ---------------- Mesaj ----------------
+
+def buildMessage(from_email, to_email, subject, body, attachment_path=None, link=None, attach_max_bytes=None):
+    """EmailMessage kurar; ek sınırı aşılırsa ek yerine bağlantı. (mesaj, ek_kondu_mu) döndürür."""
+    attached = False
+    note = "ZIP bulunamadı."
+    if attachment_path and os.path.exists(attachment_path):
+        size = os.path.getsize(attachment_path)
+        if attach_max_bytes is None or size <= attach_max_bytes:
+            attached = True
+            note = "ZIP eklendi."
+        elif link:
+            note = (f"ZIP ({size / (1024 * 1024):.1f} MB) ek sınırını aşıyor; "
+                    f"buradan indirebilirsiniz: {link}")
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = from_email
+    msg["To"] = to_email
+    msg.set_content(body.replace(ATTACHMENT_SLOT, note))
+    if attached:
+        with open(attachment_path, "rb") as f:
+            data = f.read()
+        msg.add_attachment(data, maintype="application", subtype="octet-stream",
+                           filename=os.path.basename(attachment_path))
+    return msg, attached
+
+# ---------------- Kuyruk ----------------
+
+class MailQueue:
+    def __init__(self, host, port, user="", password="", from_email="", starttls=True, timeout=30,
+                 max_attempts=5, backoff_base=5.0, backoff_cap=300.0, idle_seconds=60.0,
+                 attach_max_bytes=None, on_result=None):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.from_email = from_email
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = float(backoff_base)
+        self.backoff_cap = float(backoff_cap)
+        self.idle_seconds = float(idle_seconds)
+        self.attach_max_bytes = attach_max_bytes
+        self.on_result = on_result
+        self.closed = False
+        self._heap = []                  # (vade, sıra, iş)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._smtp = None
+        self._last_used = 0.0
+        self.sent = self.failed = self.connects = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="mail-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, to_email, subject, body, attachment=None, link=None, tag=None):
+        """attachment: dosya yolu ya da gönderim anında yolu döndüren fonksiyon."""
+        job = {"to": to_email, "subject": subject, "body": body, "attachment": attachment,
+               "link": link, "tag": tag, "attempt": 0}
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), job))
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def close(self, timeout=10):
+        """Vadesi gelmiş mesajları gönderip durur; ileri tarihli yeniden denemeler bırakılır."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            dropped, self._heap = self._heap, []
+        for _, _, job in dropped:
+            self._report(job, FAILED, "sunucu kapanırken gönderilemedi")
+
+    # ---------------- Gönderici thread'i ----------------
+
+    def _take(self):
+        """Vadesi gelmiş iş; yoksa bir sonraki vadeye (en fazla idle_seconds) kadar bekleyip None."""
+        with self._cond:
+            if not self._heap or self._heap[0][0] > time.monotonic():
+                if self.closed:
+                    return self
+                delay = self._heap[0][0] - time.monotonic() if self._heap else self.idle_seconds
+                self._cond.wait(max(0.0, min(delay, self.idle_seconds)))
+            if self._heap and self._heap[0][0] <= time.monotonic():
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def _loop(self):
+        while True:
+            job = self._take()
+            if job is self:   # kapanış
+                break
+            if job is None:
+                if self._smtp is not None and time.monotonic() - self._last_used >= self.idle_seconds:
+                    self._disconnect()
+                continue
+            self._deliver(job)
+        self._disconnect()
+
+    def _deliver(self, job):
+        job["attempt"] += 1
+        try:
+            path = job["attachment"]() if callable(job["attachment"]) else job["attachment"]
+            msg, _ = buildMessage(self.from_email, job["to"], job["subject"], job["body"],
+                                  path, job["link"], self.attach_max_bytes)
+            self._connection().send_message(msg)
+            self._last_used = time.monotonic()
+        except Exception as e:
+            self._disconnect()   # oturum durumu belirsiz: sıradaki deneme temiz bağlantıyla
+            if classifySmtpError(e) == TRANSIENT and job["attempt"] < self.max_attempts:
+                delay = backoffDelay(job["attempt"], self.backoff_base, self.backoff_cap)
+                with self._cond:
+                    heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), job))
+                self._report(job, RETRY, f"{e} ({job['attempt']}/{self.max_attempts}, "
+                                         f"{delay:.0f} sn sonra tekrar denenecek)")
+            else:
+                self.failed += 1
+                self._report(job, FAILED, str(e))
+            return
+        self.sent += 1
+        self._report(job, SENT, job["to"])
+
+    def _connection(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > NOOP_AFTER_SECONDS:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self._disconnect()
+            except Exception:
+                self._disconnect()
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                smtp.ehlo()
+                if self.starttls and smtp.has_extn("starttls"):
+                    smtp.starttls()
+                    smtp.ehlo()
+                if self.user:
+                    smtp.login(self.user, self.password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self.connects += 1
+        return self._smtp
+
+    def _disconnect(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def _report(self, job, status, info):
+        if self.on_result is None:
+            return
+        try:
+            self.on_result(job["tag"], status, info)
+        except Exception as e:
+            print(f"[mail] Sonuç bildirimi başarısız: {e}", flush=True)
+
+    def describe(self):
+        with self._cond:
+            waiting = len(self._heap)
+        return (f"bekleyen={waiting} gönderilen={self.sent} başarısız={self.failed} "
+                f"bağlantı={self.connects} açık={self._smtp is not None}")
@@ -2,28 +2,40 @@
 import os
 import csv
 
-from message_action_16092025_0900 import message_action as message_action
+from extract_engine_16092025_0900 import runExtractors
+from message_action_16092025_0900 import message_action as message_action, messageRows
 from selection_action_16092025_0900 import (
     send_selection_quickreply as send_selection_quickreply,
     send_selection_card as send_selection_card,
     send_selection_list as send_selection_list,
+    quickreplyRows, cardRows, listRows,
 )
-from error_messages_16092025_0900 import error_messages as error_messages
-from email_action_16092025_0900 import email_action as email_action
+from error_messages_16092025_0900 import error_messages as error_messages, errorMessageRows
+from email_action_16092025_0900 import email_action as email_action, emailRows
 
+# Extractor kaydı: (log etiketi, adım adı, node handler'ı). Sıra = CSV'ye yazım sırası.
+EXTRACTORS = [
+    ("MESSAGE",                "message_action",            messageRows),
+    ("SELECTION / QUICKREPLY", "send_selection_quickreply", quickreplyRows),
+    ("SELECTION / CARD",       "send_selection_card",       cardRows),
+    ("SELECTION / LIST",       "send_selection_list",       listRows),
+    ("EMAIL",                  "email_action",              emailRows),
+    ("OTHER ERROR MESSAGES",   "error_messages",            errorMessageRows),
+]
 
-def runStep(label, func, *args, **kwargs):
-    """Bir adımı çalıştır, sonucu logla."""
-    try:
-        func(*args, **kwargs)
+
+def reportStep(res):
+    """Bir adımın sonucunu logla."""
+    label, err = res["label"], res["error"]
+    if err is None:
+        print(f"[{res['name']}] {res['added']} yeni satır eklendi.")
         print(f"[OK] {label}")
         return True
-    except FileNotFoundError as e:
-        print(f"[ERROR] {label}: Dosya bulunamadı -> {e.filename}")
-        return False
-    except Exception as e:
-        print(f"[ERROR] {label}: Beklenmeyen hata -> {e}")
-        return False
+    if isinstance(err, FileNotFoundError):
+        print(f"[ERROR] {label}: Dosya bulunamadı -> {err.filename}")
+    else:
+        print(f"[ERROR] {label}: Beklenmeyen hata -> {err}")
+    return False
 
 
 def readKeySet(csv_path):
@@ -65,22 +77,15 @@ def buildMessages(json_path, csv_path):
     if csv_dir and not os.path.exists(csv_dir):
         os.makedirs(csv_dir, exist_ok=True)
 
-    # 1) Çalıştırmadan ÖNCE mevcut satırların anahtar setini al
-    pre_keys = readKeySet(csv_path)
-
-    # 2) Adımlar (fonksiyonlar csv_utils ile yalnızca yeni satırları ekler)
-    runStep("MESSAGE", message_action, json_path, csv_path)
-    runStep("SELECTION / QUICKREPLY", send_selection_quickreply, json_path, csv_path)
-    runStep("SELECTION / CARD", send_selection_card, json_path, csv_path)
-    runStep("SELECTION / LIST", send_selection_list, json_path, csv_path)
-    runStep("EMAIL", email_action, json_path, csv_path)
-    runStep("OTHER ERROR MESSAGES", error_messages, json_path, csv_path)
+    # Tek geçiş: JSON bir kez okunur, tüm extractor'lar aynı node döngüsünde çalışır
+    results = runExtractors(json_path, csv_path, EXTRACTORS)
+    for res in results:
+        reportStep(res)
 
     print(f"Tamamlandı. Çıktı: {csv_path}")
 
-    # 3) SONRA: kaç yeni satır eklenmiş?
-    post_keys = readKeySet(csv_path)
-    new_count = len(post_keys - pre_keys)
+    # Her yeni satır yeni bir row_id alır; eklenen sayısı = yeni satır sayısı
+    new_count = sum(res["added"] for res in results)
     if new_count > 0:
         print(f"[delta] {new_count} yeni satır eklendi (aynı CSV).")
     else:
@@ -242,3 +242,35 @@ def render_prompt(task: str, **vars):
     system = SYSTEM[task]
     user = TEMPLATES[task].substitute(**vars)
     return system, user
+
+# Toplu (batch) mod: tek istekte birden çok metin. Görev şablonunun "User: $text"
+# öncesindeki talimat/örnek kısmı bir kez gönderilir, her öğe numaralandırılır.
+BATCH_SUFFIX = Template("""
+**Batch mode:**
+Instead of a single input, you will receive $count numbered input texts below.
+Evaluate each item independently, exactly as described above for a single text.
+Return ONE valid JSON object whose keys are the item numbers ("1" to "$count") and whose values are the result objects for those items in the output format above.
+Example for 2 items: {"1": {"0": []}, "2": {"1": ["corrected version"]}}
+Do not include any text outside the JSON object.
+
+$items
+""")
+
+def render_batch_prompt(task: str, texts, **vars):
+    """
+    task : render_prompt ile aynı
+    texts: metin listesi (öğe numaraları 1'den başlar)
+    Vars : text dışındaki şablon değişkenleri (ör. tone)
+    Returns: (system_prompt, user_prompt_string)
+    """
+    system = SYSTEM[task]
+    body = TEMPLATES[task].template
+    cut = body.rindex("User: $text")
+    head = Template(body[:cut]).safe_substitute(**vars)
+    tail = Template(body[cut:])
+    items = "\n".join(
+        f"Item {i}:\n" + tail.substitute(text=t, **vars).strip() + "\n"
+        for i, t in enumerate(texts, 1)
+    )
+    user = head + BATCH_SUFFIX.substitute(count=len(texts), items=items)
+    return system, user
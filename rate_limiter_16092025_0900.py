@@ -0,0 +1,211 @@
+# rate_limiter.py
+"""
+API geri bildirimiyle ayarlanan hız sınırlayıcı.
+
+- İki token kovası: dakikalık istek (RPM) ve dakikalık token (TPM) bütçesi.
+- x-ratelimit-* başlıkları kova kapasitesini/kalanını sunucunun görüşüne çeker,
+  Retry-After (ve retry-after-ms) gelen 429'larda tüm gönderimi o süre durdurur.
+- Eşzamanlılık AIMD ile ayarlanır: başarılı ve hızlı yanıtta toplamsal artış,
+  429'da çarpımsal azalış; gecikme taban değerin çok üstüne çıkarsa hafif azalış.
+"""
+import time
+import asyncio
+from email.utils import parsedate_to_datetime
+
+# ---------------- Ayarlar ----------------
+
+AIMD_DECREASE = 0.5        # 429 sonrası limit çarpanı
+LATENCY_DECREASE = 0.9     # gecikme şişmesinde limit çarpanı
+LATENCY_FACTOR = 2.5       # gecikme EWMA > taban * bu değer ise "şişmiş" say
+LATENCY_SLACK = 1.0        # ... ve tabanı en az bu kadar (sn) aşmışsa (kısa yanıtlarda gürültü)
+EWMA_ALPHA = 0.2
+DEFAULT_RETRY_AFTER = 5.0  # 429'da başlık yoksa bekleme (sn)
+
+# ---------------- Yardımcılar ----------------
+
+def parseDuration(val):
+    """OpenAI reset süreleri: '1s', '6m0s', '20ms', '1h2m3.5s' -> saniye."""
+    if val is None:
+        return None
+    s = str(val).strip()
+    if not s:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        pass
+    total, num = 0.0, ""
+    i = 0
+    while i < len(s):
+        c = s[i]
+        if c.isdigit() or c == ".":
+            num += c
+            i += 1
+            continue
+        unit = c
+        if s[i:i + 2] == "ms":
+            unit = "ms"
+        if not num:
+            return None
+        n = float(num)
+        total += {"h": 3600, "m": 60, "s": 1, "ms": 0.001}.get(unit, 0) * n
+        num = ""
+        i += len(unit)
+    return total
+
+def retryAfterSeconds(headers):
+    """retry-after-ms / retry-after (saniye ya da HTTP tarihi) -> saniye; yoksa None."""
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    ra = headers.get("retry-after")
+    if ra:
+        try:
+            return float(ra)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(ra).timestamp() - time.time())
+            except Exception:
+                return None
+    return None
+
+def _num(headers, name):
+    try:
+        v = headers.get(name)
+        return float(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+# ---------------- Sınırlayıcı ----------------
+
+class RateLimiter:
+    def __init__(self, rpm, tpm, max_concurrency, min_concurrency=1):
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self.req_tokens = self.rpm
+        self.tok_tokens = self.tpm
+        self.updated = time.monotonic()
+
+        self.max_limit = float(max(1, max_concurrency))
+        self.min_limit = float(max(1, min_concurrency))
+        self.limit = self.max_limit
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+
+        self.ok = 0
+        self.rate_limited = 0
+        self.latency = None
+        self.min_latency = None
+
+        self.cond = asyncio.Condition()
+
+    # ---- kovalar ----
+    def _refill(self, now):
+        dt = now - self.updated
+        self.updated = now
+        self.req_tokens = min(self.rpm, self.req_tokens + dt * self.rpm / 60.0)
+        self.tok_tokens = min(self.tpm, self.tok_tokens + dt * self.tpm / 60.0)
+
+    def _waitTime(self, now, tokens):
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.inflight >= int(self.limit):
+            return None  # bir istek bitince notify gelir
+        waits = [0.0]
+        if self.req_tokens < 1:
+            waits.append((1 - self.req_tokens) * 60.0 / self.rpm)
+        if self.tok_tokens < tokens:
+            waits.append((tokens - self.tok_tokens) * 60.0 / self.tpm)
+        return max(waits)
+
+    async def acquire(self, tokens):
+        """Bir istek için slot + kova bütçesi ayırır (gerekirse bekler)."""
+        tokens = min(float(tokens), self.tpm)  # tek istek bütçeden büyükse sonsuza dek beklemesin
+        async with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._waitTime(now, tokens)
+                if wait == 0:
+                    self.req_tokens -= 1
+                    self.tok_tokens -= tokens
+                    self.inflight += 1
+                    return tokens
+                try:
+                    await asyncio.wait_for(self.cond.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, reserved_tokens, latency=None, headers=None, used_tokens=None,
+                      rate_limited=False):
+        """İstek bitti: başlıklardan ve sonuçtan öğren, limiti ayarla, bekleyenleri uyandır."""
+        async with self.cond:
+            self.inflight = max(0, self.inflight - 1)
+            now = time.monotonic()
+            self._refill(now)
+            if used_tokens is not None:
+                # tahmin ile gerçek kullanım farkını kovaya geri yansıt
+                self.tok_tokens = min(self.tpm, self.tok_tokens + reserved_tokens - used_tokens)
+            self._applyHeaders(now, headers)
+
+            if rate_limited:
+                self.rate_limited += 1
+                self._decrease(now, AIMD_DECREASE)
+                pause = retryAfterSeconds(headers)
+                self.paused_until = max(self.paused_until, now + (pause if pause is not None else DEFAULT_RETRY_AFTER))
+            elif latency is not None:
+                self.ok += 1
+                self.latency = latency if self.latency is None else (
+                    EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency)
+                self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+                if self.latency > max(self.min_latency * LATENCY_FACTOR,
+                                      self.min_latency + LATENCY_SLACK):
+                    self._decrease(now, LATENCY_DECREASE)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.cond.notify_all()
+
+    def _decrease(self, now, factor):
+        # Aynı tıkanıklığa denk gelen ardışık yanıtlar limiti zincirleme düşürmesin:
+        # bir gecikme süresi içinde en fazla bir azalış.
+        if now - self.last_decrease < (self.latency or 1.0):
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def _applyHeaders(self, now, headers):
+        if not headers:
+            return
+        lim_r = _num(headers, "x-ratelimit-limit-requests")
+        lim_t = _num(headers, "x-ratelimit-limit-tokens")
+        if lim_r:
+            self.rpm = lim_r
+        if lim_t:
+            self.tpm = lim_t
+        rem_r = _num(headers, "x-ratelimit-remaining-requests")
+        rem_t = _num(headers, "x-ratelimit-remaining-tokens")
+        if rem_r is not None:
+            self.req_tokens = min(self.req_tokens, rem_r)
+            if rem_r < 1:
+                reset = parseDuration(headers.get("x-ratelimit-reset-requests"))
+                if reset:
+                    self.paused_until = max(self.paused_until, now + reset)
+        if rem_t is not None:
+            self.tok_tokens = min(self.tok_tokens, rem_t)
+
+    def describe(self):
+        lat = f"{self.latency:.2f}s (taban {self.min_latency:.2f}s)" if self.latency is not None else "-"
+        paused = max(0.0, self.paused_until - time.monotonic())
+        return (
+            f"limit={self.limit:.1f}/{self.max_limit:.0f} uçuşta={self.inflight} "
+            f"rpm={self.rpm:.0f} tpm={self.tpm:.0f} "
+            f"kova=(istek {self.req_tokens:.0f}, token {self.tok_tokens:.0f}) "
+            f"ok={self.ok} 429={self.rate_limited} gecikme={lat}"
+            + (f" duraklatıldı={paused:.1f}s" if paused > 0 else "")
+        )
@@ -0,0 +1,245 @@
+# result_store.py
+import os
+import csv
+import sys
+import json
+import sqlite3
+
+# ---------------- Ayarlar ----------------
+
+# Her satır yazımı tek bir UPSERT; WAL modunda commit ucuzdur ve okuyucuları bloklamaz.
+BUSY_TIMEOUT_MS = 30000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    pos   INTEGER PRIMARY KEY,
+    ident TEXT NOT NULL UNIQUE,
+    data  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# ---------------- Yardımcılar ----------------
+
+def storePathFor(csv_path):
+    """result.csv -> result.sqlite (aynı klasörde)."""
+    return os.path.splitext(os.path.abspath(csv_path))[0] + ".sqlite"
+
+def isStoreFile(name):
+    """ZIP/son dosya listelerinde atlanacak store dosyaları (db, -wal, -shm)."""
+    return name.endswith((".sqlite", ".sqlite-wal", ".sqlite-shm"))
+
+def _ident(key):
+    return json.dumps(list(key), ensure_ascii=False)
+
+def _data(row):
+    return row.toDict() if isinstance(row, CompactRow) else row
+
+# ---------------- Satır tablosu ----------------
+
+IDENTITY_FIELDS = ("row_id", "node_id", "node_name", "node_type", "module_type", "source", "text")
+_IDENTITY_SET = frozenset(IDENTITY_FIELDS)
+
+def _intern(v):
+    return sys.intern(v) if type(v) is str else v
+
+class CompactRow:
+    """
+    Sonuç satırının sıkı gösterimi: sütunlar __slots__ alanlarıdır (satır
+    başına dict ve anahtar tablosu yok), değerler intern edilir (aynı node_id,
+    tip, kaynak ve tekrar eden metinler tek kopya). Kimlik anahtarı bir kez
+    kurulup saklanır; yalnızca kimlik alanı değişince yeniden hesaplanır.
+    Kodun kullandığı dict arayüzünü (get, [], setdefault, in) sunar; dict'e
+    yalnızca store'a/CSV'ye yazarken (toDict) çevrilir.
+    Sütunlar rowType(fieldnames) ile üretilen alt sınıfta tanımlanır.
+    """
+    __slots__ = ("_key",)
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __init__(self, values=None):
+        values = values or {}
+        for f in self.FIELDS:
+            setattr(self, f, _intern(values.get(f, "")))
+        self._key = None
+
+    def get(self, field, default=None):
+        if field in self._FIELD_SET:
+            return getattr(self, field)
+        return default
+
+    def __getitem__(self, field):
+        if field not in self._FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in self._FIELD_SET:
+            raise KeyError(field)
+        setattr(self, field, _intern(value))
+        if field in _IDENTITY_SET:
+            self._key = None
+
+    def __contains__(self, field):
+        return field in self._FIELD_SET
+
+    def setdefault(self, field, default=None):
+        return self[field]
+
+    def keys(self):
+        return self.FIELDS
+
+    def identity(self):
+        key = self._key
+        if key is None:
+            key = self._key = (
+                str(self.row_id), str(self.node_id), self.node_name, self.node_type,
+                self.module_type, self.source, self.text,
+            )
+        return key
+
+    def toDict(self):
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.toDict()!r})"
+
+def rowType(fieldnames):
+    """fieldnames sütunlu CompactRow alt sınıfı (kimlik alanları her zaman dahil)."""
+    fields = tuple(fieldnames) + tuple(f for f in IDENTITY_FIELDS if f not in fieldnames)
+    return type("ResultRow", (CompactRow,), {"__slots__": fields, "FIELDS": fields,
+                                             "_FIELD_SET": frozenset(fields)})
+
+def rowIdentityKey(r):
+    if isinstance(r, CompactRow):
+        return r.identity()
+    return (
+        str(r.get("row_id", "")),
+        str(r.get("node_id", "")),
+        r.get("node_name", ""),
+        r.get("node_type", ""),
+        r.get("module_type", ""),
+        r.get("source", ""),
+        r.get("text", ""),
+    )
+
+def buildRowIndex(rows):
+    """rowIdentityKey -> satır hash index'i; lineer tarama yerine O(1) erişim."""
+    return {rowIdentityKey(r): r for r in rows}
+
+def setResult(index, key, check_col, correct_col, check_val, correct_val):
+    r = index.get(key)
+    if r is None:
+        return False
+    r[check_col] = check_val
+    r[correct_col] = correct_val
+    return True
+
+# ----------- Public API (camelCase) -----------
+
+def openStore(db_path):
+    """
+    Sonuç store'unu açar (yoksa oluşturur). WAL + synchronous=NORMAL:
+    her commit kalıcıdır, süreç çökse de son işlenen satır kaybolmaz.
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(SCHEMA)
+    return conn
+
+def storeIsEmpty(conn):
+    return conn.execute("SELECT 1 FROM results LIMIT 1").fetchone() is None
+
+def setFieldnames(conn, fieldnames):
+    with conn:
+        conn.execute(
+            "INSERT INTO meta(key, value) VALUES('fieldnames', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            (json.dumps(list(fieldnames)),),
+        )
+
+def getFieldnames(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key='fieldnames'").fetchone()
+    return json.loads(row[0]) if row else None
+
+def loadRows(conn, factory=None):
+    """
+    Satırları eklenme sırasıyla döndürür; factory (ör. rowType(...)) verilirse
+    her dict okunur okunmaz ona çevrilir, tüm tablo dict olarak bellekte tutulmaz.
+    """
+    rows = conn.execute("SELECT data FROM results ORDER BY pos")
+    if factory is None:
+        return [json.loads(data) for (data,) in rows]
+    return [factory(json.loads(data)) for (data,) in rows]
+
+def replaceRows(conn, keyed_rows):
+    """
+    Tüm tabloyu tek transaction'da yeniden yazar.
+    keyed_rows: [(identity_key_tuple, row_dict | CompactRow), ...] (sıra korunur)
+    """
+    with conn:
+        conn.execute("DELETE FROM results")
+        conn.executemany(
+            "INSERT OR REPLACE INTO results(pos, ident, data) VALUES(?, ?, ?)",
+            (
+                (i, _ident(key), json.dumps(_data(row), ensure_ascii=False))
+                for i, (key, row) in enumerate(keyed_rows, 1)
+            ),
+        )
+
+def upsertRow(conn, key, row):
+    """Tek satırı yazar (varsa günceller, yoksa sona ekler)."""
+    with conn:
+        conn.execute(
+            "INSERT INTO results(pos, ident, data) "
+            "VALUES((SELECT COALESCE(MAX(pos), 0) + 1 FROM results), ?, ?) "
+            "ON CONFLICT(ident) DO UPDATE SET data=excluded.data",
+            (_ident(key), json.dumps(_data(row), ensure_ascii=False)),
+        )
+
+def exportCsv(conn, csv_path, fieldnames=None):
+    """
+    Store içeriğini CSV'ye tek seferde yazar. Önce geçici dosyaya yazıp
+    os.replace ile değiştirir; yarım kalmış bir CSV asla görünmez.
+    """
+    fieldnames = fieldnames or getFieldnames(conn)
+    if not fieldnames:
+        return False
+    tmp_path = csv_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        w.writeheader()
+        for (data,) in conn.execute("SELECT data FROM results ORDER BY pos"):
+            row = json.loads(data)
+            for k in fieldnames:
+                row.setdefault(k, "")
+            w.writerow(row)
+    os.replace(tmp_path, csv_path)
+    return True
+
+def exportStoreFile(db_path, csv_path):
+    """Dışarıdan (ör. /stop sonrası app) çağrılabilen kısayol."""
+    if not os.path.exists(db_path):
+        return False
+    conn = openStore(db_path)
+    try:
+        if storeIsEmpty(conn):
+            return False
+        return exportCsv(conn, csv_path)
+    finally:
+        conn.close()
+
+def closeStore(conn):
+    """WAL'i ana dosyaya işleyip bağlantıyı kapatır (-wal/-shm dosyaları temizlenir)."""
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
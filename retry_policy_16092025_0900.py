@@ -0,0 +1,101 @@
+# retry_policy.py
+"""
+Geçici API hataları için yeniden deneme politikası ve devre kesici.
+
+- backoffDelay: "full jitter" üstel geri çekilme; sunucu Retry-After verdiyse
+  en az o kadar beklenir.
+- CircuitBreaker: art arda geçici hata eşiği aşılınca devre açılır ve yeni
+  gönderimler soğuma süresi boyunca bekletilir (kuyruk boşuna tüketilmez).
+  Süre dolunca tek bir deneme isteği geçirilir (yarı açık); başarılıysa devre
+  kapanır, değilse soğuma süresi ikiye katlanarak yeniden açılır.
+"""
+import time
+import random
+import asyncio
+
+# ---------------- Hata sınıfları ----------------
+
+RATE_LIMIT = "rate_limit"   # 429: sınırlayıcı zaten duraklatır, tekrar dene
+TRANSIENT = "transient"     # 5xx, zaman aşımı, bağlantı: tekrar dene + devre kesiciye say
+PARSE = "parse"             # yanıt ayrıştırılamadı: tekrar dene
+FATAL = "fatal"             # 4xx (401/403/400/404...): tekrar denemenin anlamı yok
+
+class UnparseableResponse(Exception):
+    """Model yanıtı beklenen JSON kararına indirgenemedi."""
+
+# ---------------- Geri çekilme ----------------
+
+def backoffDelay(attempt, base, cap, retry_after=None):
+    """attempt: 1'den başlar. [0, min(cap, base*2^(attempt-1))] aralığında rastgele bekleme."""
+    delay = random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+# ---------------- Devre kesici ----------------
+
+CLOSED, OPEN, HALF_OPEN = "kapalı", "açık", "yarı açık"
+PROBE_POLL_SECONDS = 0.2
+
+class CircuitBreaker:
+    def __init__(self, threshold, cooldown, max_cooldown=300.0):
+        self.threshold = max(1, int(threshold))
+        self.base_cooldown = float(cooldown)
+        self.cooldown = self.base_cooldown
+        self.max_cooldown = float(max_cooldown)
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.trips = 0
+
+    async def wait(self):
+        """Devre açıksa soğuma bitene kadar bekler; yarı açıkta yalnızca tek deneme geçer."""
+        while True:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self.open_until:
+                    await asyncio.sleep(self.open_until - now)
+                    continue
+                self.state = HALF_OPEN
+                self.probing = False
+                print("[breaker] Devre yarı açık: deneme isteği gönderiliyor.", flush=True)
+            if not self.probing:
+                self.probing = True
+                return
+            await asyncio.sleep(PROBE_POLL_SECONDS)
+
+    def record(self, ok):
+        """Bir isteğin sonucu: ok=False yalnızca geçici sunucu/bağlantı hatalarında."""
+        if ok:
+            if self.state != CLOSED:
+                print("[breaker] Devre kapandı: API yeniden yanıt veriyor.", flush=True)
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+            self.cooldown = self.base_cooldown
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.threshold:
+            self._open()
+
+    def abandon(self):
+        """Sonucu bilinmeden biten deneme (iptal): yarı açıkta sıradaki denemeye yol ver."""
+        if self.state == HALF_OPEN:
+            self.probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.probing = False
+        self.trips += 1
+        self.open_until = time.monotonic() + self.cooldown
+        print(f"[breaker] Devre açıldı: {self.failures} ardışık geçici hata; "
+              f"gönderim {self.cooldown:.0f} sn duraklatıldı.", flush=True)
+
+    def describe(self):
+        return f"durum={self.state} ardışık_hata={self.failures} açılma={self.trips}"
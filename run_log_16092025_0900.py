@@ -0,0 +1,214 @@
+# run_log.py
+"""
+Run başına yalnızca-ekleme (append-only) log deposu.
+
+- Her ekleme tek bir parça (bytes) olarak listeye eklenir: O(1), string
+  birleştirme/kopyalama yok.
+- Kendi kilidi vardır; okuyucular ve yazan worker global LOCK için yarışmaz.
+- Konumlar UTF-8 bayt ofsetidir; SSE olay id'si olarak kullanılır, yeniden
+  bağlanan istemci Last-Event-ID ile kaldığı yerden devam eder.
+- Her ekleme outputs/<run_id>/run.log dosyasına da yazılır (write-through);
+  böylece aynı run'ı başka bir HTTP worker'ı da dosyadan izleyebilir.
+  Bellekte yalnızca son ~SPILL_BYTES tutulur; daha eski ofsetler dosyadan okunur.
+- Yazan taraf thread'dir, okuyan SSE akışları asyncio'dadır: waitBeyond() ile
+  bekleyen akışlar ekleme/kapanışta call_soon_threadsafe ile uyandırılır
+  (yoklama yok, bekleyen akış thread tutmaz).
+"""
+import os
+import bisect
+import asyncio
+import threading
+
+SPILL_BYTES = int(float(os.getenv("RUN_LOG_SPILL_MB", "1") or "1") * 1024 * 1024)
+RUN_LOG_NAME = "run.log"
+READ_LIMIT = 1024 * 1024   # tek okumada en fazla (bayt)
+
+def _charBoundary(data):
+    """limit bir UTF-8 karakterini ortadan böldüyse yarım kalan baytları dışarıda bırakır."""
+    i = len(data) - 1
+    while i >= 0 and len(data) - i <= 4 and (data[i] & 0xC0) == 0x80:
+        i -= 1
+    if i < 0 or data[i] < 0xC0:
+        return len(data)
+    need = 2 if data[i] < 0xE0 else 3 if data[i] < 0xF0 else 4
+    return i if len(data) - i < need else len(data)
+
+def _wake(waiters):
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass   # akışın loop'u kapanmış
+
+def readFileFrom(path, offset, limit=READ_LIMIT):
+    """
+    Log dosyasından offset'ten itibaren en fazla ~limit bayt: (metin, yeni_ofset).
+    Başka bir süreçte yazılan run'ı izlemek için (dosya yoksa boş döner).
+    """
+    limit = max(4, int(limit))
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, int(offset)))
+            data = f.read(limit)
+    except FileNotFoundError:
+        return "", offset
+    cut = _charBoundary(data)
+    return data[:cut].decode("utf-8", errors="replace"), offset + cut
+
+class RunLog:
+    def __init__(self, path, text="", spill_bytes=SPILL_BYTES):
+        self.path = path
+        self.spill_bytes = max(1024, int(spill_bytes))
+        self.lock = threading.Lock()
+        self._file = None      # yazma için açık tutulan dosya (ilk eklemede açılır)
+        self._chunks = []      # bellekteki son parçalar (bytes)
+        self._starts = []      # her parçanın başlangıç ofseti
+        self._mem_start = 0    # bellekteki ilk baytın ofseti (öncesi yalnızca dosyada)
+        self._mem_bytes = 0
+        self.size = 0
+        self._last = b"\n"
+        self.closed = False    # run bitti: bundan sonra ekleme beklenmez
+        self._waiters = []     # [(loop, asyncio.Event)] yeni veri bekleyen akışlar
+        if os.path.exists(path):
+            # sunucu yeniden başladı: önceki süreçten kalan log korunur, ofsetler ondan devam eder
+            self.size = self._mem_start = os.path.getsize(path)
+            if self.size:
+                with open(path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    self._last = f.read(1)
+        if text:
+            self.append(text, line=True)
+
+    def append(self, text, line=False):
+        """
+        Metni ekler; eklenen parçanın bitiş ofsetini döndürür.
+        line=True: önceki parça satır sonuyla bitmediyse araya satır sonu koyar.
+        """
+        if not text:
+            return self.size
+        data = text.encode("utf-8")
+        with self.lock:
+            if line and self._last != b"\n":
+                data = b"\n" + data
+            if self.closed:
+                # kapanıştan sonraki geç ekleme: tek seferlik yazılır, kalıcı tanıtıcı yeniden açılmaz
+                with self._open() as f:
+                    f.write(data)
+            else:
+                if self._file is None:
+                    self._file = self._open()
+                self._file.write(data)
+                self._file.flush()
+            self._chunks.append(data)
+            self._starts.append(self.size)
+            self.size += len(data)
+            self._mem_bytes += len(data)
+            self._last = data[-1:]
+            if self._mem_bytes > self.spill_bytes:
+                self._trim(self.spill_bytes // 2)
+            size = self.size
+            waiters, self._waiters = self._waiters, []
+        _wake(waiters)
+        return size
+
+    def appendLine(self, text):
+        return self.append(text, line=True)
+
+    def close(self):
+        """Run bitti: bekleyen akışlar kalanı okuyup kapanır."""
+        with self.lock:
+            self.closed = True
+            self._closeFile()
+            waiters, self._waiters = self._waiters, []
+        _wake(waiters)
+
+    async def waitBeyond(self, offset, timeout):
+        """
+        Log offset'i geçene ya da kapanana kadar bekler (event loop'u bloklamadan).
+        Veri/kapanış varsa True, zaman aşımında False.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.lock:
+            if self.size > offset or self.closed:
+                return True
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self.lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def endswith(self, suffix):
+        with self.lock:
+            return self._last == suffix.encode("utf-8")[-1:]
+
+    def persist(self):
+        """Bellekteki kuyruğu bırakır (run bellekten düşmeden önce); okumalar dosyadan sürer."""
+        with self.lock:
+            self._closeFile()
+            self._trim(0)
+
+    def _open(self):
+        log_dir = os.path.dirname(self.path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        return open(self.path, "ab")
+
+    def _closeFile(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _trim(self, keep_bytes):
+        # Bellekte en fazla keep_bytes kalana kadar en eski parçaları bırak
+        # (hepsi zaten dosyada; kilit altında çağrılır)
+        keep_from = len(self._chunks)
+        kept = 0
+        while keep_from > 0 and kept + len(self._chunks[keep_from - 1]) <= keep_bytes:
+            keep_from -= 1
+            kept += len(self._chunks[keep_from])
+        if keep_from == 0:
+            return
+        self._mem_start = self._starts[keep_from] if keep_from < len(self._chunks) else self.size
+        self._chunks = self._chunks[keep_from:]
+        self._starts = self._starts[keep_from:]
+        self._mem_bytes = kept
+
+    def readFrom(self, offset, limit=READ_LIMIT):
+        """offset'ten itibaren en fazla ~limit bayt: (metin, yeni_ofset)."""
+        offset = max(0, min(int(offset), self.size))
+        limit = max(4, int(limit))   # en az bir tam karakter: okuma her zaman ilerler
+        parts, got = [], 0
+        with self.lock:
+            if offset < self._mem_start:
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(min(limit, self._mem_start - offset))
+                parts.append(data)
+                got = len(data)
+                offset += got
+            if offset >= self._mem_start and got < limit and self._chunks:
+                i = max(0, bisect.bisect_right(self._starts, offset) - 1)
+                skip = offset - self._starts[i]
+                while i < len(self._chunks) and got < limit:
+                    data = self._chunks[i][skip:]
+                    parts.append(data)
+                    got += len(data)
+                    offset += len(data)
+                    skip = 0
+                    i += 1
+        data = b"".join(parts)
+        cut = _charBoundary(data)
+        return data[:cut].decode("utf-8", errors="replace"), offset - (len(data) - cut)
+
+    def text(self):
+        """Tüm log (yalnızca dosyada kalan kısım dahil)."""
+        parts, offset = [], 0
+        while offset < self.size:
+            chunk, offset = self.readFrom(offset)
+            parts.append(chunk)
+        return "".join(parts)
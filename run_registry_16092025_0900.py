@@ -0,0 +1,240 @@
+# run_registry.py
+"""
+Run kayıt defteri (SQLite/WAL): her run'ın kalıcı üst verisi.
+
+Bellekteki RUNS yalnızca canlı (kuyrukta/çalışan) ve yakın zamanda bitmiş
+run'ları tutar; bitmiş run TTL dolunca bellekten düşer (logu run.log
+dosyasına yazılmış olur). /status, /download, /download-last ve /runs
+bellekte olmayan run'ları buradan indeksli sorgularla sunar; sunucu yeniden
+başlasa da geçmiş run'lar ve çıktıları bulunur.
+
+Birden çok HTTP worker'ı bu tabloyu paylaşır: run'ı çalıştıran süreç (owner)
+durumu buraya yazar; diğer worker'lar /status, /stream (run.log dosyasından)
+ve /download'ı buradan sunar. Başka worker'a gelen /stop, stop_requested
+bayrağı olarak bırakılır; sahibi süreç bayrağı yoklayıp run'ı durdurur.
+
+run_key: run'ın kimliği (tasarım içeriğinin sha256'sı + hedef ton + görev
+kümesi). Aynı anahtarla gelen istek sürmekte olan run'a bağlanır ya da
+başarıyla bitmiş run'ın çıktılarıyla yanıtlanır. Aynı run_key'le en fazla bir
+kuyrukta/çalışan run olabilir (kısmi benzersiz index): iki worker aynı anda
+yeni run açmaya kalkarsa ikincinin kaydı IntegrityError alır ve ilkine bağlanır.
+Bağlanan isteğin alıcısı email_to'ya addEmailRecipient ile eklenir; saveRun
+dolu email_to'yu ezmez (başka süreçte eklenen alıcı kaybolmaz). idem_key: istemcinin
+Idempotency-Key'i (benzersiz); aynı anahtarla tekrar gelen istek aynı run'ı alır.
+design_name: tasarımın içerikten bağımsız adı (yerel yol ya da yüklenen dosya
+adı); yeni sürümün artımlı kontrolü için önceki run (baseline) bununla bulunur.
+"""
+import os
+import time
+import hashlib
+import sqlite3
+
+from job_queue_16092025_0900 import ownerAlive, ensureColumns
+
+# ---------------- Ayarlar ----------------
+
+BUSY_TIMEOUT_MS = 30000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    finished_at REAL,
+    outdir      TEXT,
+    json_path   TEXT,
+    tone        TEXT,
+    email_to    TEXT,
+    email_sent  INTEGER NOT NULL DEFAULT 0,
+    code        INTEGER,
+    zip         TEXT,
+    last_file   TEXT,
+    log_path    TEXT,
+    owner       TEXT,
+    stop_requested INTEGER NOT NULL DEFAULT 0,
+    run_key     TEXT,
+    idem_key    TEXT,
+    design_name TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS runs_status_created ON runs(status, created_at);
+"""
+# eski veritabanlarında sütunlar ensureColumns ile eklendikten sonra kurulur
+KEY_INDEXES = """
+CREATE INDEX IF NOT EXISTS runs_key_created ON runs(run_key, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_idem ON runs(idem_key) WHERE idem_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS runs_design_created ON runs(design_name, created_at);
+"""
+LIVE_KEY_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS runs_key_live ON runs(run_key) "
+    "WHERE run_key IS NOT NULL AND status IN ('queued', 'running')"
+)
+
+FINAL_STATUSES = ("ok", "error", "stopped")
+COLUMNS = (
+    "run_id", "status", "created_at", "finished_at", "outdir", "json_path", "tone",
+    "email_to", "email_sent", "code", "zip", "last_file", "log_path", "owner", "stop_requested",
+    "run_key", "idem_key", "design_name",
+)
+
+# ----------- Public API (camelCase) -----------
+
+def openRegistry(db_path):
+    db_dir = os.path.dirname(db_path)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
+    # bağlantı uygulama içinde kilitle korunarak thread'ler arasında paylaşılır
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(SCHEMA)
+    ensureColumns(conn, "runs", [
+        ("owner", "TEXT"), ("stop_requested", "INTEGER NOT NULL DEFAULT 0"),
+        ("run_key", "TEXT"), ("idem_key", "TEXT"), ("design_name", "TEXT"),
+    ])
+    conn.executescript(KEY_INDEXES)
+    try:
+        conn.execute(LIVE_KEY_INDEX)
+    except sqlite3.IntegrityError:
+        # eski sürümden kalan aynı anahtarlı canlı run'lar: bitince sonraki açılışta kurulur
+        print("[registry] runs_key_live kurulamadı: aynı run_key'le birden çok canlı run var.", flush=True)
+    return conn
+
+def runKey(design_sha256, target_tone, tasks):
+    """Aynı sonucu üretecek run'ların ortak anahtarı (eşzamanlılık/batch ayarları dahil değil)."""
+    ident = "|".join([design_sha256, (target_tone or "").strip().lower(), ",".join(sorted(tasks))])
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+def saveRun(conn, run_id, status, **fields):
+    """
+    Run satırını ekler ya da verilen alanları günceller. created_at ilk
+    eklemede, finished_at run ilk kez bitmiş bir duruma geçtiğinde yazılır.
+    """
+    fields = {k: v for k, v in fields.items() if k in COLUMNS and k not in ("run_id", "created_at")}
+    fields["status"] = status
+    if "email_sent" in fields:
+        fields["email_sent"] = int(bool(fields["email_sent"]))
+    if status in FINAL_STATUSES:
+        fields.setdefault("finished_at", time.time())
+    cols = ", ".join(fields)
+    marks = ", ".join("?" for _ in fields)
+    updates = ", ".join(
+        f"{k} = COALESCE(runs.{k}, excluded.{k})" if k == "finished_at"
+        else f"{k} = COALESCE(NULLIF(runs.{k}, ''), excluded.{k})" if k == "email_to"
+        else f"{k} = excluded.{k}"
+        for k in fields
+    )
+    with conn:
+        conn.execute(
+            f"INSERT INTO runs(run_id, created_at, {cols}) VALUES(?, ?, {marks}) "
+            f"ON CONFLICT(run_id) DO UPDATE SET {updates}",
+            (run_id, time.time(), *fields.values()),
+        )
+
+def getRun(conn, run_id):
+    row = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    return dict(zip(COLUMNS, row)) if row else None
+
+def listRuns(conn, status=None, limit=50, offset=0):
+    """En yeni önce; status verilirse yalnızca o durumdakiler."""
+    where, params = "", []
+    if status:
+        where, params = "WHERE status = ?", [status]
+    rows = conn.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM runs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+        (*params, int(limit), int(offset)),
+    ).fetchall()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+def countRuns(conn, status=None):
+    if status:
+        return conn.execute("SELECT COUNT(*) FROM runs WHERE status = ?", (status,)).fetchone()[0]
+    return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+def findRunByKey(conn, run_key, statuses):
+    """run_key'i taşıyan, verilen durumlardaki en yeni run (yoksa None)."""
+    marks = ", ".join("?" for _ in statuses)
+    row = conn.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM runs WHERE run_key = ? AND status IN ({marks}) "
+        f"ORDER BY created_at DESC LIMIT 1",
+        (run_key, *statuses),
+    ).fetchone()
+    return dict(zip(COLUMNS, row)) if row else None
+
+def findBaselineCandidates(conn, design_name, limit=5):
+    """Aynı tasarımın bitmiş run'ları, en yeni önce (çıktısı silinmiş olabilir; çağıran kontrol eder)."""
+    rows = conn.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM runs WHERE design_name = ? "
+        f"AND status IN ('ok', 'error', 'stopped') ORDER BY created_at DESC LIMIT ?",
+        (design_name, int(limit)),
+    ).fetchall()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+def splitRecipients(value):
+    return [a.strip() for a in (value or "").split(",") if a.strip()]
+
+def addEmailRecipient(conn, run_id, email_to):
+    """
+    email_to listesine alıcı ekler (okuma ve yazma tek BEGIN IMMEDIATE
+    transaction'ında; süreçler birbirinin eklediğini ezmez). Güncel listeyi
+    döndürür; alıcı zaten varsa liste değişmez, run yoksa None.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT email_to FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        current = splitRecipients(row[0])
+        if email_to not in current:
+            current.append(email_to)
+            conn.execute("UPDATE runs SET email_to = ? WHERE run_id = ?", (", ".join(current), run_id))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return ", ".join(current)
+
+def findRunByIdem(conn, idem_key):
+    row = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM runs WHERE idem_key = ?", (idem_key,)).fetchone()
+    return dict(zip(COLUMNS, row)) if row else None
+
+def requestStop(conn, run_id):
+    """Başka süreçteki run için durdurma isteği bırakır; run hâlâ sürüyorsa True."""
+    with conn:
+        cur = conn.execute(
+            "UPDATE runs SET stop_requested = 1 WHERE run_id = ? AND status NOT IN ('ok', 'error', 'stopped')",
+            (run_id,),
+        )
+    return cur.rowcount > 0
+
+def stopRequests(conn, owner):
+    """owner'ın sürmekte olan run'larından durdurulması istenenler."""
+    return [
+        run_id for (run_id,) in conn.execute(
+            "SELECT run_id FROM runs WHERE owner IS ? AND stop_requested = 1 "
+            "AND status NOT IN ('ok', 'error', 'stopped')",
+            (owner,),
+        )
+    ]
+
+def abandonUnfinished(conn, owner=None, keep=()):
+    """
+    Açılışta: sahibi artık yaşamayan (ya da bu süreç olan) bitmemiş run'lardan
+    kuyruktan geri yüklenmeyenleri 'error' olarak kapatır; kapatılan sayısını döndürür.
+    """
+    keep = set(keep)
+    rows = conn.execute(
+        "SELECT run_id, owner FROM runs WHERE status NOT IN ('ok', 'error', 'stopped')"
+    ).fetchall()
+    dead = [
+        run_id for run_id, o in rows
+        if run_id not in keep and (o is None or o == owner or not ownerAlive(o))
+    ]
+    with conn:
+        conn.executemany(
+            "UPDATE runs SET status = 'error', finished_at = ? WHERE run_id = ?",
+            [(time.time(), run_id) for run_id in dead],
+        )
+    return len(dead)
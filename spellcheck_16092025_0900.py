@@ -52,13 +52,30 @@ import csv
 import json
 import re
 import time
+import signal
+import asyncio
+import threading
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from openai import OpenAI
-from prompts_16092025_0900 import render_prompt
+from openai import (
+    OpenAI, AsyncOpenAI, RateLimitError,
+    APIStatusError, APIConnectionError, APITimeoutError,
+)
+from prompts_16092025_0900 import render_prompt, render_batch_prompt
 from messagesPrep_16092025_0900 import buildMessages
+from result_store_16092025_0900 import (
+    storePathFor, openStore, storeIsEmpty, setFieldnames, loadRows,
+    replaceRows, upsertRow, exportCsv, closeStore,
+    rowIdentityKey, buildRowIndex, setResult, rowType,
+)
+from rate_limiter_16092025_0900 import RateLimiter, retryAfterSeconds
+from retry_policy_16092025_0900 import (
+    RATE_LIMIT, TRANSIENT, PARSE, FATAL,
+    UnparseableResponse, backoffDelay, CircuitBreaker,
+)
+from llm_cache_16092025_0900 import openCache, cacheGet, cachePut, cacheKey, promptHash
 
 # ----------------------------
 # PATH'LER
@@ -66,6 +83,7 @@ from messagesPrep_16092025_0900 import buildMessages
 """ JSON_PATH         = "/Users/emirhansahin/Desktop/Desktop/Mapathon/project2/data/akmerkez/app/Akmerkez TR App_design.json"
 MESSAGES_CSV_PATH = "/Users/emirhansahin/Desktop/Desktop/Mapathon/project2/output/akmerkez/app/akmerkez_app_messages2.csv"
 OUTPUT_CSV_PATH   = "/Users/emirhansahin/Desktop/Desktop/Mapathon/project2/output/akmerkez/app/akmerkez_app_output2.csv" """
+MESSAGES_PREPARED = False   # --messages_prepared: messages.csv app kuyruğunda çıkarıldı
 
 # -*- coding: utf-8 -*-
 # dosyanın başlarına ekle
@@ -96,47 +114,194 @@ try:
 except Exception:
     pass
 
-import argparse, os
+import argparse
+
+def buildParser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", required=True, help="Girdi JSON dosyası")
+    parser.add_argument("--output_csv", required=True, help="Çıktı CSV dosyası")
+    parser.add_argument("--messages_csv", required=False, help="Ara çıktı messages.csv (opsiyonel)")
+    parser.add_argument("--messages_prepared", action="store_true",
+                        help="messages.csv önceden çıkarıldı (app kuyruğu); doluysa JSON yeniden okunmaz")
+    parser.add_argument("--target_tone", required=False, default="", help="Hedef ton (ör. tr-formal, en-casual)")
+    parser.add_argument("--result_db", required=False, help="Satır bazlı sonuç store'u (varsayılan: <output_csv>.sqlite)")
+    parser.add_argument("--cache_path", required=False,
+                        help="Kalıcı LLM karar önbelleği (varsayılan: LLM_CACHE_PATH ya da outputs/llm_cache.sqlite)")
+    parser.add_argument("--no_cache", action="store_true", help="Önbelleği kullanma")
+    parser.add_argument("--concurrency", required=False, type=int, default=None,
+                        help="Görev başına aynı anda uçuşta olan istek sayısı (varsayılan: LLM_CONCURRENCY ya da 8)")
+    parser.add_argument("--rpm", required=False, type=int, default=None,
+                        help="Dakikalık istek bütçesi (varsayılan: LLM_RPM ya da 500; API başlıkları günceller)")
+    parser.add_argument("--tpm", required=False, type=int, default=None,
+                        help="Dakikalık token bütçesi (varsayılan: LLM_TPM ya da 30000; API başlıkları günceller)")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Görevleri eskisi gibi sırayla (beş tam geçiş) çalıştır; varsayılan satır bazlı boru hattı")
+    parser.add_argument("--batch_size", required=False, default=None,
+                        help="Tek istekte en fazla kaç metin: '8' ya da 'spellcheck=20,grammar=10' (varsayılan: LLM_BATCH_SIZE ya da 1 = kapalı)")
+    parser.add_argument("--batch_tokens", required=False, type=int, default=None,
+                        help="Bir toplu istekteki metinlerin yaklaşık token bütçesi (varsayılan: LLM_BATCH_TOKENS ya da 2000)")
+    parser.add_argument("--max_attempts", required=False, type=int, default=None,
+                        help="Geçici hatada bir çağrı için en fazla deneme (varsayılan: LLM_MAX_ATTEMPTS ya da 5)")
+    parser.add_argument("--retry_failed", action="store_true",
+                        help="Yalnızca önceki çalıştırmada 'failed' kalan hücreleri yeniden dene")
+    parser.add_argument("--baseline_csv", required=False, default=None,
+                        help="Önceki run'ın result.csv'si: metni değişmemiş (node, source, text) satırların kararları devralınır")
+    parser.add_argument("--baseline_tone", required=False, default=None,
+                        help="Önceki run'ın hedef tonu; --target_tone'dan farklıysa ton kararları devralınmaz")
+    return parser
+
+TASKS = ("spellcheck", "grammar", "punctuation", "clarity", "tone")
+
+def parseBatchSizes(spec):
+    """'8' -> tüm görevler 8; 'spellcheck=20,grammar=10' -> görev bazında (diğerleri 1)."""
+    spec = (spec or "").strip()
+    if not spec:
+        return {t: 1 for t in TASKS}
+    if "=" not in spec:
+        return {t: max(1, int(spec)) for t in TASKS}
+    sizes = {t: 1 for t in TASKS}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, val = part.partition("=")
+        if name.strip() not in sizes:
+            raise ValueError(f"Bilinmeyen görev: {name.strip()}")
+        sizes[name.strip()] = max(1, int(val))
+    return sizes
+
+def configure(args):
+    """
+    Bir run'ın ayarlarını (argparse Namespace) modül değişkenlerine yazar ve
+    önceki run'dan kalan durumu sıfırlar; aynı süreçte art arda çalışan işler
+    (sıcak worker) birbirinin satırlarını/sayaçlarını görmez.
+    """
+    global JSON_PATH, OUTPUT_CSV_PATH, MESSAGES_CSV_PATH, MESSAGES_PREPARED, RESULT_DB_PATH, CACHE_PATH
+    global TARGET_TONE, CONCURRENCY, RPM, TPM, BATCH_SIZES, BATCH_TOKENS, MAX_ATTEMPTS, API_KEY
+    global BASELINE_CSV_PATH, BASELINE_SAME_TONE
+
+    JSON_PATH       = args.json
+    OUTPUT_CSV_PATH = args.output_csv
+
+    if args.messages_csv:
+        MESSAGES_CSV_PATH = args.messages_csv
+    else:
+        out_dir = os.path.dirname(os.path.abspath(OUTPUT_CSV_PATH)) or "."
+        MESSAGES_CSV_PATH = os.path.join(out_dir, "messages.csv")
+    MESSAGES_PREPARED = args.messages_prepared
+
+    RESULT_DB_PATH = args.result_db or storePathFor(OUTPUT_CSV_PATH)
+    CACHE_PATH = None if args.no_cache else (
+        args.cache_path
+        or os.getenv("LLM_CACHE_PATH")
+        or os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs", "llm_cache.sqlite")
+    )
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--json", required=True, help="Girdi JSON dosyası")
-parser.add_argument("--output_csv", required=True, help="Çıktı CSV dosyası")
-parser.add_argument("--messages_csv", required=False, help="Ara çıktı messages.csv (opsiyonel)")
-parser.add_argument("--target_tone", required=False, default="", help="Hedef ton (ör. tr-formal, en-casual)")
-args = parser.parse_args()
+    TARGET_TONE = args.target_tone or "tr-formal"
+    CONCURRENCY = max(1, args.concurrency or int(os.getenv("LLM_CONCURRENCY", "8") or "8"))
 
-JSON_PATH       = args.json
-OUTPUT_CSV_PATH = args.output_csv
+    RPM = args.rpm or int(os.getenv("LLM_RPM", "500") or "500")
+    TPM = args.tpm or int(os.getenv("LLM_TPM", "30000") or "30000")
+    BATCH_SIZES  = parseBatchSizes(args.batch_size or os.getenv("LLM_BATCH_SIZE", ""))
+    BATCH_TOKENS = max(1, args.batch_tokens or int(os.getenv("LLM_BATCH_TOKENS", "2000") or "2000"))
+    MAX_ATTEMPTS = max(1, args.max_attempts or int(os.getenv("LLM_MAX_ATTEMPTS", "5") or "5"))
+    BASELINE_CSV_PATH = args.baseline_csv
+    BASELINE_SAME_TONE = (args.baseline_tone or "tr-formal") == TARGET_TONE
 
-if args.messages_csv:
-    MESSAGES_CSV_PATH = args.messages_csv
-else:
-    out_dir = os.path.dirname(os.path.abspath(OUTPUT_CSV_PATH)) or "."
-    MESSAGES_CSV_PATH = os.path.join(out_dir, "messages.csv")
+    API_KEY = os.getenv("OPENAI_API_KEY")
+    if not API_KEY:
+        raise RuntimeError("OPENAI_API_KEY bulunamadı. Ortam değişkeni ya da .env ile sağlayın.")
 
-TARGET_TONE = args.target_tone or "tr-formal"
+    print(f"TARGET_TONE={TARGET_TONE}", flush=True)
+    print(f"CONCURRENCY={CONCURRENCY}", flush=True)
+    print(f"RATE_LIMIT=rpm {RPM}, tpm {TPM} (başlıklara göre uyarlanır)", flush=True)
+    print(f"MAX_ATTEMPTS={MAX_ATTEMPTS}", flush=True)
+    print(f"BATCH_SIZE={','.join(f'{t}={n}' for t, n in BATCH_SIZES.items())} (token bütçesi: {BATCH_TOKENS})", flush=True)
+    print(f"JSON={JSON_PATH}", flush=True)
+    print(f"OUTPUT_CSV={OUTPUT_CSV_PATH}", flush=True)
+    print(f"MESSAGES_CSV={MESSAGES_CSV_PATH}", flush=True)
+    print(f"RESULT_DB={RESULT_DB_PATH}", flush=True)
+    print(f"LLM_CACHE={CACHE_PATH or 'kapalı'}", flush=True)
+    if BASELINE_CSV_PATH:
+        print(f"BASELINE_CSV={BASELINE_CSV_PATH}{'' if BASELINE_SAME_TONE else ' (ton farklı: ton kararları hariç)'}", flush=True)
 
-print(f"TARGET_TONE={TARGET_TONE}", flush=True)
-print(f"JSON={JSON_PATH}", flush=True)
-print(f"OUTPUT_CSV={OUTPUT_CSV_PATH}", flush=True)
-print(f"MESSAGES_CSV={MESSAGES_CSV_PATH}", flush=True)
+    if TONE_OVERRIDE:
+        TARGET_TONE = TONE_OVERRIDE
+    resetRunState()
 
 
 
 # ----------------------------
 # KONTROLLER
 # ----------------------------
-TARGET_TONE   = "Siz dili"
-DELAY_SECONDS = 0.1
+TONE_OVERRIDE = "Siz dili"   # doluysa --target_tone yerine bu ton kullanılır
+DELAY_SECONDS = float(os.getenv("LLM_DELAY_SECONDS", "0") or "0")  # hızı artık RateLimiter ayarlıyor
 
 # ----------------------------
 # OpenAI
 # ----------------------------
 API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    raise RuntimeError("OPENAI_API_KEY bulunamadı. Ortam değişkeni ya da .env ile sağlayın.")
 OPENAI_MODEL = "gpt-4.1"
-client = OpenAI(api_key=API_KEY)
+
+# İstemciler ve event loop süreç boyunca yaşar: sıcak worker'da art arda
+# gelen işler aynı HTTP bağlantı havuzunu (TLS oturumlarını) kullanır.
+_CLIENT = None
+_ACLIENT = None
+_LOOP = None
+
+def syncClient():
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.api_key != API_KEY:
+        _CLIENT = OpenAI(api_key=API_KEY)
+    return _CLIENT
+
+def asyncClient():
+    """Tek AsyncOpenAI; yeniden denemeyi withRetry yönettiği için max_retries=0."""
+    global _ACLIENT
+    if _ACLIENT is not None and _ACLIENT.api_key != API_KEY:
+        runAsync(_ACLIENT.close())
+        _ACLIENT = None
+    if _ACLIENT is None:
+        _ACLIENT = AsyncOpenAI(api_key=API_KEY, max_retries=0)
+    return _ACLIENT
+
+def _cancelPending(loop):
+    pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
+    for t in pending:
+        t.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+def runAsync(coro):
+    """
+    asyncio.run yerine: süreç boyunca tek event loop (istemci bağlantıları loop'a
+    bağlıdır). Çıkışta, SIGTERM ile yarıda kesilse bile, kalan görevler iptal
+    edilip finally blokları çalıştırılır.
+    """
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        _LOOP = asyncio.new_event_loop()
+        asyncio.set_event_loop(_LOOP)
+    task = _LOOP.create_task(coro)
+    try:
+        return _LOOP.run_until_complete(task)
+    finally:
+        _cancelPending(_LOOP)
+
+def warmUp():
+    """Sıcak worker açılışı: event loop ve istemcileri önceden kurar."""
+    if API_KEY:
+        syncClient()
+        runAsync(asyncio.sleep(0))
+        asyncClient()
+
+def closeClients():
+    global _ACLIENT, _LOOP
+    if _ACLIENT is not None:
+        runAsync(_ACLIENT.close())
+        _ACLIENT = None
+    if _LOOP is not None and not _LOOP.is_closed():
+        _LOOP.close()
+    _LOOP = None
 
 # ----------------------------
 # Yardımcılar
@@ -158,6 +323,9 @@ OUT_FIELDS = [
 ]
 
 def ensureMessagesCsv():
+    if MESSAGES_PREPARED and os.path.exists(MESSAGES_CSV_PATH) and os.path.getsize(MESSAGES_CSV_PATH) > 0:
+        print(f"[prep] messages.csv önceden hazırlanmış, çıkarım atlandı: {MESSAGES_CSV_PATH}")
+        return
     print("[prep] JSON->messages.csv hazırlanıyor...")
     buildMessages(JSON_PATH, MESSAGES_CSV_PATH)
 
@@ -192,50 +360,91 @@ def ensureOutputCsv():
                 "toneCheck": "", "toneCorrect": "",
             })
 
+# ----------------------------
+# Sonuç Store'u (SQLite/WAL)
+# ----------------------------
+# result.csv her satırda baştan yazılmaz: her sonuç store'a tek UPSERT ile
+# işlenir, CSV her task sonunda ve durdurmada bir kez dışa aktarılır.
+_STORE = None
+
+def resultStore():
+    global _STORE
+    if _STORE is None:
+        _STORE = openStore(RESULT_DB_PATH)
+        setFieldnames(_STORE, OUT_FIELDS)
+    return _STORE
+
+def _normalizeModuleType(row):
+    # Eski dosyalarda moduleType olabilir -> module_type'a normalize et
+    if "module_type" not in row or (not row.get("module_type") and row.get("moduleType")):
+        row["module_type"] = row.get("moduleType", row.get("module_type", ""))
+    return row
+
+# Bellekteki satırlar sıkı (__slots__) kayıtlardır; dict'e yalnızca store'a/CSV'ye yazarken çevrilir.
+ResultRow = rowType(OUT_FIELDS)
+
 def readOutputRows():
+    """
+    Store doluysa satırları oradan okur (son commit'e kadar her sonuç dahil,
+    yarıda kalan çalışmalar buradan devam eder); boşsa CSV'den okuyup store'u tohumlar.
+    """
+    store = resultStore()
+    if not storeIsEmpty(store):
+        return loadRows(store, factory=lambda row: ResultRow(_normalizeModuleType(row)))
+
     rows = []
     with open(OUTPUT_CSV_PATH, "r", encoding="utf-8", newline="") as f:
         r = csv.DictReader(f)
         for row in r:
-            # Eski dosyalarda moduleType olabilir -> module_type'a normalize et
-            if "module_type" not in row or (not row.get("module_type") and row.get("moduleType")):
-                row["module_type"] = row.get("moduleType", row.get("module_type", ""))
-            rows.append(row)
+            rows.append(ResultRow(_normalizeModuleType(row)))
+    replaceRows(store, [(rowIdentityKey(r), r) for r in rows])
     return rows
 
 def writeOutputRows(rows):
-    with open(OUTPUT_CSV_PATH, "w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=OUT_FIELDS)
-        w.writeheader()
-        for r in rows:
-            # Yazmadan önce module_type alanını garanti et
-            if "module_type" not in r or (not r.get("module_type") and r.get("moduleType")):
-                r["module_type"] = r.get("moduleType", r.get("module_type", ""))
-            for k in OUT_FIELDS:
-                r.setdefault(k, "")
-            w.writerow(r)
-
-def rowIdentityKey(r):
-    return (
-        str(r.get("row_id", "")),
-        str(r.get("node_id", "")),
-        r.get("node_name", ""),
-        r.get("node_type", ""),
-        r.get("module_type", ""),
-        r.get("source", ""),
-        r.get("text", ""),
-    )
-
-def setResult(rows, key, check_col, correct_col, check_val, correct_val):
+    """Tüm satırları store'a yazar ve CSV'yi tek seferde dışa aktarır."""
     for r in rows:
-        if rowIdentityKey(r) == key:
-            r[check_col] = check_val
-            r[correct_col] = correct_val
-            return True
-    return False
+        # Yazmadan önce module_type alanını garanti et
+        _normalizeModuleType(r)
+        for k in OUT_FIELDS:
+            r.setdefault(k, "")
+    store = resultStore()
+    replaceRows(store, [(rowIdentityKey(r), r) for r in rows])
+    exportCsv(store, OUTPUT_CSV_PATH, OUT_FIELDS)
+
+def commitRow(key, row):
+    """Tek satırın sonucunu kalıcı hale getirir (O(1), CSV'ye dokunmaz)."""
+    upsertRow(resultStore(), key, row)
+
+def exportOutputCsv():
+    exportCsv(resultStore(), OUTPUT_CSV_PATH, OUT_FIELDS)
+
+# ----------------------------
+# Satır Tablosu (bellekte tek kopya + hash index)
+# ----------------------------
+ROWS = None      # result satırları (store ile senkron)
+ROW_INDEX = {}   # rowIdentityKey -> satır
+
+def rowTable():
+    """Satırları bir kez yükler; task'lar ve sync aynı listeyi/index'i paylaşır."""
+    global ROWS
+    if ROWS is None:
+        ROWS = readOutputRows()
+        ROW_INDEX.clear()
+        ROW_INDEX.update(buildRowIndex(ROWS))
+    return ROWS
+
+def appendRow(rows, row):
+    rows.append(row)
+    ROW_INDEX[rowIdentityKey(row)] = row
+
+def reindexRow(old_key, row):
+    """Kimlik alanı (ör. row_id) değişen satırın index kaydını taşır."""
+    if ROW_INDEX.get(old_key) is row:
+        del ROW_INDEX[old_key]
+    ROW_INDEX[rowIdentityKey(row)] = row
 
 def baseToOutRow(base):
-    return {
+    return ResultRow({
         "row_id": base.get("row_id", ""),
         "node_id": base.get("node_id", ""),
         "node_name": base.get("node_name", ""),
@@ -248,7 +457,7 @@ def baseToOutRow(base):
         "puncCheck": "", "puncCorrect": "",
         "clarityCheck": "", "clarityCorrect": "",
         "toneCheck": "", "toneCorrect": "",
-    }
+    })
 
 def baseIdentityKey(base):
     return (
@@ -261,22 +470,75 @@ def baseIdentityKey(base):
         (base.get("text") or "").strip(),
     )
 
+# ----------------------------
+# Önceki Run'dan Devralma (baseline)
+# ----------------------------
+# Yeni tasarım sürümünde yalnızca eklenen/değişen metinler modele gider:
+# önceki run'da aynı (node_id, source, text) için verilmiş kararlar yeni
+# satırlara kopyalanır; dolu hücreler görevlerde atlanır.
+BASELINE_CSV_PATH = None
+BASELINE_SAME_TONE = True
+
+def baselineKey(r):
+    return (str(r.get("node_id", "")), r.get("source", ""), (r.get("text") or "").strip())
+
+def loadBaseline(csv_path, include_tone=True):
+    """baselineKey -> {sütun: değer}; boş ya da 'failed' kalan görevler devralınmaz."""
+    pairs = [(check, correct) for task, check, correct, _ in taskSpecs() if include_tone or task != "tone"]
+    verdicts = {}
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            cells = {}
+            for check, correct in pairs:
+                value = (row.get(check) or "").strip()
+                if value and value != FAILED:
+                    cells[check] = row.get(check)
+                    cells[correct] = row.get(correct) or ""
+            if cells:
+                verdicts[baselineKey(row)] = cells
+    return verdicts
+
+def baselineVerdicts():
+    """Run başına bir kez yüklenir; baseline yoksa/okunamazsa boş."""
+    if not BASELINE_CSV_PATH:
+        return {}
+    try:
+        return loadBaseline(BASELINE_CSV_PATH, include_tone=BASELINE_SAME_TONE)
+    except (OSError, csv.Error) as e:
+        print(f"[baseline] Okunamadı, tam çalıştırma yapılacak: {e}", flush=True)
+        return {}
+
+def carryOverBaseline(rows):
+    """Henüz kararı olmayan hücreleri baseline'dan doldurur (dolu hücrelere dokunmaz)."""
+    baseline = baselineVerdicts()
+    if not baseline:
+        return 0
+    carried = 0
+    for r in rows:
+        prev = baseline.get(baselineKey(r))
+        if not prev:
+            continue
+        filled = False
+        for col, value in prev.items():
+            if col.endswith("Check") and not (r.get(col) or "").strip():
+                r[col] = value
+                r[col[:-len("Check")] + "Correct"] = prev.get(col[:-len("Check")] + "Correct", "")
+                filled = True
+        carried += filled
+    todo = sum(1 for r in rows if (r.get("text") or "").strip() and baselineKey(r) not in baseline)
+    print(f"[baseline] {carried} satırın kararları önceki run'dan devralındı; "
+          f"{todo} yeni/değişmiş satır modele gidecek.", flush=True)
+    return carried
+
 def syncOutputWithMessages(messages_csv_path, output_csv_path):
     if not (os.path.exists(output_csv_path) and os.path.getsize(output_csv_path) > 0):
         ensureOutputCsv()
 
-    out_rows = readOutputRows()
+    out_rows = rowTable()
 
-    out_keys_with = set(rowIdentityKey(r) for r in out_rows)
+    out_keys_with = set(ROW_INDEX)
     def key_wo_rowid(r):
-        return (
-            str(r.get("node_id", "")),
-            r.get("node_name", ""),
-            r.get("node_type", ""),
-            r.get("module_type", ""),
-            r.get("source", ""),
-            r.get("text", ""),
-        )
+        return rowIdentityKey(r)[1:]   # saklı kimlik anahtarından; row_id hariç
     out_keys_wo = set(key_wo_rowid(r) for r in out_rows)
     idx_map_wo = { key_wo_rowid(r): i for i, r in enumerate(out_rows) }
 
@@ -309,16 +571,20 @@ def syncOutputWithMessages(messages_csv_path, output_csv_path):
             if out_style_key_wo in out_keys_wo:
                 i = idx_map_wo[out_style_key_wo]
                 if not out_rows[i].get("row_id"):
+                    old_key = rowIdentityKey(out_rows[i])
                     out_rows[i]["row_id"] = key[0]
+                    reindexRow(old_key, out_rows[i])
                     out_keys_with.add(rowIdentityKey(out_rows[i]))
                 continue
 
-            out_rows.append(baseToOutRow(base))
+            appendRow(out_rows, baseToOutRow(base))
             out_keys_with.add(out_style_key_with)
             out_keys_wo.add(out_style_key_wo)
             idx_map_wo[out_style_key_wo] = len(out_rows) - 1
             added += 1
 
+    carryOverBaseline(out_rows)
+
     if added or out_rows:
         writeOutputRows(out_rows)
     if added:
@@ -338,31 +604,209 @@ def extractFirstJSON(text):
     m = JSON_OBJECT_RE.search(text)
     return m.group(0) if m else None
 
-def callOpenAI(task, text, tone=None):
+def buildRequest(task, text, tone=None):
+    """responses.create için ortak parametreler (sync ve async çağrılar paylaşır)."""
     if task == "tone":
         system_msg, user_msg = render_prompt(task, text=text, tone=(tone or ""))
     else:
         system_msg, user_msg = render_prompt(task, text=text)
+    return {
+        "model": OPENAI_MODEL,
+        "instructions": system_msg.strip(),
+        "input": user_msg.strip(),
+        "temperature": 0,
+    }
 
-    resp = client.responses.create(
-        model=OPENAI_MODEL,
-        instructions=system_msg.strip(),
-        input=user_msg.strip(),
-        temperature=0,
-    )
+def parseVerdictStrict(resp):
+    """Model yanıtını {"1": [...]} / {"0": []} biçimine indirger; ayrıştırılamazsa None."""
     raw = getattr(resp, "output_text", None) or str(resp)
     js = extractFirstJSON(raw)
     if not js:
-        return {"0": []}
+        return None
     try:
         parsed = json.loads(js)
         if "1" in parsed and isinstance(parsed["1"], list):
             return {"1": parsed["1"]}
         if "0" in parsed and isinstance(parsed["0"], list):
             return {"0": []}
-        return {"0": []}
+        return None
+    except Exception:
+        return None
+
+def parseVerdict(resp):
+    """Ayrıştırılamayan yanıt "hata yok" sayılmaz: UnparseableResponse fırlatır."""
+    verdict = parseVerdictStrict(resp)
+    if verdict is None:
+        raw = getattr(resp, "output_text", None) or str(resp)
+        raise UnparseableResponse(f"Yanıt ayrıştırılamadı: {raw[:120]!r}")
+    return verdict
+
+# ----------------------------
+# Kalıcı Karar Önbelleği
+# ----------------------------
+_CACHE = None
+CACHE_STATS = {"hit": 0, "miss": 0}
+
+def verdictCache():
+    global _CACHE
+    if _CACHE is None and CACHE_PATH:
+        _CACHE = openCache(CACHE_PATH)
+    return _CACHE
+
+def _cacheKeyFor(task, text, req):
+    return cacheKey(task, req["model"], promptHash(req["instructions"], req["input"]), text)
+
+def cachedVerdict(task, text, tone=None):
+    """Önbellekte karar varsa döndürür (yoksa None); isabet/ıska sayılır."""
+    cache = verdictCache()
+    if cache is None:
+        return None
+    try:
+        verdict = cacheGet(cache, _cacheKeyFor(task, text, buildRequest(task, text, tone=tone)))
+    except Exception as e:
+        print(f"[cache] Okuma hatası: {e}", flush=True)
+        verdict = None
+    CACHE_STATS["hit" if verdict is not None else "miss"] += 1
+    return verdict
+
+def storeVerdict(task, text, req, verdict):
+    cache = verdictCache()
+    if cache is None:
+        return
+    try:
+        cachePut(cache, _cacheKeyFor(task, text, req), task, req["model"],
+                 promptHash(req["instructions"], req["input"]), text, verdict)
+    except Exception as e:
+        print(f"[cache] Yazma hatası: {e}", flush=True)
+
+def callOpenAI(task, text, tone=None):
+    req = buildRequest(task, text, tone=tone)
+    resp = syncClient().responses.create(**req)
+    verdict = parseVerdict(resp)
+    storeVerdict(task, text, req, verdict)
+    return verdict
+
+# ----------------------------
+# Hız Sınırlayıcı
+# ----------------------------
+LIMITER = None
+LIMITER_LOG_INTERVAL_SECONDS = float(os.getenv("LIMITER_LOG_INTERVAL_SECONDS", "15") or "15")
+EXPECTED_OUTPUT_TOKENS = 200
+
+def newLimiter(max_concurrency):
+    """Her event loop için yeni sınırlayıcı (asyncio ilkelleri loop'a bağlanır)."""
+    global LIMITER
+    LIMITER = RateLimiter(RPM, TPM, max_concurrency)
+    return LIMITER
+
+def estimateRequestTokens(req):
+    return (len(req["instructions"]) + len(req["input"])) // 4 + EXPECTED_OUTPUT_TOKENS
+
+def _headersOf(obj):
+    resp = getattr(obj, "response", None)
+    return getattr(resp, "headers", None) or getattr(obj, "headers", None)
+
+async def _create(aclient, req):
+    """responses.create; sınırlayıcıdan slot alır, yanıt başlıkları/gecikmeyle onu besler."""
+    limiter = LIMITER
+    if limiter is None:
+        return await aclient.responses.create(**req)
+    reserved = await limiter.acquire(estimateRequestTokens(req))
+    t0 = time.perf_counter()
+    try:
+        raw = await aclient.responses.with_raw_response.create(**req)
+    except RateLimitError as e:
+        await limiter.release(reserved, headers=_headersOf(e), rate_limited=True)
+        raise
+    except APIStatusError as e:
+        # sunucu hata döndü, üretim yapılmadı: ayrılan token bütçesi iade edilir
+        await limiter.release(reserved, headers=_headersOf(e), used_tokens=0)
+        raise
+    except BaseException:
+        await limiter.release(reserved)
+        raise
+    resp = raw.parse()
+    usage = getattr(resp, "usage", None)
+    await limiter.release(
+        reserved,
+        latency=time.perf_counter() - t0,
+        headers=raw.headers,
+        used_tokens=getattr(usage, "total_tokens", None),
+    )
+    return resp
+
+async def _reportLimiter(interval):
+    while True:
+        await asyncio.sleep(interval)
+        if LIMITER is not None:
+            print(f"[ratelimit] {LIMITER.describe()}", flush=True)
+
+async def acallOpenAI(aclient, task, text, tone=None):
+    req = buildRequest(task, text, tone=tone)
+    resp = await _create(aclient, req)
+    verdict = parseVerdict(resp)   # ayrıştırılamayan yanıt önbelleğe yazılmaz, tekrar denenir
+    storeVerdict(task, text, req, verdict)
+    return verdict
+
+# ----------------------------
+# Toplu (batch) Çağrı
+# ----------------------------
+def estimateTokens(text):
+    return len(text) // 4 + 8   # kaba tahmin (öğe başlığı dahil)
+
+def chunkBatches(items, max_items, max_tokens):
+    """[(text, keys), ...] -> boyut ve token bütçesine göre gruplar."""
+    batch, used = [], 0
+    for item in items:
+        cost = estimateTokens(item[0])
+        if batch and (len(batch) >= max_items or used + cost > max_tokens):
+            yield batch
+            batch, used = [], 0
+        batch.append(item)
+        used += cost
+    if batch:
+        yield batch
+
+def buildBatchRequest(task, texts, tone=None):
+    if task == "tone":
+        system_msg, user_msg = render_batch_prompt(task, texts, tone=(tone or ""))
+    else:
+        system_msg, user_msg = render_batch_prompt(task, texts)
+    return {
+        "model": OPENAI_MODEL,
+        "instructions": system_msg.strip(),
+        "input": user_msg.strip(),
+        "temperature": 0,
+    }
+
+def _verdictOf(obj):
+    if isinstance(obj, dict):
+        if "1" in obj and isinstance(obj["1"], list):
+            return {"1": obj["1"]}
+        if "0" in obj and isinstance(obj["0"], list):
+            return {"0": []}
+    return None
+
+def parseBatchVerdicts(resp, count):
+    """{"1": {...}, "2": {...}} -> öğe sırasıyla karar listesi; ayrıştırılamayan öğe None."""
+    raw = getattr(resp, "output_text", None) or str(resp)
+    js = extractFirstJSON(raw)
+    try:
+        parsed = json.loads(js) if js else {}
     except Exception:
-        return {"0": []}
+        parsed = {}
+    if not isinstance(parsed, dict):
+        parsed = {}
+    return [_verdictOf(parsed.get(str(i))) for i in range(1, count + 1)]
+
+async def acallOpenAIBatch(aclient, task, texts, tone=None):
+    resp = await _create(aclient, buildBatchRequest(task, texts, tone=tone))
+    verdicts = parseBatchVerdicts(resp, len(texts))
+    for text, verdict in zip(texts, verdicts):
+        if verdict is not None:
+            # önbellek tekil istem anahtarıyla tutulur: toplu ve tekil çalışmalar paylaşır
+            storeVerdict(task, text, buildRequest(task, text, tone=tone), verdict)
+    return verdicts
 
 def parseListCell(cell):
     if not isinstance(cell, str) or not cell.strip():
@@ -373,6 +817,88 @@ def parseListCell(cell):
     except Exception:
         return []
 
+# ----------------------------
+# Yeniden Deneme ve Devre Kesici
+# ----------------------------
+FAILED = "failed"   # check hücresi: tüm denemeler tükendi (boş = hiç denenmedi)
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1") or "1")
+BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "60") or "60")
+RETRY_FAILED_PASSES = int(os.getenv("LLM_RETRY_FAILED_PASSES", "1") or "1")
+
+def newBreaker():
+    return CircuitBreaker(
+        threshold=int(os.getenv("BREAKER_THRESHOLD", "5") or "5"),
+        cooldown=float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30") or "30"),
+    )
+
+BREAKER = newBreaker()
+RETRY_STATS = {RATE_LIMIT: 0, TRANSIENT: 0, PARSE: 0, FATAL: 0}
+
+def classifyError(e):
+    if isinstance(e, UnparseableResponse):
+        return PARSE
+    if isinstance(e, RateLimitError):
+        return RATE_LIMIT
+    if isinstance(e, (APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return TRANSIENT
+    if isinstance(e, APIStatusError):
+        status = getattr(e, "status_code", 0) or 0
+        return TRANSIENT if status >= 500 or status in (408, 409) else FATAL
+    return FATAL
+
+async def withRetry(tag, call, sem):
+    """
+    call() -> coroutine. Geçici hatalar (429, 5xx, bağlantı, ayrıştırılamayan
+    yanıt) jitter'lı üstel geri çekilmeyle MAX_ATTEMPTS kez denenir; kalıcı
+    hatalar (401/400/...) hemen fırlatılır. Her deneme önce devre kesiciden geçer.
+    Geri çekilme beklemesi eşzamanlılık slotunu tutmaz.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        await BREAKER.wait()
+        try:
+            async with sem:
+                result = await call()
+        except asyncio.CancelledError:
+            BREAKER.abandon()
+            raise
+        except Exception as e:
+            kind = classifyError(e)
+            BREAKER.record(kind != TRANSIENT)
+            RETRY_STATS[kind] += 1
+            if kind == FATAL or attempt >= MAX_ATTEMPTS:
+                raise
+            retry_after = retryAfterSeconds(_headersOf(e)) if kind == RATE_LIMIT else None
+            delay = backoffDelay(attempt, BACKOFF_BASE, BACKOFF_CAP, retry_after)
+            print(f"[{tag}] Tekrar denenecek ({kind}, deneme {attempt}/{MAX_ATTEMPTS}, "
+                  f"{delay:.1f} sn sonra): {e}", flush=True)
+            await asyncio.sleep(delay)
+            continue
+        BREAKER.record(True)
+        return result
+
+def describeRetries():
+    return (f"429={RETRY_STATS[RATE_LIMIT]} geçici={RETRY_STATS[TRANSIENT]} "
+            f"ayrıştırma={RETRY_STATS[PARSE]} kalıcı={RETRY_STATS[FATAL]} "
+            f"| devre: {BREAKER.describe()}")
+
+def countFailed(rows):
+    cols = [spec[1] for spec in taskSpecs()]
+    return sum(1 for r in rows for c in cols if (r.get(c) or "").strip() == FAILED)
+
+def retryFailedPasses(run_pass):
+    """Ana geçişten sonra yalnızca 'failed' hücreler için en fazla RETRY_FAILED_PASSES ek tur."""
+    for n in range(1, RETRY_FAILED_PASSES + 1):
+        failed = countFailed(rowTable())
+        if not failed:
+            return
+        print(f"[retry] Tur {n}/{RETRY_FAILED_PASSES}: {failed} başarısız hücre yeniden deneniyor.", flush=True)
+        run_pass()
+    left = countFailed(rowTable())
+    if left:
+        print(f"[retry] {left} hücre hâlâ başarısız; --retry_failed ile yalnızca bunlar yeniden denenebilir.", flush=True)
+
 # ----------------------------
 # Ek Kurallar (punct/clarity/tone)
 # ----------------------------
@@ -447,53 +973,271 @@ def applySecondaryRule(task, current_row, result_list):
 
 
 
-def processTask(task, check_col, correct_col, tone=None):
+def processTask(task, check_col, correct_col, tone=None, concurrency=None, only_failed=False):
+    if only_failed:
+        runAsync(_processTaskAsync(task, check_col, correct_col, tone, concurrency or CONCURRENCY,
+                                      only_failed=True))
+        return
     print(f"[{task}] Başladı.", flush=True)
     try:
-        rows = readOutputRows()
+        runAsync(_processTaskAsync(task, check_col, correct_col, tone, concurrency or CONCURRENCY))
+    finally:
+        _mark_done(task)   # << sadece bunu çağır, print yok
 
-        todo_keys = []
-        for r in rows:
-            if not (r.get("text") or "").strip():
-                continue
-            if (r.get(check_col) or "").strip() != "":
-                continue
-            todo_keys.append(rowIdentityKey(r))
+def processFailedSequential():
+    """Sıralı mod yeniden deneme turu: görevler sırayla, yalnızca 'failed' hücreler."""
+    for spec in taskSpecs():
+        processTask(*spec, only_failed=True)
+
+def needsCheck(row, check_col, only_failed=False):
+    """Boş hücre işlenir; only_failed ise yalnızca 'failed' kalan hücreler."""
+    if not (row.get("text") or "").strip():
+        return False
+    cell = (row.get(check_col) or "").strip()
+    return cell == FAILED if only_failed else cell == ""
+
+async def _processTaskAsync(task, check_col, correct_col, tone, concurrency,
+                            aclient=None, grammar_ready=None, only_failed=False):
+    """
+    En fazla `concurrency` istek aynı anda uçuşta tutulur; sonuçlar geldikçe
+    (tamamlanma sırasıyla) satıra işlenir ve store'a yazılır.
+
+    grammar_ready (boru hattı modu): grammar bekleyen satır -> asyncio.Event.
+    grammar görevi satırı işleyince event'i kurar; punctuation/clarity/tone
+    çağrılarını beklemeden yapar, yalnızca ikincil kuralı o satırın grammar
+    sonucu gelince uygular.
+
+    Tüm denemeleri tükenen hücre 'failed' olarak yazılır; only_failed=True
+    yalnızca bu hücreleri yeniden dener (log etiketi '<görev>/retry').
+    """
+    rows = rowTable()
+    tag = f"{task}/retry" if only_failed else task
+
+    todo_keys = [rowIdentityKey(r) for r in rows if needsCheck(r, check_col, only_failed)]
+
+    total = len(todo_keys)
+    if total == 0:
+        print(f"[{tag}] İşlenecek satır yok.", flush=True)
+        if task == "grammar" and grammar_ready:
+            for ev in grammar_ready.values():
+                ev.set()
+        return  # section() yine çıkışta "Bitti." yazacak
+
+    # Aynı (normalize metin, görev girdisi) için tek çağrı; karar tüm satırlara dağıtılır
+    groups = {}
+    for key in todo_keys:
+        groups.setdefault((norm(key[6]), tone or ""), []).append(key)
+    unique = len(groups)
+
+    print(f"[{tag}] İşlenecek satır sayısı: {total} (eşzamanlılık: {concurrency})", flush=True)
+    print(f"[{tag}] Tekilleştirme: {total} satır -> {unique} benzersiz metin "
+          f"(oran {total / unique:.2f}x, {total - unique} çağrı tasarrufu)", flush=True)
+
+    sem = asyncio.Semaphore(concurrency)
+    standalone = aclient is None   # boru hattı dışında: sınırlayıcı bu görevin
+    if standalone:
+        aclient = asyncClient()
+        newLimiter(concurrency)
+        reporter = asyncio.ensure_future(_reportLimiter(LIMITER_LOG_INTERVAL_SECONDS))
+
+    async def paced(call):
+        try:
+            return await call()
+        finally:
+            if DELAY_SECONDS and DELAY_SECONDS > 0:
+                await asyncio.sleep(DELAY_SECONDS)
 
-        total = len(todo_keys)
-        if total == 0:
-            print(f"[{task}] İşlenecek satır yok.", flush=True)
-            return  # section() yine çıkışta "Bitti." yazacak
+    async def dispatch(text, keys):
+        try:
+            result = await withRetry(
+                tag, lambda: paced(lambda: acallOpenAI(aclient, task, text, tone=tone)), sem)
+        except Exception as e:
+            result = e
+        return [(keys, result)]
 
-        print(f"[{task}] İşlenecek satır sayısı: {total}", flush=True)
+    async def dispatchBatch(batch):
+        if len(batch) == 1:
+            return await dispatch(*batch[0])
+        texts = [t for t, _ in batch]
+        try:
+            verdicts = await withRetry(
+                tag, lambda: paced(lambda: acallOpenAIBatch(aclient, task, texts, tone=tone)), sem)
+        except Exception as e:
+            return [(keys, e) for _, keys in batch]
+        out = [(keys, v) for (_, keys), v in zip(batch, verdicts) if v is not None]
+        retry = [item for item, v in zip(batch, verdicts) if v is None]
+        if retry:
+            print(f"[{tag}] Toplu yanıtta {len(retry)}/{len(batch)} öğe ayrıştırılamadı; tekil çağrıya düşülüyor.", flush=True)
+            for res in await asyncio.gather(*(dispatch(t, keys) for t, keys in retry)):
+                out.extend(res)
+        return out
+
+    async def cachedHit(keys, verdict):
+        return [(keys, verdict)]
+
+    hits0, misses0 = CACHE_STATS["hit"], CACHE_STATS["miss"]
+    pending, jobs = [], []
+    for keys in groups.values():
+        text = (ROW_INDEX[keys[0]].get("text") or "").strip()
+        cached = cachedVerdict(task, text, tone=tone)
+        if cached is not None:
+            jobs.append(cachedHit(keys, cached))
+        else:
+            pending.append((text, keys))
+
+    batch_size = BATCH_SIZES.get(task, 1)
+    if batch_size > 1:
+        batches = list(chunkBatches(pending, batch_size, BATCH_TOKENS))
+        print(f"[{tag}] Toplu mod: {len(pending)} metin -> {len(batches)} istek (en fazla {batch_size}/istek)", flush=True)
+        jobs += [dispatchBatch(b) for b in batches]
+    else:
+        jobs += [dispatch(t, keys) for t, keys in pending]
 
-        for idx, key in enumerate(todo_keys, 1):
-            current_row = next((rr for rr in rows if rowIdentityKey(rr) == key), None)
-            if current_row is None:
-                continue
+    idx = 0
+    waiters = []
 
-            text = (current_row.get("text") or "").strip()
+    def commitOne(key, result):
+        nonlocal idx
+        current_row = ROW_INDEX.get(key)
+        if current_row is None:
+            return
+        idx += 1
+        try:
+            if isinstance(result, Exception):
+                # denemeler tükendi: "hata yok" değil, ayrı bir durum olarak yaz
+                setResult(ROW_INDEX, key, check_col, correct_col, FAILED, "")
+                commitRow(key, current_row)
+                print(f"[{tag}] Hata (satır {idx}/{total}, {FAILED} olarak işaretlendi): {result}", flush=True)
+                return
             try:
-                result = callOpenAI(task, text, tone=tone)
                 corrected_list = result.get("1", []) if "1" in result else []
 
+                # ikincil kural satırın kendi grammar sonucuna bakar -> satır bazında
                 check_val, corrected_list = applySecondaryRule(task, current_row, corrected_list)
                 correct_cell = "" if check_val == "0" else json.dumps(corrected_list, ensure_ascii=False)
 
-                setResult(rows, key, check_col, correct_col, check_val, correct_cell)
-                writeOutputRows(rows)
+                setResult(ROW_INDEX, key, check_col, correct_col, check_val, correct_cell)
+                commitRow(key, current_row)
 
                 rid = current_row.get("row_id", "")
                 nid = current_row.get("node_id", "")
-                print(f"[{task}] {idx}/{total} OK: row_id={rid}, node_id={nid}, check={check_val}", flush=True)
+                print(f"[{tag}] {idx}/{total} OK: row_id={rid}, node_id={nid}, check={check_val}", flush=True)
             except Exception as e:
-                print(f"[{task}] Hata (satır {idx}/{total}): {e}", flush=True)
+                print(f"[{tag}] Hata (satır {idx}/{total}): {e}", flush=True)
+        finally:
+            if task == "grammar" and grammar_ready and key in grammar_ready:
+                grammar_ready[key].set()   # hata olsa da bekleyenler eski sıralı davranışla devam eder
+
+    async def commitAfterGrammar(key, result, ev):
+        await ev.wait()
+        commitOne(key, result)
+
+    def commitGroup(keys, result):
+        for key in keys:
+            ev = grammar_ready.get(key) if (grammar_ready and task in SECONDARY_TASKS) else None
+            if ev is not None and not ev.is_set():
+                waiters.append(asyncio.ensure_future(commitAfterGrammar(key, result, ev)))
+            else:
+                commitOne(key, result)
 
-            if DELAY_SECONDS and DELAY_SECONDS > 0:
-                time.sleep(DELAY_SECONDS)
+    try:
+        for fut in asyncio.as_completed(jobs):
+            for keys, result in await fut:
+                commitGroup(keys, result)
+        if waiters:
+            await asyncio.gather(*waiters)
+    finally:
+        if task == "grammar" and grammar_ready:
+            for ev in grammar_ready.values():
+                ev.set()
+        for w in waiters:
+            w.cancel()
+        if standalone:
+            reporter.cancel()
+            print(f"[ratelimit] {LIMITER.describe()}", flush=True)
+            print(f"[retry] {describeRetries()}", flush=True)
+        exportOutputCsv()
+        if verdictCache() is not None:
+            print(f"[{tag}] Önbellek: {CACHE_STATS['hit'] - hits0} isabet, "
+                  f"{CACHE_STATS['miss'] - misses0} ıska", flush=True)
+
+# ----------------------------
+# Satır Bazlı Boru Hattı
+# ----------------------------
+# Tek bağımlılık: punctuation/clarity/tone ikincil kuralı satırın grammar sonucuna bakar.
+SECONDARY_TASKS = ("punctuation", "clarity", "tone")
+EXPORT_INTERVAL_SECONDS = float(os.getenv("EXPORT_INTERVAL_SECONDS", "30") or "30")
+
+def taskSpecs():
+    return [
+        ("spellcheck",  "spellCheck",   "spellCorrect",   None),
+        ("grammar",     "grammarCheck", "grammarCorrect", None),
+        ("punctuation", "puncCheck",    "puncCorrect",    None),
+        ("clarity",     "clarityCheck", "clarityCorrect", None),
+        ("tone",        "toneCheck",    "toneCorrect",    TARGET_TONE),
+    ]
+
+def countFullyChecked(rows):
+    cols = [spec[1] for spec in taskSpecs()]
+    return sum(
+        1 for r in rows
+        if (r.get("text") or "").strip()
+        and all((r.get(c) or "").strip() not in ("", FAILED) for c in cols)
+    )
 
+async def _periodicExport(rows):
+    """Tamamlanan satırlar erken erişilebilsin diye result.csv'yi aralıklarla tazeler."""
+    while True:
+        await asyncio.sleep(EXPORT_INTERVAL_SECONDS)
+        exportOutputCsv()
+        total = sum(1 for r in rows if (r.get("text") or "").strip())
+        print(f"[pipeline] Ara çıktı: {countFullyChecked(rows)}/{total} satır tüm kontrollerden geçti", flush=True)
+
+def runPipeline(concurrency=None, only_failed=False):
+    """
+    Beş görevi aynı anda, satır bazında yürütür (görev başına ayrı eşzamanlılık sınırı).
+    Ardından 'failed' kalan hücreler için yeniden deneme turları çalışır.
+    """
+    concurrency = concurrency or CONCURRENCY
+    print("[pipeline] Başladı: görevler satır bazında paralel çalışıyor.", flush=True)
+    runAsync(_pipelineAsync(concurrency, only_failed=only_failed))
+    retryFailedPasses(lambda: runAsync(_pipelineAsync(concurrency, only_failed=True)))
+    rows = rowTable()
+    total = sum(1 for r in rows if (r.get("text") or "").strip())
+    print(f"[pipeline] Bitti: {countFullyChecked(rows)}/{total} satır tüm kontrollerden geçti", flush=True)
+
+async def _pipelineAsync(concurrency, only_failed=False):
+    rows = rowTable()
+    grammar_ready = {
+        rowIdentityKey(r): asyncio.Event()
+        for r in rows
+        if needsCheck(r, "grammarCheck", only_failed)
+    }
+    aclient = asyncClient()
+    # tek API anahtarı: tüm görevler tek sınırlayıcıyı paylaşır
+    newLimiter(concurrency * len(taskSpecs()))
+
+    async def runTask(task, check_col, correct_col, tone):
+        if only_failed:
+            await _processTaskAsync(task, check_col, correct_col, tone, concurrency,
+                                    aclient=aclient, grammar_ready=grammar_ready, only_failed=True)
+            return
+        print(f"[{task}] Başladı.", flush=True)
+        try:
+            await _processTaskAsync(task, check_col, correct_col, tone, concurrency,
+                                    aclient=aclient, grammar_ready=grammar_ready)
+        finally:
+            _mark_done(task)
+
+    exporter = asyncio.ensure_future(_periodicExport(rows))
+    reporter = asyncio.ensure_future(_reportLimiter(LIMITER_LOG_INTERVAL_SECONDS))
+    try:
+        await asyncio.gather(*(runTask(*spec) for spec in taskSpecs()))
     finally:
-        _mark_done(task)   # << sadece bunu çağır, print yok
+        exporter.cancel()
+        reporter.cancel()
+        print(f"[ratelimit] {LIMITER.describe()}", flush=True)
+        print(f"[retry] {describeRetries()}", flush=True)
 
 
 
@@ -517,25 +1261,92 @@ def processTask(task, check_col, correct_col, tone=None):
 # ----------------------------
 # Ana Akış
 # ----------------------------
-if __name__ == "__main__":
+TERMINATED = False   # SIGTERM geldi: sıcak worker işi bitirince çıkmalı
+
+def _terminate(signum, frame):
+    # /stop SIGTERM gönderir: finally blokları çalışsın, CSV dışa aktarılsın
+    global TERMINATED
+    TERMINATED = True
+    raise SystemExit(128 + signum)
+
+def resetRunState():
+    """Önceki run'ın satır tablosu, store/önbellek bağlantıları ve sayaçları."""
+    global ROWS, _STORE, _CACHE, LIMITER, BREAKER
+    ROWS = None
+    ROW_INDEX.clear()
+    _STORE = None
+    _CACHE = None
+    LIMITER = None
+    BREAKER = newBreaker()
+    for stats in (CACHE_STATS, RETRY_STATS):
+        for k in stats:
+            stats[k] = 0
+    _DONE_PRINTED.clear()
+    TASK_ENDS.clear()
+
+def main(argv=None):
+    """
+    Tek bir run: argv (None ise sys.argv) ile ayarlanır, JSON'dan result.csv'ye
+    kadar tüm adımları çalıştırır. Aynı süreçte tekrar çağrılabilir; istemci ve
+    bağlantı havuzu çağrılar arasında korunur.
+    """
+    args = buildParser().parse_args(argv)
+    configure(args)
+    warmUp()   # istemciler loop dışında hazırlanır (API anahtarı değiştiyse yenilenir)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _terminate)
+
     ensureMessagesCsv()
     ensureOutputCsv()
     syncOutputWithMessages(MESSAGES_CSV_PATH, OUTPUT_CSV_PATH)
 
-    with section("spellcheck"):
-        processTask("spellcheck",  "spellCheck",  "spellCorrect")
+    try:
+        if not args.sequential:
+            runPipeline(only_failed=args.retry_failed)
+        elif args.retry_failed:
+            processFailedSequential()
+        else:
+            with section("spellcheck"):
+                processTask("spellcheck",  "spellCheck",  "spellCorrect")
 
-    with section("grammar"):
-        processTask("grammar",     "grammarCheck","grammarCorrect")
+            with section("grammar"):
+                processTask("grammar",     "grammarCheck","grammarCorrect")
 
-    with section("punctuation"):
-        processTask("punctuation", "puncCheck",   "puncCorrect")
+            with section("punctuation"):
+                processTask("punctuation", "puncCheck",   "puncCorrect")
 
-    with section("clarity"):
-        processTask("clarity",     "clarityCheck","clarityCorrect")
+            with section("clarity"):
+                processTask("clarity",     "clarityCheck","clarityCorrect")
 
-    with section("tone"):
-        processTask("tone",        "toneCheck",   "toneCorrect", tone=TARGET_TONE)
+            with section("tone"):
+                processTask("tone",        "toneCheck",   "toneCorrect", tone=TARGET_TONE)
+
+        if args.sequential:
+            retryFailedPasses(processFailedSequential)
+    finally:
+        exportOutputCsv()
+        closeStore(resultStore())
+        if verdictCache() is not None:
+            print(f"[cache] Toplam: {CACHE_STATS['hit']} isabet, {CACHE_STATS['miss']} ıska", flush=True)
+            verdictCache().close()
 
     print(f"[done] Çıktı güncellendi: {OUTPUT_CSV_PATH}", flush=True)
+    return 0
+
+def runJob(**options):
+    """
+    Kütüphane arayüzü: runJob(json="design.json", output_csv="out/result.csv",
+    concurrency=8, sequential=True, ...). Anahtarlar CLI seçenekleriyle aynıdır;
+    True değerli bayraklar tek başına, None/False olanlar hiç geçilmez.
+    """
+    argv = []
+    for key, val in options.items():
+        if val is None or val is False:
+            continue
+        argv.append(f"--{key}")
+        if val is not True:
+            argv.append(str(val))
+    return main(argv)
 
+if __name__ == "__main__":
+    sys.exit(main())
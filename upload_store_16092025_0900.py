@@ -0,0 +1,105 @@
+# upload_store.py
+"""
+Yüklenen tasarım JSON'larının diske alınması.
+
+- Dosya UPLOAD_CHUNK_BYTES'lık parçalarla okunur; her parçanın diske
+  yazılması ve SHA-256'ya eklenmesi thread havuzunda yapılır, event loop
+  bloklanmaz.
+- Boyut sınırı (app'te UPLOAD_MAX_MB) aşılırsa yükleme kesilir, yarım dosya silinir (UploadTooLarge).
+- Dosya önce benzersiz bir geçici adla yazılır; içerik özeti (sha256) belli
+  olunca uploads/<sha256>/<dosya_adı> konumuna taşınır. Aynı içerik daha önce
+  yüklendiyse mevcut dosya kullanılır: özet yüklemenin kimliğidir, sonraki
+  aşamalar aynı tasarım için yapılmış işi bununla bulur.
+"""
+import os
+import uuid
+import asyncio
+import hashlib
+
+# ---------------- Ayarlar ----------------
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_MAX_BYTES = 512 * 1024 * 1024   # varsayılan; app UPLOAD_MAX_MB ile verir
+INCOMING_DIR_NAME = ".incoming"
+DEFAULT_NAME = "design.json"
+
+class UploadTooLarge(Exception):
+    """Yükleme boyut sınırını aştı."""
+
+# ---------------- Yardımcılar ----------------
+
+def _safeName(filename):
+    """İstemcinin verdiği adın yalnızca dosya adı kısmı (dizin bileşenleri atılır)."""
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    return name if name not in ("", ".", "..") else DEFAULT_NAME
+
+def _writeChunk(f, digest, data):
+    f.write(data)
+    digest.update(data)
+
+def _existingUpload(target_dir):
+    try:
+        names = sorted(n for n in os.listdir(target_dir) if not n.startswith("."))
+    except FileNotFoundError:
+        return None
+    return os.path.join(target_dir, names[0]) if names else None
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# ----------- Public API (camelCase) -----------
+
+def uploadPathFor(uploads_dir, sha256):
+    """Özeti bilinen yüklemenin dosyası (yoksa None)."""
+    return _existingUpload(os.path.join(uploads_dir, sha256))
+
+async def saveUpload(upload, uploads_dir, max_bytes=UPLOAD_MAX_BYTES, chunk_bytes=UPLOAD_CHUNK_BYTES):
+    """
+    upload: async read(n) sunan dosya (FastAPI UploadFile).
+    {"path", "name", "sha256", "size", "reused"} döndürür; sınır aşılırsa UploadTooLarge.
+    name: istemcinin verdiği dosya adı (tasarımın içerikten bağımsız adı).
+    """
+    incoming = os.path.join(uploads_dir, INCOMING_DIR_NAME)
+    os.makedirs(incoming, exist_ok=True)
+    tmp_path = os.path.join(incoming, f"{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                data = await upload.read(chunk_bytes)
+                if not data:
+                    break
+                size += len(data)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLarge(f"Dosya {max_bytes / (1024 * 1024):.1f} MB sınırını aşıyor.")
+                await asyncio.to_thread(_writeChunk, f, digest, data)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+    sha256 = digest.hexdigest()
+    name = _safeName(getattr(upload, "filename", None))
+    target_dir = os.path.join(uploads_dir, sha256)
+    existing = _existingUpload(target_dir)
+    if existing:
+        _remove(tmp_path)   # aynı içerik zaten var
+        return {"path": existing, "name": name, "sha256": sha256, "size": size, "reused": True}
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, name)
+    os.replace(tmp_path, path)
+    return {"path": path, "name": name, "sha256": sha256, "size": size, "reused": False}
+
+def fileSha256(path, chunk_bytes=UPLOAD_CHUNK_BYTES):
+    """Sunucudaki dosyanın (yerel mod) özeti; yüklemelerle aynı kimlik. Dosya yoksa None."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for data in iter(lambda: f.read(chunk_bytes), b""):
+                digest.update(data)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
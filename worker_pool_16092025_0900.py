@@ -0,0 +1,212 @@
+# worker_pool.py
+"""
+Sıcak worker havuzu: her run için yeni bir `python spellcheck...py` süreci
+başlatmak yerine önceden açılmış worker süreçleri kullanılır.
+
+Worker (bu dosya doğrudan çalıştırılınca):
+    python -u worker_pool_16092025_0900.py
+  - spellcheck modülünü bir kez içe aktarır (openai/dotenv/httpx), event loop
+    ve istemcileri kurar, READY_MARK yazar;
+  - stdin'den satır başına bir iş okur ({"argv": [...]}), spellcheck.main(argv)
+    çalıştırır; işin çıktısı olduğu gibi stdout'a akar, sonunda
+    "DONE_MARK <çıkış kodu>" yazar ve sıradaki işi bekler.
+
+Her worker aynı anda tek iş çalıştırır; /stop yalnızca o işin worker'ına
+SIGTERM gönderir (iş CSV'yi dışa aktarıp çıkar, havuz yerine yenisini açar).
+
+Uygulama tarafı: WorkerPool (app.py). Borular ikili (binary) açılır; iş
+çıktısı readJobOutput() ile satır satır değil, READ_BLOCK'luk bloklar halinde
+okunur (read1: ne geldiyse hemen döner, bekleme/yoklama yok).
+"""
+import os
+import sys
+import json
+import threading
+import traceback
+import subprocess
+
+from log_ingest_16092025_0900 import LineReader
+
+READY_MARK = "\x00WORKER_READY"
+DONE_MARK = "\x00JOB_DONE"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_PATH = os.path.abspath(__file__)
+READ_BLOCK = 64 * 1024
+
+# ---------------- Worker tarafı ----------------
+
+def _runOne(sc, argv):
+    try:
+        return sc.main(argv) or 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+def workerMain():
+    sys.path.insert(0, BASE_DIR)
+    import spellcheck_16092025_0900 as sc
+
+    sc.warmUp()
+    print(READY_MARK, flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        job = json.loads(line)
+        code = _runOne(sc, job.get("argv") or [])
+        sys.stdout.flush()
+        print(f"{DONE_MARK} {code}", flush=True)
+        if sc.TERMINATED:
+            sys.exit(code)   # /stop: bu worker yeniden kullanılmaz
+    sc.closeClients()
+
+# ---------------- Uygulama tarafı ----------------
+
+class WorkerPool:
+    """
+    size adet hazır (import'ları yapılmış, istemcisi kurulmuş) worker tutar.
+    acquire() boşta worker yoksa soğuk bir tane açar; havuz kendini arka planda
+    yeniden doldurur. max_jobs işten sonra worker emekliye ayrılır (bellek).
+    """
+
+    def __init__(self, size, cmd=None, env=None, max_jobs=50):
+        self.size = max(0, int(size))
+        self.cmd = cmd or ["python", "-u", WORKER_PATH]
+        self.env = env
+        self.max_jobs = max(1, int(max_jobs))
+        self.idle = []
+        self.warming = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        self._refill()
+
+    def _spawn(self):
+        """Yeni worker açar ve READY_MARK gelene kadar bekler; açılamazsa RuntimeError."""
+        proc = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=BASE_DIR,
+            env=self.env,
+        )
+        proc.jobs = 0
+        early = []
+        while True:
+            line = proc.stdout.readline().decode("utf-8", errors="replace")
+            if not line:
+                proc.wait()
+                raise RuntimeError("Worker açılamadı: " + "".join(early[-20:]).strip())
+            if line.rstrip("\r\n") == READY_MARK:
+                return proc
+            early.append(line)
+
+    def _warmOne(self):
+        try:
+            proc = self._spawn()
+        except Exception as e:
+            print(f"[pool] {e}", flush=True)
+            proc = None
+        with self.lock:
+            self.warming -= 1
+            if proc is not None and not self.closed and len(self.idle) < self.size:
+                self.idle.append(proc)
+                proc = None
+        if proc is not None:
+            self._shutdown(proc)
+
+    def _refill(self):
+        with self.lock:
+            if self.closed:
+                return
+            need = self.size - len(self.idle) - self.warming
+            self.warming += max(0, need)
+        for _ in range(max(0, need)):
+            threading.Thread(target=self._warmOne, daemon=True).start()
+
+    def acquire(self):
+        """(proc, sıcak_mı) döndürür."""
+        proc = None
+        with self.lock:
+            while self.idle:
+                cand = self.idle.pop(0)
+                if cand.poll() is None:
+                    proc = cand
+                    break
+        self._refill()
+        if proc is not None:
+            return proc, True
+        return self._spawn(), False
+
+    def submit(self, proc, argv):
+        proc.jobs += 1
+        proc.stdin.write((json.dumps({"argv": list(argv)}, ensure_ascii=False) + "\n").encode("utf-8"))
+        proc.stdin.flush()
+
+    def readJobOutput(self, proc, sink):
+        """
+        İşin çıktısını DONE_MARK'a (ya da worker ölürse EOF'a) kadar okur.
+        sink(metin) her blokta tam satırlarla çağrılır. Çıkış kodunu döndürür.
+        """
+        reader = LineReader()
+        while True:
+            data = proc.stdout.read1(READ_BLOCK)
+            text = reader.feed(data, final=not data)
+            i = text.find(DONE_MARK)
+            if i >= 0:
+                if text[:i]:
+                    sink(text[:i] if text[i - 1:i] == "\n" else text[:i] + "\n")
+                code = text[i + len(DONE_MARK):].split("\n", 1)[0].strip()
+                return int(code) if code.lstrip("-").isdigit() else 1
+            if text:
+                sink(text)
+            if not data:
+                return proc.wait()   # worker sonlandı (ör. /stop)
+
+    def release(self, proc, reusable=True):
+        """
+        İş bitti: worker sağlamsa havuzun başına döner (bağlantıları en sıcak
+        olan önce kullanılır); havuz taşarsa hiç iş almamış olan kapatılır.
+        """
+        keep = reusable and proc.poll() is None and proc.jobs < self.max_jobs
+        extra = None
+        with self.lock:
+            if keep and not self.closed and self.size > 0:
+                self.idle.insert(0, proc)
+                if len(self.idle) > self.size:
+                    extra = self.idle.pop()
+                proc = None
+        if proc is not None:
+            self._shutdown(proc)
+            self._refill()
+        if extra is not None:
+            self._shutdown(extra)
+
+    def _shutdown(self, proc):
+        if proc.poll() is not None:
+            return
+        try:
+            proc.stdin.close()   # worker döngüsü biter, istemcileri kapatıp çıkar
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for proc in idle:
+            self._shutdown(proc)
+
+    def describe(self):
+        with self.lock:
+            return f"boşta={len(self.idle)} ısınan={self.warming} hedef={self.size}"
+
+
+if __name__ == "__main__":
+    workerMain()
@@ -0,0 +1,155 @@
+# zip_stream.py
+"""
+Çıktı klasörünün ZIP'ini diske ara arşiv yazmadan, parça parça üretir.
+
+- iterZip: zipfile'ı aranamayan (non-seekable) bir hedefe yazdırır; her
+  dosya CHUNK_BYTES'lık parçalarla sıkıştırılır ve üretilen baytlar hemen
+  döndürülür (bellekte en fazla bir parçanın çıktısı tutulur). /download
+  yanıtı bu üreteçten akar; run'ın bitişi sıkıştırmayı beklemez.
+- Sıkıştırma seviyesi ZIP_COMPRESSLEVEL (0 = sıkıştırmasız/STORED, 1-9 DEFLATE).
+- Önbellek: bitmiş run'ın bir kez tam üretilen arşivi outputs/<run_id>.zip
+  olarak saklanır; dosyanın mtime'ı klasörün imzası (dosyaların en yeni
+  mtime'ı) olarak işaretlenir. İmza değişmediyse sonraki indirmeler/e-posta
+  bu dosyayı kullanır, değiştiyse arşiv yeniden üretilir.
+- Çalışan run için kısmi indirme: store'daki commit edilmiş satırlar
+  result.csv anlık görüntüsü olarak arşive eklenir (önbelleğe alınmaz).
+"""
+import os
+import time
+import zipfile
+
+from result_store_16092025_0900 import isStoreFile
+from run_log_16092025_0900 import RUN_LOG_NAME
+
+# ---------------- Ayarlar ----------------
+
+CHUNK_BYTES = 256 * 1024
+
+# ---------------- Yardımcılar ----------------
+
+def zipLevel():
+    """ZIP_COMPRESSLEVEL (her çağrıda okunur; .env app açılışında yüklenir)."""
+    return max(0, min(9, int(os.getenv("ZIP_COMPRESSLEVEL", "6") or "6")))
+
+class _Sink:
+    """zipfile için yalnızca-yazılır hedef: yazılanları toplar, drain() ile boşaltılır."""
+    def __init__(self, tee=None):
+        self._parts = []
+        self._tee = tee
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        if self._tee is not None:
+            self._tee.write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+def listEntries(src_dir):
+    """Arşive girecek dosyalar: [(tam_yol, arşiv_adı)] (store dosyaları ve run logu hariç)."""
+    entries = []
+    for root, _, files in os.walk(src_dir):
+        for f in files:
+            if isStoreFile(f) or f == RUN_LOG_NAME:
+                continue  # ara sonuç store'u / run logu; result.csv zaten dışa aktarıldı
+            full = os.path.join(root, f)
+            entries.append((full, os.path.relpath(full, src_dir).replace(os.sep, "/")))
+    entries.sort(key=lambda e: e[1])
+    return entries
+
+def dirSignature(src_dir, entries=None):
+    """Klasörün imzası: arşive girecek dosyaların en yeni mtime'ı (ns); dosya yoksa None."""
+    entries = listEntries(src_dir) if entries is None else entries
+    stamps = []
+    for full, _ in entries:
+        try:
+            stamps.append(os.stat(full).st_mtime_ns)
+        except FileNotFoundError:
+            pass
+    return max(stamps) if stamps else None
+
+def cacheIsFresh(zip_path, src_dir):
+    try:
+        cached = os.stat(zip_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return cached == dirSignature(src_dir)
+
+# ----------- Public API (camelCase) -----------
+
+def iterZip(src_dir, level=None, replace=None, cache_path=None):
+    """
+    src_dir'in ZIP baytlarını parça parça üretir.
+    replace: {arşiv_adı: yol} — klasördeki dosyanın yerine konacak içerik (ör. result.csv anlık görüntüsü).
+    cache_path: verilirse arşiv yan yana bu dosyaya da yazılır; üretim tamamlanınca
+    dosya yerine taşınır ve mtime'ı klasör imzası yapılır (yarıda kalırsa silinir).
+    """
+    level = zipLevel() if level is None else level
+    replace = dict(replace or {})
+    entries = listEntries(src_dir)
+    signature = dirSignature(src_dir, entries)
+    names = {arc for _, arc in entries}
+    entries = [(replace.get(arc, full), arc) for full, arc in entries]
+    entries += [(path, arc) for arc, path in sorted(replace.items()) if arc not in names]
+
+    tmp_path = tee = None
+    if cache_path:
+        tmp_path = f"{cache_path}.{os.getpid()}.{time.monotonic_ns()}.part"
+        tee = open(tmp_path, "wb")
+    done = False
+    try:
+        sink = _Sink(tee)
+        # girdiler adla açılır: sıkıştırma türü/seviyesi ZipFile'dan alınır (tarih: arşivleme anı)
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED,
+                             compresslevel=level or None) as zf:
+            for full, arcname in entries:
+                try:
+                    src = open(full, "rb")
+                except FileNotFoundError:
+                    continue   # çalışan run'da listelendikten sonra silinmiş
+                with src, zf.open(arcname, "w") as dst:
+                    while True:
+                        block = src.read(CHUNK_BYTES)
+                        if not block:
+                            break
+                        dst.write(block)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                data = sink.drain()
+                if data:
+                    yield data
+        data = sink.drain()
+        if data:
+            yield data
+        done = True
+    finally:
+        if tee is not None:
+            tee.close()
+            if done and signature is not None:
+                os.replace(tmp_path, cache_path)
+                os.utime(cache_path, ns=(signature, signature))
+            else:
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
+
+def buildZip(src_dir, zip_path, level=None):
+    """
+    Önbellekteki arşiv güncelse onu, değilse yeniden üretip yolunu döndürür
+    (e-posta eki gibi dosya gerektiren yerler için). Arşive girecek dosya yoksa None.
+    """
+    if cacheIsFresh(zip_path, src_dir):
+        return zip_path
+    if dirSignature(src_dir) is None:
+        return None
+    for _ in iterZip(src_dir, level=level, cache_path=zip_path):
+        pass
+    return zip_path if os.path.exists(zip_path) else None